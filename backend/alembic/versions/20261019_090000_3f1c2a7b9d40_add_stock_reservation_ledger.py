@@ -0,0 +1,50 @@
+"""Add stock reservation ledger and partitioned reservation counters
+
+Revision ID: 3f1c2a7b9d40
+Revises: {new_revision_id}
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7b9d40'
+down_revision = '{new_revision_id}'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('stock_reservation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('checkout_session_id', sa.String(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('counter_slot', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['public.product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    schema='public'
+    )
+    op.create_index(op.f('ix_public_stock_reservation_id'), 'stock_reservation', ['id'], unique=False, schema='public')
+    op.create_index(op.f('ix_public_stock_reservation_checkout_session_id'), 'stock_reservation', ['checkout_session_id'], unique=False, schema='public')
+    op.create_index(op.f('ix_public_stock_reservation_expires_at'), 'stock_reservation', ['expires_at'], unique=False, schema='public')
+    op.create_table('product_reservation_counter',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('slot', sa.Integer(), nullable=False),
+    sa.Column('reserved_quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['public.product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'slot'),
+    schema='public'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('product_reservation_counter', schema='public')
+    op.drop_index(op.f('ix_public_stock_reservation_expires_at'), table_name='stock_reservation', schema='public')
+    op.drop_index(op.f('ix_public_stock_reservation_checkout_session_id'), table_name='stock_reservation', schema='public')
+    op.drop_index(op.f('ix_public_stock_reservation_id'), table_name='stock_reservation', schema='public')
+    op.drop_table('stock_reservation', schema='public')
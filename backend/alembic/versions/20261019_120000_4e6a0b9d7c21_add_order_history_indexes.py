@@ -0,0 +1,29 @@
+"""Add order history indexes
+
+Revision ID: 4e6a0b9d7c21
+Revises: b7d91e3c2f08
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '4e6a0b9d7c21'
+down_revision = 'b7d91e3c2f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The tables are live, so the indexes are built without locking out writes.
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_order_user_id_created_at_id', 'order', ['user_id', sa.text('created_at DESC'), sa.text('id DESC')], unique=False, schema='public', postgresql_include=['status', 'tracking_number'], postgresql_concurrently=True)
+        op.create_index('ix_order_item_order_id', 'order_item', ['order_id'], unique=False, schema='public', postgresql_include=['product_id', 'quantity', 'price_at_purchase'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_order_item_order_id', table_name='order_item', schema='public', postgresql_include=['product_id', 'quantity', 'price_at_purchase'], postgresql_concurrently=True)
+        op.drop_index('ix_order_user_id_created_at_id', table_name='order', schema='public', postgresql_include=['status', 'tracking_number'], postgresql_concurrently=True)
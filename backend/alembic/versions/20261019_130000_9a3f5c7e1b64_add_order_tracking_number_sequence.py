@@ -0,0 +1,30 @@
+"""Add order tracking number sequence and unique index
+
+Revision ID: 9a3f5c7e1b64
+Revises: 4e6a0b9d7c21
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9a3f5c7e1b64'
+down_revision = '4e6a0b9d7c21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('order_tracking_number_seq', increment=100, schema='public')))
+    # The unique index is built without locking out writes. A build that failed on
+    # a duplicate leaves an INVALID index behind, which is dropped before a retry.
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS public.ix_public_order_tracking_number')
+        op.create_index(op.f('ix_public_order_tracking_number'), 'order', ['tracking_number'], unique=True, schema='public', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_public_order_tracking_number'), table_name='order', schema='public', postgresql_concurrently=True)
+    op.execute(sa.schema.DropSequence(sa.Sequence('order_tracking_number_seq', schema='public')))
@@ -0,0 +1,29 @@
+"""Add seller statistics indexes
+
+Revision ID: c5e8f2a4d913
+Revises: 9a3f5c7e1b64
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8f2a4d913'
+down_revision = '9a3f5c7e1b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The tables are live, so the indexes are built without locking out writes.
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. The product index
+    # also covers the keyset pages of a seller's products by id.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_product_seller_id_id', 'product', ['seller_id', 'id'], unique=False, schema='public', postgresql_concurrently=True)
+        op.create_index(op.f('ix_public_order_created_at'), 'order', ['created_at'], unique=False, schema='public', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_public_order_created_at'), table_name='order', schema='public', postgresql_concurrently=True)
+        op.drop_index('ix_product_seller_id_id', table_name='product', schema='public', postgresql_concurrently=True)
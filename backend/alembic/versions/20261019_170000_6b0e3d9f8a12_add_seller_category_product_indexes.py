@@ -0,0 +1,25 @@
+"""Add seller category product indexes
+
+Revision ID: 6b0e3d9f8a12
+Revises: 1d8f4b6a2e57
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '6b0e3d9f8a12'
+down_revision = '1d8f4b6a2e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The (seller_id, id) product index is created by c5e8f2a4d913
+    with op.get_context().autocommit_block():
+        op.create_index('ix_product_category_category_id_product_id', 'product_category', ['category_id', 'product_id'], unique=False, schema='public', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_product_category_category_id_product_id', table_name='product_category', schema='public', postgresql_concurrently=True)
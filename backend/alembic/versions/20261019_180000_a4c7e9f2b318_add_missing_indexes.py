@@ -0,0 +1,37 @@
+"""Add missing indexes
+
+Revision ID: a4c7e9f2b318
+Revises: 6b0e3d9f8a12
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a4c7e9f2b318'
+down_revision = '6b0e3d9f8a12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The tables are live, so the indexes are built without locking out writes.
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. Lookups of
+    # product_category by product are served by the unique (product_id, category_id)
+    # index of the next revision.
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_public_product_price'), 'product', ['price'], unique=False, schema='public', postgresql_concurrently=True)
+        op.create_index(op.f('ix_public_order_item_product_id'), 'order_item', ['product_id'], unique=False, schema='public', postgresql_concurrently=True)
+        op.create_index(op.f('ix_public_stock_reservation_product_id'), 'stock_reservation', ['product_id'], unique=False, schema='public', postgresql_concurrently=True)
+        op.create_index(op.f('ix_public_category_category_name'), 'category', ['category_name'], unique=False, schema='public', postgresql_concurrently=True)
+        op.create_index('ix_user_is_seller', 'user', ['is_seller'], unique=False, schema='public', postgresql_where=sa.text('is_seller'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_is_seller', table_name='user', schema='public', postgresql_where=sa.text('is_seller'), postgresql_concurrently=True)
+        op.drop_index(op.f('ix_public_category_category_name'), table_name='category', schema='public', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_public_stock_reservation_product_id'), table_name='stock_reservation', schema='public', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_public_order_item_product_id'), table_name='order_item', schema='public', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_public_product_price'), table_name='product', schema='public', postgresql_concurrently=True)
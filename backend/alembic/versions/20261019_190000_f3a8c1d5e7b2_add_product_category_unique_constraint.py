@@ -0,0 +1,42 @@
+"""Add product category unique constraint
+
+Revision ID: f3a8c1d5e7b2
+Revises: a4c7e9f2b318
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8c1d5e7b2'
+down_revision = 'a4c7e9f2b318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The unique index is built without locking out writes, then turned into the
+    # constraint. It leads with product_id, so it also serves lookups by product.
+    with op.get_context().autocommit_block():
+        # A build that failed on a duplicate leaves an INVALID index behind
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS public.uq_product_category_product_id_category_id')
+        # Links added twice by concurrent requests are kept once. Servers still on
+        # the previous revision may add duplicates until the index exists, so this
+        # runs right before the build, which fails and can be retried if one slips in.
+        op.execute(
+            'DELETE FROM public.product_category AS duplicate '
+            'USING public.product_category AS kept '
+            'WHERE duplicate.product_id = kept.product_id '
+            'AND duplicate.category_id = kept.category_id '
+            'AND duplicate.id > kept.id'
+        )
+        op.create_index('uq_product_category_product_id_category_id', 'product_category', ['product_id', 'category_id'], unique=True, schema='public', postgresql_concurrently=True)
+        op.execute(
+            'ALTER TABLE public.product_category '
+            'ADD CONSTRAINT uq_product_category_product_id_category_id '
+            'UNIQUE USING INDEX uq_product_category_product_id_category_id'
+        )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_product_category_product_id_category_id', 'product_category', schema='public', type_='unique')
@@ -0,0 +1,40 @@
+"""Drop reservation counters
+
+Revision ID: 7e2d5b8c4f16
+Revises: f3a8c1d5e7b2
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2d5b8c4f16'
+down_revision = 'f3a8c1d5e7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Reserving locks the product row, so available stock is read from the ledger
+    op.drop_table('product_reservation_counter', schema='public')
+    op.drop_column('stock_reservation', 'counter_slot', schema='public')
+
+
+def downgrade() -> None:
+    op.add_column('stock_reservation', sa.Column('counter_slot', sa.Integer(), server_default='0', nullable=False), schema='public')
+    op.alter_column('stock_reservation', 'counter_slot', server_default=None, schema='public')
+    op.create_table('product_reservation_counter',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('slot', sa.Integer(), nullable=False),
+    sa.Column('reserved_quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['public.product.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'slot'),
+    schema='public'
+    )
+    # Every hold is put back into slot 0
+    op.execute(
+        'INSERT INTO public.product_reservation_counter (product_id, slot, reserved_quantity) '
+        'SELECT product_id, 0, SUM(quantity) FROM public.stock_reservation GROUP BY product_id'
+    )
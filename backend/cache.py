@@ -0,0 +1,56 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """
+    A small in-process LRU cache with an optional per-entry time to live.
+
+    Entries are evicted least recently used first once ``maxsize`` is reached.
+    ``ttl_seconds`` set on the cache applies to every entry unless ``set`` is given
+    its own; ``None`` keeps entries until they are evicted or popped.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[Any, Optional[float]]] = (
+            OrderedDict()
+        )
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, self._MISSING)
+        if entry is self._MISSING:
+            return default
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl_seconds = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, self._MISSING)
+        return default if entry is self._MISSING else entry[0]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, self._MISSING) is not self._MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
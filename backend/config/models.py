@@ -1,4 +1,29 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+
+CHECKOUT_POOL = "checkout"
+CATALOG_POOL = "catalog"
+ANALYTICS_POOL = "analytics"
+
+
+@dataclass
+class PoolConfig:
+    # Settings left as None are taken from the [database] section
+    pool_size: int | None = None
+    max_overflow: int | None = None
+    statement_timeout_ms: int | None = None
+
+
+def default_pools() -> dict[str, PoolConfig]:
+    return {
+        # Checkout, auth and orders keep their own connections, whatever else is busy
+        CHECKOUT_POOL: PoolConfig(statement_timeout_ms=5000),
+        CATALOG_POOL: PoolConfig(statement_timeout_ms=10000),
+        # Few connections, so heavy dashboards and bulk jobs queue among themselves
+        ANALYTICS_POOL: PoolConfig(
+            pool_size=3, max_overflow=0, statement_timeout_ms=60000
+        ),
+    }
 
 
 @dataclass
@@ -10,6 +35,31 @@ class DatabaseConfig:
     database: str
     db_backend: str = "postgresql"
     connector: str = "asyncpg"
+    pool_size: int = 10
+    max_overflow: int = 10
+    pool_timeout_seconds: float = 10.0
+    # Connections are replaced after this long, before the server or a proxy drops them
+    pool_recycle_seconds: int = 1800
+    pool_pre_ping: bool = True
+    # Prepared statements kept per connection by the asyncpg dialect
+    prepared_statement_cache_size: int = 500
+    application_name: str = "glimmershop"
+    statement_timeout_ms: int = 30000
+    # JIT compilation costs more than it saves on the short queries of the shop
+    jit: bool = False
+    # Connections opened and prepared at startup, at most pool_size
+    warm_up_connections: int = 5
+    # Read-only requests are spread over these, with the same pool settings
+    replica_urls: list[str] = field(default_factory=list)
+    replica_health_check_interval_seconds: float = 5.0
+    # How long a client reads from the primary after a write
+    primary_stickiness_seconds: int = 5
+    slow_query_ms: float = 200.0
+    # Runs of the same statement in one request before an N+1 warning
+    repeated_statement_threshold: int = 10
+    # Each pool gets its own engine; the settings above apply to all of them, and
+    # pool_size, max_overflow and statement_timeout_ms to those not setting their own
+    pools: dict[str, PoolConfig] = field(default_factory=default_pools)
 
     @property
     def url(self) -> str:
@@ -63,7 +113,8 @@ class AuthConfig:
     token_expiry_minutes: int
     min_password_length: int
     http_session_secret: str
-    stripe_secret_key: str
+    # Key of the permutation that turns order sequence numbers into tracking numbers
+    tracking_number_secret: str
 
     def load_private_key(self) -> bytes:
         with open(self.private_key_path, "rb") as f:
@@ -74,11 +125,36 @@ class AuthConfig:
             return f.read()
 
 
+@dataclass
+class StripeConfig:
+    secret_key: str
+    # Point the client at another server, e.g. the fake Stripe server used in tests
+    api_base: str | None = None
+    request_timeout_seconds: float = 10.0
+    max_network_retries: int = 2
+    # Signing secret of the webhook endpoint, used to verify incoming events
+    webhook_secret: str | None = None
+    event_poll_interval_seconds: float = 2.0
+    event_batch_size: int = 50
+    event_max_attempts: int = 5
+    charge_sync_interval_seconds: float = 300.0
+    charge_sync_page_size: int = 100
+
+
 @dataclass
 class AppConfig:
     default_categories: list[str]
 
 
+@dataclass
+class ReservationConfig:
+    # Stripe only accepts checkout session expiry between 30 minutes and 24 hours,
+    # and sessions are opened a minute longer than the TTL
+    ttl_minutes: int = 30
+    sweep_interval_seconds: int = 60
+    sweep_batch_size: int = 500
+
+
 @dataclass
 class Config:
     db_config: DatabaseConfig
@@ -86,4 +162,6 @@ class Config:
     server_config: ServerConfig
     smtp_config: SMTPConfig
     auth_config: AuthConfig
+    stripe_config: StripeConfig
     app_config: AppConfig
+    reservation_config: ReservationConfig
@@ -5,9 +5,13 @@ from config.models import (
     DatabaseConfig,
     ServerConfig,
     AuthConfig,
+    StripeConfig,
     SMTPConfig,
     AppConfig,
-    Config
+    ReservationConfig,
+    PoolConfig,
+    Config,
+    default_pools,
 )
 
 DEFAULT_ENV_PATH = ".env"  # for sensitive info + info for docker containers
@@ -20,6 +24,22 @@ def parse_comma_separated(value: str) -> list[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+def parse_pools(parser: ConfigParser) -> dict[str, PoolConfig]:
+    pools = default_pools()
+    for name, pool in pools.items():
+        section = f"database.{name}"
+        pools[name] = PoolConfig(
+            pool_size=parser.getint(section, "PoolSize", fallback=pool.pool_size),
+            max_overflow=parser.getint(
+                section, "MaxOverflow", fallback=pool.max_overflow
+            ),
+            statement_timeout_ms=parser.getint(
+                section, "StatementTimeoutMs", fallback=pool.statement_timeout_ms
+            ),
+        )
+    return pools
+
+
 def load_config(
         config_path: str = DEFAULT_CONFIG_PATH, env_path: str = DEFAULT_ENV_PATH
 ) -> Config:
@@ -32,6 +52,38 @@ def load_config(
         host=os.getenv("POSTGRES_HOST"),
         port=int(os.getenv("POSTGRES_PORT")),
         database=os.getenv("POSTGRES_DB"),
+        pool_size=parser.getint("database", "PoolSize", fallback=10),
+        max_overflow=parser.getint("database", "MaxOverflow", fallback=10),
+        pool_timeout_seconds=parser.getfloat(
+            "database", "PoolTimeoutSeconds", fallback=10.0
+        ),
+        pool_recycle_seconds=parser.getint(
+            "database", "PoolRecycleSeconds", fallback=1800
+        ),
+        pool_pre_ping=parser.getboolean("database", "PoolPrePing", fallback=True),
+        prepared_statement_cache_size=parser.getint(
+            "database", "PreparedStatementCacheSize", fallback=500
+        ),
+        application_name=parser.get(
+            "database", "ApplicationName", fallback="glimmershop"
+        ),
+        statement_timeout_ms=parser.getint(
+            "database", "StatementTimeoutMs", fallback=30000
+        ),
+        jit=parser.getboolean("database", "JIT", fallback=False),
+        warm_up_connections=parser.getint("database", "WarmUpConnections", fallback=5),
+        replica_urls=parse_comma_separated(os.getenv("POSTGRES_REPLICA_URLS", "")),
+        replica_health_check_interval_seconds=parser.getfloat(
+            "database", "ReplicaHealthCheckIntervalSeconds", fallback=5.0
+        ),
+        primary_stickiness_seconds=parser.getint(
+            "database", "PrimaryStickinessSeconds", fallback=5
+        ),
+        slow_query_ms=parser.getfloat("database", "SlowQueryMs", fallback=200.0),
+        repeated_statement_threshold=parser.getint(
+            "database", "RepeatedStatementThreshold", fallback=10
+        ),
+        pools=parse_pools(parser),
     )
     test_db_config = DatabaseConfig(
         user=os.getenv("TEST_POSTGRES_USER"),
@@ -70,11 +122,38 @@ def load_config(
         token_expiry_minutes=int(os.getenv("TOKEN_EXPIRY_MINUTES")),
         min_password_length=int(parser.get("auth", "MinPasswordLength")),
         http_session_secret=os.getenv("HTTP_SESSION_SECRET"),
-        stripe_secret_key=os.getenv("STRIPE_API_KEY"),
+        tracking_number_secret=os.getenv("TRACKING_NUMBER_SECRET"),
+    )
+    stripe_config = StripeConfig(
+        secret_key=os.getenv("STRIPE_API_KEY"),
+        api_base=os.getenv("STRIPE_API_BASE") or None,
+        request_timeout_seconds=parser.getfloat(
+            "stripe", "RequestTimeoutSeconds", fallback=10.0
+        ),
+        max_network_retries=parser.getint("stripe", "MaxNetworkRetries", fallback=2),
+        webhook_secret=os.getenv("STRIPE_WEBHOOK_SECRET") or None,
+        event_poll_interval_seconds=parser.getfloat(
+            "stripe", "EventPollIntervalSeconds", fallback=2.0
+        ),
+        event_batch_size=parser.getint("stripe", "EventBatchSize", fallback=50),
+        event_max_attempts=parser.getint("stripe", "EventMaxAttempts", fallback=5),
+        charge_sync_interval_seconds=parser.getfloat(
+            "stripe", "ChargeSyncIntervalSeconds", fallback=300.0
+        ),
+        charge_sync_page_size=parser.getint("stripe", "ChargeSyncPageSize", fallback=100),
     )
     app_config = AppConfig(
         default_categories=parse_comma_separated(parser.get("app-config", "DefaultCategories", fallback=""))
     )
+    reservation_config = ReservationConfig(
+        ttl_minutes=min(
+            max(parser.getint("reservations", "TTLMinutes", fallback=30), 30), 1439
+        ),
+        sweep_interval_seconds=parser.getint(
+            "reservations", "SweepIntervalSeconds", fallback=60
+        ),
+        sweep_batch_size=parser.getint("reservations", "SweepBatchSize", fallback=500),
+    )
 
     config = Config(
         db_config=db_config,
@@ -82,6 +161,8 @@ def load_config(
         server_config=server_config,
         smtp_config=smtp_config,
         auth_config=auth_config,
-        app_config=app_config
+        stripe_config=stripe_config,
+        app_config=app_config,
+        reservation_config=reservation_config,
     )
     return config
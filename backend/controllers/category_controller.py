@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from services.category_service import CategoryService
@@ -6,6 +6,7 @@ from schemas.schemas import (
     CategoryUpdate,
     CategoryQuery,
     CategoryToProductRequest,
+    CategoriesToProductsRequest,
     CategoryIdentifiers,
 )
 from exceptions.product_exceptions import ProductException
@@ -61,18 +62,16 @@ class CategoryController:
             raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
 
     async def get_seller_products_by_category(
-        self, category_id: int, seller_id: UUID
+        self,
+        category_id: int,
+        seller_id: UUID,
+        limit: int = 50,
+        after_id: Optional[int] = None,
     ) -> list:
         try:
-            product_list = await self._service.get_products_by_category(category_id)
-            seller_products = []
-            [
-                seller_products.append(product)
-                for product in product_list
-                if product.get("seller_id") == seller_id
-            ]
-            return seller_products
-
+            return await self._service.get_seller_products_by_category(
+                category_id, seller_id, limit, after_id
+            )
         except ProductException as e:
             raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
 
@@ -120,8 +119,30 @@ class CategoryController:
         except ProductException as e:
             raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
 
+    async def add_categories_to_products(
+        self, request: CategoriesToProductsRequest
+    ) -> dict[str, int]:
+        try:
+            added = await self._service.add_categories_to_products(
+                request.product_ids, request.category_ids
+            )
+            return {"added": added}
+        except ProductException as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
+
     async def delete_category_from_product(self, product_id: int, category_id: int):
         try:
             await self._service.delete_category_from_product(product_id, category_id)
         except ProductException as e:
             raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
+
+    async def delete_categories_from_products(
+        self, request: CategoriesToProductsRequest
+    ) -> dict[str, int]:
+        try:
+            removed = await self._service.delete_categories_from_products(
+                request.product_ids, request.category_ids
+            )
+            return {"removed": removed}
+        except ProductException as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
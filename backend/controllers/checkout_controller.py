@@ -1,29 +1,77 @@
 from services.checkout_service import CheckoutService
+from services.idempotency_service import IdempotencyService
 from services.order_service import OrderService
 from schemas.schemas import CartItemForCheckout, GuestUserInfo, OrderData
-from typing import List
+from functools import partial
+from typing import List, Optional
 from fastapi import HTTPException
 
 
 class CheckoutController:
 
-    def __init__(self, service: CheckoutService, order_service: OrderService):
+    def __init__(
+        self,
+        service: CheckoutService,
+        order_service: OrderService,
+        idempotency_service: IdempotencyService,
+    ):
         self._service = service
         self._order_service = order_service
+        self._idempotency_service = idempotency_service
 
-    async def create_checkout_session(self, cart_items: List[CartItemForCheckout]):
+    async def create_checkout_session(
+        self,
+        cart_items: List[CartItemForCheckout],
+        guest_user_info: GuestUserInfo,
+        idempotency_key: Optional[str] = None,
+    ):
         try:
-            r = await self._service.create_checkout_session(cart_items)
-            print(r)
-            return r
+            handler = partial(
+                self._service.create_checkout_session, cart_items, guest_user_info
+            )
+            if idempotency_key is None:
+                return await handler()
+            return await self._idempotency_service.run(
+                idempotency_key,
+                "create-checkout-session",
+                {"cart_items": cart_items, "guest_user_info": guest_user_info},
+                handler,
+            )
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
 
     async def post_checkout_updates(
-        self, order_data: List[OrderData], guest_user_info: GuestUserInfo
+        self,
+        order_data: List[OrderData],
+        guest_user_info: GuestUserInfo,
+        session_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
     ):
+        async def handler():
+            # The webhook consumer may already have created the order for this session
+            if session_id:
+                order_id = await self._order_service.get_order_id_by_checkout_session(
+                    session_id
+                )
+                if order_id is not None:
+                    return order_id
+            await self._service.update_stock_quantity(order_data, session_id)
+            return await self._order_service.add_new_order(
+                order_data, guest_user_info, session_id
+            )
+
         try:
-            await self._service.update_stock_quantity(order_data)
-            return await self._order_service.add_new_order(order_data, guest_user_info)
+            if idempotency_key is None:
+                return await handler()
+            return await self._idempotency_service.run(
+                idempotency_key,
+                "post-checkout",
+                {
+                    "orders": order_data,
+                    "guest_user_info": guest_user_info,
+                    "session_id": session_id,
+                },
+                handler,
+            )
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
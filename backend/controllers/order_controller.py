@@ -1,6 +1,8 @@
 from exceptions.order_exceptions import OrderException
 from services.order_service import OrderService
-from fastapi import HTTPException
+from fastapi import HTTPException, status
+from typing import Optional
+from uuid import UUID
 
 
 class OrderController:
@@ -14,3 +16,26 @@ class OrderController:
             return user
         except OrderException as e:
             raise HTTPException(status_code=e.status_code, detail=str(e.detail))
+
+    async def get_order_by_tracking_number(self, tracking_number: str) -> dict:
+        try:
+            return await self._service.get_order_by_tracking_number(tracking_number)
+        except OrderException as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e.detail))
+
+    async def get_order_for_user(self, order_id: int, user_id: UUID) -> dict:
+        order = await self.get_order_by_id(order_id)
+        if order["user_id"] != str(user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Order with id {order_id} not found!",
+            )
+        return order
+
+    async def get_orders_by_user(
+        self, user_id: UUID, limit: int, cursor: Optional[str] = None
+    ) -> dict:
+        try:
+            return await self._service.get_orders_by_user(user_id, limit, cursor)
+        except OrderException as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e.detail))
@@ -97,10 +97,9 @@ class ProductController:
         try:
             product_id = await self._service.add_new_product(seller_id, product)
             if new_product.categories:
-                for category_id in new_product.categories:
-                    await self._category_service.add_category_to_product(
-                        product_id, category_id
-                    )
+                await self._category_service.add_categories_to_products(
+                    [product_id], new_product.categories
+                )
 
             return {"product_id": product_id}
         except ProductException as e:
@@ -2,7 +2,8 @@ from uuid import UUID
 
 from services.seller_statistics_service import SellerStatisticsService
 from fastapi import HTTPException
-from schemas.schemas import SelectedMonthForSellerStatistics
+from dependencies import get_month_range
+from schemas.schemas import SelectedMonthForSellerStatistics, SellerStatisticsRange
 
 
 class SellerStatisticsController:
@@ -19,3 +20,17 @@ class SellerStatisticsController:
             )
         except HTTPException as e:
             raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
+
+    async def get_transactions_by_month(
+        self, seller_id: UUID, statistics_range: SellerStatisticsRange
+    ):
+        try:
+            first_month, last_month = get_month_range(statistics_range)
+            return await self._service.get_transactions_by_month(
+                seller_id,
+                first_month,
+                last_month,
+                statistics_range.compare_previous_year,
+            )
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from fastapi import HTTPException
+
+from services.stripe_event_service import StripeEventService
+
+
+class StripeWebhookController:
+
+    def __init__(self, service: StripeEventService):
+        self._service = service
+
+    async def receive_event(self, payload: bytes, signature: Optional[str]):
+        try:
+            await self._service.record_event(payload, signature)
+            return {"received": True}
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e.detail)) from e
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta, date
-from typing import Optional, Dict, Any, Tuple
+from typing import Callable, Optional, Dict, Any, Tuple
 from uuid import UUID
 
 from fastapi import Request, HTTPException, status, Depends
@@ -15,7 +15,7 @@ from config.auth_config import (
     http_only_auth_cookie,
 )
 from config.parser import load_config
-from schemas.schemas import SelectedMonthForSellerStatistics
+from schemas.schemas import SelectedMonthForSellerStatistics, SellerStatisticsRange
 import random
 import smtplib
 import uuid
@@ -38,6 +38,25 @@ async def get_session() -> AsyncSession:
     raise NotImplementedError("Please overwrite get_session dependency.")
 
 
+def read_only(request: Request) -> None:
+    """Route dependency: serve the request from a read-only session, even if it is a POST."""
+    request.state.read_only = True
+
+
+def use_primary(request: Request) -> None:
+    """Route dependency: never serve the request from a read replica."""
+    request.state.use_primary = True
+
+
+def use_pool(name: str) -> Callable[[Request], None]:
+    """Route dependency: take the request's connections from the named pool."""
+
+    def select_pool(request: Request) -> None:
+        request.state.pool = name
+
+    return select_pool
+
+
 def generate_session_id():
     return str(uuid.uuid4())
 
@@ -86,6 +105,53 @@ def get_first_and_last_day_of_month(selected_date: SelectedMonthForSellerStatist
     return first_day, last_day
 
 
+def add_months(month: date, months: int) -> date:
+    """Return the first day of the month ``months`` after (or before) ``month``."""
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+MAX_STATISTICS_RANGE_MONTHS = 36
+
+
+def get_month_range(
+    statistics_range: SellerStatisticsRange, today: date | None = None
+) -> Tuple[date, date]:
+    """
+    Resolve a statistics range to its first and last month: either the trailing
+    months up to and including the current one, or the given from and to months.
+    """
+    if statistics_range.trailing_months:
+        last_month = (today or date.today()).replace(day=1)
+        first_month = add_months(last_month, 1 - statistics_range.trailing_months)
+        return first_month, last_month
+
+    if not statistics_range.from_date or not statistics_range.to_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either trailing_months or both from_date and to_date must be provided",
+        )
+    try:
+        first_month = get_first_and_last_day_of_month(statistics_range.from_date)[0]
+        last_month = get_first_and_last_day_of_month(statistics_range.to_date)[0]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid month!"
+        )
+    first_month, last_month = first_month.date(), last_month.date()
+    if first_month > last_month:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="from_date must not be after to_date",
+        )
+    if add_months(first_month, MAX_STATISTICS_RANGE_MONTHS) <= last_month:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The range can span at most {MAX_STATISTICS_RANGE_MONTHS} months",
+        )
+    return first_month, last_month
+
+
 def convert_str_to_int_if_numeric(value: str):
     try:
         return int(value)
@@ -250,7 +316,3 @@ async def send_password_reset_email(user_email: EmailStr, new_password: str):
         await send_email_via_smtp(user_email, message)
     except Exception as e:
         logger.error(f"Failed to send email. Error: {e}")
-
-
-def generate_random_12_digit_number() -> str:
-    return "".join([str(random.randint(0, 9)) for _ in range(12)])
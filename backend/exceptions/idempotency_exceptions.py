@@ -0,0 +1,10 @@
+from fastapi import HTTPException, status
+
+
+class IdempotencyException(HTTPException):
+    def __init__(
+        self,
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is already being processed",
+    ):
+        super().__init__(status_code=status_code, detail=detail)
@@ -0,0 +1,10 @@
+from fastapi import HTTPException, status
+
+
+class SellerStatisticsException(HTTPException):
+    def __init__(
+        self,
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="Error when fetching seller statistics",
+    ):
+        super().__init__(status_code=status_code, detail=detail)
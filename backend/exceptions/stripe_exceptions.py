@@ -0,0 +1,19 @@
+from fastapi import HTTPException, status
+
+
+class StripeGatewayException(HTTPException):
+    def __init__(
+        self,
+        status_code=status.HTTP_502_BAD_GATEWAY,
+        detail="Payment provider request failed!",
+    ):
+        super().__init__(status_code=status_code, detail=detail)
+
+
+class StripeWebhookException(HTTPException):
+    def __init__(
+        self,
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid Stripe webhook payload or signature!",
+    ):
+        super().__init__(status_code=status_code, detail=detail)
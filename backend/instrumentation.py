@@ -0,0 +1,149 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+Endpoint = TypeVar("Endpoint", bound=Callable)
+
+
+def max_queries(limit: int) -> Callable[[Endpoint], Endpoint]:
+    """
+    Declare the most statements one request to the endpoint may run. It is not
+    enforced in production; the test suite fails every request that runs more.
+    """
+
+    def declare(endpoint: Endpoint) -> Endpoint:
+        endpoint.max_queries = limit
+        return endpoint
+
+    return declare
+
+
+class QueryStats:
+    """The statements one request executed, recorded by the engine event hooks."""
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: str | None = None
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> int:
+        """Record a statement and return how often its shape ran in the request."""
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        self.shapes[statement] += 1
+        return self.shapes[statement]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total_seconds * 1000:.1f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_seconds * 1000:.1f}"
+        )
+
+    def log_fields(self) -> dict:
+        return {
+            "path": self.path,
+            "db_queries": self.count,
+            "db_ms": round(self.total_seconds * 1000, 1),
+            "db_slowest_ms": round(self.slowest_seconds * 1000, 1),
+        }
+
+
+request_queries: ContextVar[QueryStats | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def _redacted(parameters) -> str:
+    """Describe statement parameters by type only, so no values reach the log."""
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (list, tuple, dict)):
+            return f"[{len(parameters)} parameter sets]"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: <redacted>" for key in parameters) + "}"
+    return "<redacted>"
+
+
+def instrument_engine(
+    engine: AsyncEngine, slow_query_ms: float, repeated_statement_threshold: int
+) -> None:
+    """
+    Time every statement of ``engine``. Statements slower than ``slow_query_ms``
+    are logged with their parameters redacted. Inside a request the statement is
+    also added to the request's QueryStats, with a warning the first time the same
+    statement runs more than ``repeated_statement_threshold`` times, which usually
+    means an N+1 query.
+    """
+    slow_query_seconds = slow_query_ms / 1000
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        seconds = time.perf_counter() - context.query_started
+        if seconds >= slow_query_seconds:
+            logger.warning(
+                f"Slow query ({seconds * 1000:.1f} ms): {statement} "
+                f"parameters={_redacted(parameters)}"
+            )
+
+        stats = request_queries.get()
+        if stats is None:
+            return
+        runs = stats.record(statement, seconds)
+        if runs == repeated_statement_threshold + 1:
+            logger.warning(
+                f"Statement ran more than {repeated_statement_threshold} times "
+                f"in {stats.path}, possibly an N+1 query: {statement}"
+            )
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Collects the statements of each request into ``request_queries``, then sends
+    their count and time as a ``Server-Timing`` header and logs them.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope["path"])
+        token = request_queries.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_queries.reset(token)
+            if stats.count:
+                fields = stats.log_fields()
+                message = ", ".join(f"{key}={value}" for key, value in fields.items())
+                logger.info(f"Request queries: {message}", extra=fields)
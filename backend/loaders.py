@@ -0,0 +1,151 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List
+from uuid import UUID as PyUUID
+
+from sqlalchemy import Integer, any_, bindparam, event, select
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dependencies import db_model_to_dict
+from models.models import Category, Product, User
+
+
+class DataLoader:
+    """
+    Batches and memoizes lookups by key.
+
+    ``load`` calls made in the same event loop tick are coalesced into one call of
+    ``batch_load`` with all their keys, which returns a dict of the rows found.
+    Every key is looked up at most once while the loader lives; keys without a row
+    resolve to None. ``key`` normalizes the keys callers pass, e.g. ids that arrive
+    as strings, before they are looked up.
+    """
+
+    def __init__(
+        self,
+        batch_load: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        key: Callable[[Any], Hashable] | None = None,
+    ):
+        self._batch_load = batch_load
+        self._key = key
+        self._results: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+
+    async def load(self, key: Hashable) -> Any:
+        if self._key is not None:
+            key = self._key(key)
+        result = self._results.get(key)
+        if result is None:
+            loop = asyncio.get_running_loop()
+            result = self._results[key] = loop.create_future()
+            self._queue.append(key)
+            if len(self._queue) == 1:
+                loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return await result
+
+    async def load_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Load several keys in one batch. Keys without a row are left out."""
+        keys = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*(self.load(key) for key in keys))
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def clear(self) -> None:
+        self._results = {
+            key: result for key, result in self._results.items() if not result.done()
+        }
+
+    async def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        results = [self._results[key] for key in keys]
+        try:
+            values = await self._batch_load(keys)
+        except Exception as e:
+            for key, result in zip(keys, results):
+                self._results.pop(key, None)
+                if not result.done():
+                    result.set_exception(e)
+            return
+        for key, result in zip(keys, results):
+            if not result.done():
+                result.set_result(values.get(key))
+
+
+class Loaders:
+    """
+    The loaders of one session, and so of one request. Rows are loaded as dicts,
+    like the services return them.
+
+    The memoized rows are dropped whenever the session writes: on every flush,
+    every INSERT, UPDATE or DELETE statement, commit and rollback.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.db = session
+        # User ids come from tokens as strings as well as from rows as UUIDs
+        self.users = DataLoader(self._load_users, key=lambda id: PyUUID(str(id)))
+        self.products = DataLoader(self._load_products)
+        self.categories = DataLoader(self._load_categories)
+
+    def clear(self) -> None:
+        for loader in (self.users, self.products, self.categories):
+            loader.clear()
+
+    async def prepare(self) -> None:
+        """Run every batch query once without keys, so the connection prepares it."""
+        for batch_load in (
+            self._load_users,
+            self._load_products,
+            self._load_categories,
+        ):
+            await batch_load([])
+
+    async def _load_users(self, user_ids: List[PyUUID]) -> Dict[PyUUID, dict]:
+        result = await self.db.execute(
+            select(User).where(
+                User.id
+                == any_(
+                    bindparam("user_ids", user_ids, type_=ARRAY(UUID(as_uuid=True)))
+                )
+            )
+        )
+        return {user.id: db_model_to_dict(user) for user in result.scalars().all()}
+
+    async def _load_products(self, product_ids: List[int]) -> Dict[int, dict]:
+        result = await self.db.execute(
+            select(Product).where(
+                Product.id
+                == any_(bindparam("product_ids", product_ids, type_=ARRAY(Integer)))
+            )
+        )
+        return {
+            product.id: db_model_to_dict(product) for product in result.scalars().all()
+        }
+
+    async def _load_categories(self, category_ids: List[int]) -> Dict[int, dict]:
+        result = await self.db.execute(
+            select(Category).where(
+                Category.id
+                == any_(bindparam("category_ids", category_ids, type_=ARRAY(Integer)))
+            )
+        )
+        return {
+            category.id: db_model_to_dict(category)
+            for category in result.scalars().all()
+        }
+
+
+def get_loaders(session: AsyncSession) -> Loaders:
+    """Return the loaders of the session, creating them on first use."""
+    loaders = session.info.get("loaders")
+    if loaders is None:
+        loaders = session.info["loaders"] = Loaders(session)
+        sync_session = session.sync_session
+
+        def clear_on_write(orm_execute_state):
+            if not orm_execute_state.is_select:
+                loaders.clear()
+
+        event.listen(sync_session, "do_orm_execute", clear_on_write)
+        for name in ("after_flush", "after_commit", "after_rollback"):
+            event.listen(sync_session, name, lambda *args: loaders.clear())
+    return loaders
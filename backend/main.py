@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 from functools import partial
@@ -6,14 +7,39 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import create_async_engine
 from fastapi.middleware.cors import CORSMiddleware
 
 from models.models import Category
 from config.parser import load_config
-from config.models import Config
+from config.models import ANALYTICS_POOL, CHECKOUT_POOL, Config
 from dependencies import get_session
-from models.database import build_session_maker, build_session
+from instrumentation import QueryInstrumentationMiddleware, instrument_engine
+from loaders import get_loaders
+from models.database import (
+    ReadReplicas,
+    build_engine,
+    build_pools,
+    build_session,
+    warm_up_pool,
+)
+from services.stripe_gateway import get_stripe_gateway
+from services.tracking_number_service import TrackingNumberGenerator
+from tasks.idempotency_cleanup import (
+    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS,
+    delete_expired_idempotency_keys,
+)
+from tasks.periodic import run_periodically
+from tasks.pool_statistics import (
+    POOL_STATISTICS_INTERVAL_SECONDS,
+    log_pool_statistics,
+)
+from tasks.reservation_sweeper import release_expired_reservations
+from tasks.seller_statistics_prewarm import (
+    SELLER_STATISTICS_PREWARM_INTERVAL_SECONDS,
+    prewarm_seller_statistics,
+)
+from tasks.stripe_charge_sync import sync_stripe_charges
+from tasks.stripe_event_consumer import process_stripe_events
 from routers import (
     auth_router,
     user_router,
@@ -39,12 +65,25 @@ async def initialize_categories(session_factory, default_categories: list[str])
 
 
 def resolve_dependencies(app: FastAPI, config: Config) -> FastAPI:
-    engine = create_async_engine(config.db_config.url)
-    session_factory = build_session_maker(engine)
-    get_session_fn: Callable = partial(build_session, session_factory)
+    pools = build_pools(config.db_config)
+    replicas = ReadReplicas(
+        [build_engine(config.db_config, url) for url in config.db_config.replica_urls],
+        config.db_config.primary_stickiness_seconds,
+    )
+    for engine in [*(pool.engine for pool in pools.values()), *replicas.engines]:
+        instrument_engine(
+            engine,
+            config.db_config.slow_query_ms,
+            config.db_config.repeated_statement_threshold,
+        )
+    get_session_fn: Callable = partial(build_session, pools, replicas)
 
     app.dependency_overrides[get_session] = get_session_fn
-    app.state.session_factory = session_factory
+    app.state.pools = pools
+    app.state.replicas = replicas
+    # Background jobs use the pool of the requests they serve
+    app.state.session_factory = pools[CHECKOUT_POOL].session_maker
+    app.state.analytics_session_factory = pools[ANALYTICS_POOL].session_maker
     app.state.config = config
 
     origins = [
@@ -58,7 +97,9 @@ def resolve_dependencies(app: FastAPI, config: Config) -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing"],
     )
+    app.add_middleware(QueryInstrumentationMiddleware)
     app.mount("/images", StaticFiles(directory="images"), name="static")
     return app
 
@@ -76,6 +117,7 @@ def register_routers(app: FastAPI) -> None:
 def create_app(config: Config | None = None) -> FastAPI:
     if config is None:
         config = load_config()
+    TrackingNumberGenerator.check_secret(config.auth_config.tracking_number_secret)
 
     app = FastAPI()
     app = resolve_dependencies(app, config)
@@ -89,8 +131,83 @@ def create_app(config: Config | None = None) -> FastAPI:
             config.app_config.default_categories
         )
         logging.info(f"Categories initialized: {config.app_config.default_categories}")
+
+        await app.state.replicas.check_health()
+        engines = [pool.engine for pool in app.state.pools.values()]
+        for engine in [*engines, *app.state.replicas.healthy_engines()]:
+            await warm_up_pool(
+                engine,
+                config.db_config.warm_up_connections,
+                lambda session: get_loaders(session).prepare(),
+            )
+
+        reservation_config = config.reservation_config
+        app.state.background_tasks = [
+            asyncio.create_task(
+                run_periodically(
+                    config.db_config.replica_health_check_interval_seconds,
+                    app.state.replicas.check_health,
+                )
+            ),
+            asyncio.create_task(
+                run_periodically(
+                    POOL_STATISTICS_INTERVAL_SECONDS,
+                    log_pool_statistics,
+                    app.state.pools,
+                )
+            ),
+            asyncio.create_task(
+                run_periodically(
+                    reservation_config.sweep_interval_seconds,
+                    release_expired_reservations,
+                    app.state.session_factory,
+                    reservation_config,
+                )
+            ),
+            asyncio.create_task(
+                run_periodically(
+                    IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS,
+                    delete_expired_idempotency_keys,
+                    app.state.session_factory,
+                )
+            ),
+            asyncio.create_task(
+                run_periodically(
+                    config.stripe_config.event_poll_interval_seconds,
+                    process_stripe_events,
+                    app.state.session_factory,
+                    config.stripe_config,
+                )
+            ),
+            asyncio.create_task(
+                run_periodically(
+                    config.stripe_config.charge_sync_interval_seconds,
+                    sync_stripe_charges,
+                    app.state.analytics_session_factory,
+                    config.stripe_config,
+                )
+            ),
+            asyncio.create_task(
+                run_periodically(
+                    SELLER_STATISTICS_PREWARM_INTERVAL_SECONDS,
+                    prewarm_seller_statistics,
+                    app.state.analytics_session_factory,
+                )
+            ),
+        ]
         logging.info("Application startup complete")
 
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        for task in app.state.background_tasks:
+            task.cancel()
+        await asyncio.gather(*app.state.background_tasks, return_exceptions=True)
+        if get_stripe_gateway.cache_info().currsize:
+            await get_stripe_gateway().close()
+        engines = [pool.engine for pool in app.state.pools.values()]
+        for engine in [*engines, *app.state.replicas.engines]:
+            await engine.dispose()
+
     return app
 
 
@@ -1,12 +1,74 @@
+import asyncio
+import time
+from dataclasses import asdict, replace
+from itertools import count
+from typing import Awaitable, Callable, Dict, List
+
+from fastapi import Request, Response
 from typing_extensions import AsyncGenerator
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy import event, text
+from sqlalchemy.exc import InvalidRequestError, SQLAlchemyError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import DeclarativeBase, Session
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
     AsyncEngine,
     async_sessionmaker,
     AsyncSession,
+    create_async_engine,
 )
 
+from config.logger_config import get_logger
+from config.models import CATALOG_POOL, DatabaseConfig
+
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+# Set after writes, so the same client reads its own writes from the primary
+PRIMARY_STICKINESS_COOKIE = "read_from_primary"
+
+logger = get_logger(__name__)
+
+
+def build_engine(
+    config: DatabaseConfig, url: str | None = None, **kwargs
+) -> AsyncEngine:
+    """Create an engine with the pool settings of ``config``, for its url by default."""
+    return create_async_engine(
+        url or config.url,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout_seconds,
+        pool_recycle=config.pool_recycle_seconds,
+        pool_pre_ping=config.pool_pre_ping,
+        connect_args={
+            "prepared_statement_cache_size": config.prepared_statement_cache_size,
+            "server_settings": {
+                "application_name": config.application_name,
+                "statement_timeout": str(config.statement_timeout_ms),
+                "jit": "on" if config.jit else "off",
+            },
+        },
+        **kwargs,
+    )
+
+
+async def warm_up_pool(
+    engine: AsyncEngine,
+    connections: int,
+    prepare: Callable[[AsyncSession], Awaitable[None]],
+) -> None:
+    """
+    Open ``connections`` connections at once, so the pool keeps all of them, and
+    run ``prepare`` in a session on each to prepare the hot statements.
+    """
+
+    async def warm_up_connection() -> None:
+        async with engine.connect() as connection:
+            async with AsyncSession(bind=connection) as session:
+                await prepare(session)
+
+    connections = min(connections, engine.pool.size())
+    await asyncio.gather(*(warm_up_connection() for _ in range(connections)))
+
 
 def build_session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
     session_maker = async_sessionmaker(
@@ -15,11 +77,195 @@ def build_session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]
     return session_maker
 
 
+class ReadOnlySession(Session):
+    pass
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _refuse_flush(session, flush_context, instances) -> None:
+    raise InvalidRequestError("Read-only sessions cannot write")
+
+
+def build_read_only_session_maker(
+    engine: AsyncEngine,
+) -> async_sessionmaker[AsyncSession]:
+    """
+    Sessions of this maker run every statement in autocommit, so a query costs a
+    single round trip with no BEGIN or COMMIT around it. They never expire objects
+    and refuse to flush.
+    """
+    session_maker = async_sessionmaker(
+        bind=engine.execution_options(isolation_level="AUTOCOMMIT"),
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=ReadOnlySession,
+    )
+    return session_maker
+
+
+class ReadReplicas:
+    """
+    Round-robin over the read replicas' read-only session makers. Replicas that
+    failed their last health check are skipped until they pass one again; with no
+    healthy replica, ``session_maker`` returns None and reads go to the primary.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], stickiness_seconds: int = 0):
+        self.engines = engines
+        self.stickiness_seconds = stickiness_seconds
+        self._session_makers = [
+            build_read_only_session_maker(engine) for engine in engines
+        ]
+        self._healthy = [True] * len(engines)
+        self._turns = count()
+
+    def session_maker(self) -> async_sessionmaker[AsyncSession] | None:
+        for _ in range(len(self.engines)):
+            index = next(self._turns) % len(self.engines)
+            if self._healthy[index]:
+                return self._session_makers[index]
+        return None
+
+    def healthy_engines(self) -> List[AsyncEngine]:
+        return [
+            engine for engine, healthy in zip(self.engines, self._healthy) if healthy
+        ]
+
+    async def check_health(self, timeout_seconds: float = 2.0) -> None:
+        async def is_healthy(engine: AsyncEngine) -> bool:
+            try:
+                async with engine.connect() as connection:
+                    await asyncio.wait_for(
+                        connection.execute(text("SELECT 1")), timeout_seconds
+                    )
+                return True
+            except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+                logger.warning(f"Read replica {engine.url.host} is unhealthy: {e}")
+                return False
+
+        self._healthy = list(
+            await asyncio.gather(*(is_healthy(engine) for engine in self.engines))
+        )
+
+
+class DatabasePool:
+    """
+    One of the named connection pools of the primary, with its session makers and
+    the time requests spent waiting for its connections.
+    """
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.session_maker = build_session_maker(engine)
+        self.read_only_session_maker = build_read_only_session_maker(engine)
+        self._reset_waits()
+
+    def _reset_waits(self) -> None:
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    async def connect(self, session: AsyncSession) -> None:
+        """Check out the session's connection, recording how long it took."""
+        started = time.perf_counter()
+        try:
+            await session.connection()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.waits += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def take_statistics(self) -> dict:
+        """Return the pool's usage and waits since the last call, and reset the waits."""
+        pool = self.engine.pool
+        statistics = {
+            "pool": self.name,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "waits": self.waits,
+            "avg_wait_ms": (
+                round(self.wait_seconds / self.waits * 1000, 2) if self.waits else 0.0
+            ),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            "timeouts": self.timeouts,
+        }
+        self._reset_waits()
+        return statistics
+
+
+def build_pools(config: DatabaseConfig) -> Dict[str, DatabasePool]:
+    """
+    Build an engine per named pool of ``config``, each with its own size and timeout.
+    Settings a pool leaves unset are taken from ``config`` itself.
+    """
+    return {
+        name: DatabasePool(
+            name,
+            build_engine(
+                replace(
+                    config,
+                    **{
+                        setting: value
+                        for setting, value in asdict(pool).items()
+                        if value is not None
+                    },
+                    application_name=f"{config.application_name}-{name}",
+                )
+            ),
+        )
+        for name, pool in config.pools.items()
+    }
+
+
 async def build_session(
-    session_maker: async_sessionmaker[AsyncSession],
+    pools: Dict[str, DatabasePool],
+    replicas: ReadReplicas,
+    request: Request,
+    response: Response,
 ) -> AsyncGenerator[AsyncSession, None]:
-    async with session_maker() as session:
+    """
+    Sessions come from the pool the route asks for, the catalog pool by default.
+
+    Read-only requests, GET and HEAD ones unless a route says otherwise, get a
+    read-only session, which is never committed. It reads from a replica unless
+    the route must read from the primary or the client wrote recently. Every other
+    request is committed on the primary when it succeeds.
+    """
+    pool = pools[getattr(request.state, "pool", CATALOG_POOL)]
+    read_only = getattr(request.state, "read_only", request.method in READ_ONLY_METHODS)
+    if read_only:
+        replica_session_maker = None
+        if not getattr(request.state, "use_primary", False) and (
+            PRIMARY_STICKINESS_COOKIE not in request.cookies
+        ):
+            replica_session_maker = replicas.session_maker()
+        if replica_session_maker is not None:
+            async with replica_session_maker() as session:
+                session.info["replica"] = True
+                yield session
+            return
+        async with pool.read_only_session_maker() as session:
+            await pool.connect(session)
+            yield session
+        return
+
+    if replicas.engines and replicas.stickiness_seconds:
+        response.set_cookie(
+            PRIMARY_STICKINESS_COOKIE,
+            "1",
+            max_age=replicas.stickiness_seconds,
+            httponly=True,
+        )
+    async with pool.session_maker() as session:
         try:
+            await pool.connect(session)
             yield session
             await session.commit()
         except Exception as e:
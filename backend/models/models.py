@@ -1,5 +1,6 @@
 import uuid
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     Integer,
@@ -8,9 +9,14 @@ from sqlalchemy import (
     DateTime,
     Date,
     ForeignKey,
+    Index,
+    Sequence,
+    Text,
+    UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from .database import Base
 
 
@@ -19,7 +25,7 @@ class Category(Base):
     __table_args__ = {"schema": "public"}
 
     id = Column(Integer, primary_key=True, index=True)
-    category_name = Column(String(length=200))
+    category_name = Column(String(length=200), index=True)
     is_default = Column(Boolean, default=False)
 
     product_category = relationship("ProductCategory", back_populates="category")
@@ -27,7 +33,10 @@ class Category(Base):
 
 class Product(Base):
     __tablename__ = "product"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        Index("ix_product_seller_id_id", "seller_id", "id"),
+        {"schema": "public"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     seller_id = Column(
@@ -35,7 +44,7 @@ class Product(Base):
     )
     name = Column(String(length=100))
     description = Column(String(length=15000))
-    price = Column(Float)
+    price = Column(Float, index=True)
     stock_quantity = Column(Integer)
     material = Column(String(length=100))
     color = Column(String(length=100))
@@ -47,11 +56,26 @@ class Product(Base):
         "ProductCategory", back_populates="product", cascade="all, delete-orphan"
     )
     order_items = relationship("OrderItem", back_populates="product")
+    reservations = relationship(
+        "StockReservation", back_populates="product", cascade="all, delete-orphan"
+    )
 
 
 class ProductCategory(Base):
     __tablename__ = "product_category"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        Index(
+            "ix_product_category_category_id_product_id", "category_id", "product_id"
+        ),
+        # Links are inserted with ON CONFLICT DO NOTHING against this constraint,
+        # whose index also serves the lookups by product
+        UniqueConstraint(
+            "product_id",
+            "category_id",
+            name="uq_product_category_product_id_category_id",
+        ),
+        {"schema": "public"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("public.product.id", ondelete="CASCADE"))
@@ -63,7 +87,11 @@ class ProductCategory(Base):
 
 class User(Base):
     __tablename__ = "user"
-    __table_args__ = {"schema": "public"}
+    __table_args__ = (
+        # Sellers are a small share of the users, so only they are indexed
+        Index("ix_user_is_seller", "is_seller", postgresql_where=text("is_seller")),
+        {"schema": "public"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     first_name = Column(String(50))
@@ -87,6 +115,13 @@ class User(Base):
     orders = relationship("Order", back_populates="user")
 
 
+# Tracking numbers are derived from this sequence. Every nextval reserves a block of
+# ``increment`` numbers that the application hands out without further round trips
+ORDER_TRACKING_SEQUENCE = Sequence(
+    "order_tracking_number_seq", increment=100, schema="public", metadata=Base.metadata
+)
+
+
 class Order(Base):
     __tablename__ = "order"
     __table_args__ = {"schema": "public"}
@@ -98,9 +133,10 @@ class Order(Base):
     last_name = Column(String, nullable=False)
     shipping_address = Column(String, nullable=False)
     phone = Column(String, nullable=False)
-    created_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
     status = Column(String, nullable=False)
-    tracking_number = Column(String, nullable=False)
+    tracking_number = Column(String, nullable=False, unique=True, index=True)
+    checkout_session_id = Column(String, nullable=True, unique=True)
 
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
@@ -112,9 +148,173 @@ class OrderItem(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("public.order.id"))
-    product_id = Column(Integer, ForeignKey("public.product.id"))
+    product_id = Column(Integer, ForeignKey("public.product.id"), index=True)
     price_at_purchase = Column(Float)
     quantity = Column(Integer)
 
     order = relationship("Order", back_populates="items")
     product = relationship("Product", back_populates="order_items")
+
+
+# Order history pages are read with keyset pagination on (created_at, id) per user,
+# and their items and totals by order id, both as index-only scans
+Index(
+    "ix_order_user_id_created_at_id",
+    Order.user_id,
+    Order.created_at.desc(),
+    Order.id.desc(),
+    postgresql_include=["status", "tracking_number"],
+)
+Index(
+    "ix_order_item_order_id",
+    OrderItem.order_id,
+    postgresql_include=["product_id", "quantity", "price_at_purchase"],
+)
+
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservation"
+    __table_args__ = {"schema": "public"}
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(
+        Integer,
+        ForeignKey("public.product.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    checkout_session_id = Column(String, nullable=True, index=True)
+    quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    product = relationship("Product", back_populates="reservations")
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_key"
+    __table_args__ = {"schema": "public"}
+
+    key = Column(String(255), primary_key=True)
+    endpoint = Column(String(100), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    response_body = Column(JSONB, nullable=True)
+    created_at = Column(DateTime, nullable=False, index=True)
+    completed_at = Column(DateTime, nullable=True)
+
+
+class StripeEvent(Base):
+    """Webhook events received from Stripe, waiting to be applied by the consumer"""
+
+    __tablename__ = "stripe_event"
+    __table_args__ = (
+        Index(
+            "ix_stripe_event_pending",
+            "available_at",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+        {"schema": "public"},
+    )
+
+    id = Column(String(255), primary_key=True)
+    type = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    received_at = Column(DateTime, nullable=False)
+    # Failed events are retried with a backoff, not before this time
+    available_at = Column(DateTime, nullable=False)
+    processed_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+
+
+class StripeCharge(Base):
+    """
+    Local copy of the Stripe charges, kept in sync by the charge sync job. Charges of
+    the legacy checkout carry the seller and the sold items in their metadata, which
+    is parsed into seller_id, items and product_categories.
+    """
+
+    __tablename__ = "stripe_charge"
+    __table_args__ = (
+        Index("ix_stripe_charge_seller_id_created", "seller_id", "created"),
+        {"schema": "public"},
+    )
+
+    id = Column(String(255), primary_key=True)
+    created = Column(DateTime, nullable=False)
+    amount = Column(Integer, nullable=False)
+    currency = Column(String(3), nullable=False)
+    status = Column(String(50), nullable=False)
+    raw_metadata = Column(JSONB, nullable=False)
+    seller_id = Column(UUID(as_uuid=True), nullable=True)
+    # [{"name": ..., "quantity": ..., "revenue": ...}], the amount split by quantity
+    items = Column(JSONB, nullable=False)
+    # {category_id: quantity}
+    product_categories = Column(JSONB, nullable=False)
+    synced_at = Column(DateTime, nullable=False)
+
+
+class StripeSyncState(Base):
+    """
+    Progress of a Stripe list sync. ``watermark`` is the ``created`` timestamp up to
+    which every object has been synced; a run in progress keeps its page cursor and
+    the newest timestamp it has seen until its last page is stored.
+    """
+
+    __tablename__ = "stripe_sync_state"
+    __table_args__ = {"schema": "public"}
+
+    name = Column(String(50), primary_key=True)
+    watermark = Column(BigInteger, nullable=False, default=0)
+    pending_watermark = Column(BigInteger, nullable=True)
+    cursor = Column(String(255), nullable=True)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class SellerMonthlySales(Base):
+    """Per seller and month: number of orders with the seller's items and revenue"""
+
+    __tablename__ = "seller_monthly_sales"
+    __table_args__ = {"schema": "public"}
+
+    seller_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("public.user.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    month = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False)
+    revenue = Column(Float, nullable=False)
+
+
+class SellerMonthlyProductSales(Base):
+    __tablename__ = "seller_monthly_product_sales"
+    __table_args__ = {"schema": "public"}
+
+    seller_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("public.user.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    month = Column(Date, primary_key=True)
+    product_id = Column(
+        Integer, ForeignKey("public.product.id", ondelete="CASCADE"), primary_key=True
+    )
+    units = Column(Integer, nullable=False)
+    revenue = Column(Float, nullable=False)
+
+
+class SellerMonthlyCategorySales(Base):
+    __tablename__ = "seller_monthly_category_sales"
+    __table_args__ = {"schema": "public"}
+
+    seller_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("public.user.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    month = Column(Date, primary_key=True)
+    category_id = Column(
+        Integer, ForeignKey("public.category.id", ondelete="CASCADE"), primary_key=True
+    )
+    units = Column(Integer, nullable=False)
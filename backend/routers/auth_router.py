@@ -7,15 +7,22 @@ from controllers.auth_controller import AuthController
 from pydantic import EmailStr
 from services.auth_service import AuthService
 from fastapi.security import OAuth2PasswordRequestForm
-from dependencies import get_session
+from config.models import CHECKOUT_POOL
+from dependencies import get_session, use_pool, use_primary
+from instrumentation import max_queries
 from sqlalchemy.ext.asyncio import AsyncSession
 from dependencies import get_current_user
 from jose import jwt, JWTError
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(
+    prefix="/auth",
+    tags=["auth"],
+    dependencies=[Depends(use_primary), Depends(use_pool(CHECKOUT_POOL))],
+)
 
 
 @router.post("/verify-pw")
+@max_queries(0)
 def verify_password(password1, password2, session: AsyncSession = Depends(get_session)):
     service = AuthService(session)
     auth_controller = AuthController(service)
@@ -26,6 +33,7 @@ def verify_password(password1, password2, session: AsyncSession = Depends(get_se
 
 
 @router.post("/login")
+@max_queries(2)
 async def login(
     is_seller: bool,
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -40,6 +48,7 @@ async def login(
 
 
 @router.get("/test")
+@max_queries(0)
 async def test_cookie_jwt(request: Request):
     token = request.cookies.get(http_only_auth_cookie)
 
@@ -56,11 +65,13 @@ async def test_cookie_jwt(request: Request):
 
 
 @router.get("/is-authenticated")
+@max_queries(0)
 async def check_if_user_authenticated(current_user: dict = Depends(get_current_user)):
     return {"is_authenticated": True, "user_id": current_user["user_id"]}
 
 
 @router.post("/logout")
+@max_queries(2)
 async def user_logout(
     current_user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
@@ -95,6 +106,7 @@ async def user_logout(
 
 
 @router.post("/forgotten-password")
+@max_queries(2)
 async def regenerate_forgotten_password(
     email: EmailStr, session: AsyncSession = Depends(get_session)
 ):
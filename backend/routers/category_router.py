@@ -1,15 +1,17 @@
-from typing import List
+from typing import List, Optional
 
 from uuid import UUID
 from fastapi import APIRouter, Depends, Query, HTTPException
 from config.parser import load_config
 from controllers.category_controller import CategoryController
 from services.category_service import CategoryService
-from dependencies import get_session, get_current_user
+from dependencies import get_session, get_current_user, read_only
+from instrumentation import max_queries
 from schemas.schemas import (
     CategoryUpdate,
     CategoryQuery,
     CategoryToProductRequest,
+    CategoriesToProductsRequest,
     CategoryIdentifiers,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -34,6 +36,7 @@ def get_category_controller(
 
 
 @router.get("")
+@max_queries(1)
 async def get_all_categories(
         controller: CategoryController = Depends(get_category_controller),
 ):
@@ -41,6 +44,7 @@ async def get_all_categories(
 
 
 @router.get("/search/", response_model=List[CategoryQuery])
+@max_queries(1)
 async def search_categories(
         query: str = Query(...),
         controller: CategoryController = Depends(get_category_controller),
@@ -49,6 +53,7 @@ async def search_categories(
 
 
 @router.get("/product-categories/{product_id}")
+@max_queries(3)
 async def get_product_categories(
         product_id: int, controller: CategoryController = Depends(get_category_controller)
 ) -> dict:
@@ -56,6 +61,7 @@ async def get_product_categories(
 
 
 @router.get("/products-by-category/{category_id}")
+@max_queries(3)
 async def get_products_by_category(
         category_id: int, controller: CategoryController = Depends(get_category_controller)
 ):
@@ -63,18 +69,24 @@ async def get_products_by_category(
 
 
 @router.get("/sellers/{category_id}/products")
+@max_queries(1)
 async def get_seller_products_by_category(
         category_id: int,
+        limit: int = Query(50, ge=1, le=100),
+        after_id: Optional[int] = Query(None),
         current_user: dict = Depends(get_current_user),
         controller: CategoryController = Depends(get_category_controller),
 ):
     seller_id: UUID = current_user.get("user_id")
     if not seller_id:
         raise HTTPException(status_code=400, detail="Missing seller ID")
-    return await controller.get_seller_products_by_category(category_id, seller_id)
+    return await controller.get_seller_products_by_category(
+        category_id, seller_id, limit, after_id
+    )
 
 
 @router.get("/{category_id}")
+@max_queries(1)
 async def get_category_name_by_id(
         category_id: int, controller: CategoryController = Depends(get_category_controller)
 ):
@@ -82,6 +94,7 @@ async def get_category_name_by_id(
 
 
 @router.post("/new")
+@max_queries(2)
 async def add_new_category(
         category_name: CategoryUpdate,
         controller: CategoryController = Depends(get_category_controller),
@@ -89,7 +102,8 @@ async def add_new_category(
     return await controller.add_new_category(category_name)
 
 
-@router.post("/category-by-identifier")
+@router.post("/category-by-identifier", dependencies=[Depends(read_only)])
+@max_queries(1)
 async def get_category_by_identifier(
         category_identifier: CategoryIdentifiers,
         controller: CategoryController = Depends(get_category_controller),
@@ -98,6 +112,7 @@ async def get_category_by_identifier(
 
 
 @router.post("/add-category-to-product")
+@max_queries(2)
 async def add_category_to_product(
         request: CategoryToProductRequest,
         controller: CategoryController = Depends(get_category_controller),
@@ -106,7 +121,17 @@ async def add_category_to_product(
     return await controller.add_category_to_product(request)
 
 
+@router.post("/add-categories-to-products")
+@max_queries(1)
+async def add_categories_to_products(
+        request: CategoriesToProductsRequest,
+        controller: CategoryController = Depends(get_category_controller),
+):
+    return await controller.add_categories_to_products(request)
+
+
 @router.put("/edit")
+@max_queries(3)
 async def edit_category(
         category_id: int,
         category_update: CategoryUpdate,
@@ -116,6 +141,7 @@ async def edit_category(
 
 
 @router.delete("/delete-category-from-product")
+@max_queries(2)
 async def delete_category_from_product(
         request: CategoryToProductRequest,
         controller: CategoryController = Depends(get_category_controller),
@@ -123,3 +149,12 @@ async def delete_category_from_product(
     return await controller.delete_category_from_product(
         request.product_id, request.category_id
     )
+
+
+@router.delete("/delete-categories-from-products")
+@max_queries(1)
+async def delete_categories_from_products(
+        request: CategoriesToProductsRequest,
+        controller: CategoryController = Depends(get_category_controller),
+):
+    return await controller.delete_categories_from_products(request)
@@ -1,15 +1,21 @@
-from typing import List
-from fastapi import APIRouter, Depends, Body
-from dependencies import get_session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Body, Header, Request
+from config.models import CHECKOUT_POOL
+from dependencies import get_session, use_pool, use_primary
+from instrumentation import max_queries
 from schemas.schemas import CartItemForCheckout, GuestUserInfo, OrderData
 from services.checkout_service import CheckoutService
+from services.stripe_event_service import StripeEventService
+from services.idempotency_service import IdempotencyService
 from services.order_service import OrderService
 from controllers.checkout_controller import CheckoutController
+from controllers.stripe_webhook_controller import StripeWebhookController
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter(
     prefix="/checkout",
     tags=["checkout"],
+    dependencies=[Depends(use_primary), Depends(use_pool(CHECKOUT_POOL))],
     responses={500: {"Checkout": "Error when creating checkout session"}},
 )
 
@@ -26,25 +32,64 @@ def get_order_service(
     return OrderService(session)
 
 
+def get_idempotency_service(
+        session: AsyncSession = Depends(get_session),
+) -> IdempotencyService:
+    return IdempotencyService(session)
+
+
 def get_checkout_controller(
         checkout_service: CheckoutService = Depends(get_checkout_service),
         order_service: OrderService = Depends(get_order_service),
+        idempotency_service: IdempotencyService = Depends(get_idempotency_service),
 ) -> CheckoutController:
-    return CheckoutController(checkout_service, order_service)
+    return CheckoutController(checkout_service, order_service, idempotency_service)
+
+
+def get_stripe_event_service(
+        session: AsyncSession = Depends(get_session),
+) -> StripeEventService:
+    return StripeEventService(session)
+
+
+def get_stripe_webhook_controller(
+        stripe_event_service: StripeEventService = Depends(get_stripe_event_service),
+) -> StripeWebhookController:
+    return StripeWebhookController(stripe_event_service)
 
 
 @router.post("/create-checkout-session")
+@max_queries(5)
 async def create_checkout_session(
         cart_items: List[CartItemForCheckout] = Body(...),
+        guest_user_info: GuestUserInfo = Body(...),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
         controller: CheckoutController = Depends(get_checkout_controller),
 ):
-    return await controller.create_checkout_session(cart_items)
+    return await controller.create_checkout_session(
+        cart_items, guest_user_info, idempotency_key
+    )
 
 
 @router.post("/post-checkout")
+@max_queries(6)
 async def post_checkout_updates(
         orders: List[OrderData],
         guest_user_info: GuestUserInfo,
+        session_id: Optional[str] = Body(None),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
         controller: CheckoutController = Depends(get_checkout_controller),
 ):
-    return await controller.post_checkout_updates(orders, guest_user_info)
+    return await controller.post_checkout_updates(
+        orders, guest_user_info, session_id, idempotency_key
+    )
+
+
+@router.post("/webhook")
+@max_queries(1)
+async def stripe_webhook(
+        request: Request,
+        stripe_signature: Optional[str] = Header(None, alias="Stripe-Signature"),
+        controller: StripeWebhookController = Depends(get_stripe_webhook_controller),
+):
+    return await controller.receive_event(await request.body(), stripe_signature)
@@ -1,5 +1,10 @@
-from fastapi import APIRouter, Depends
-from dependencies import get_session
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Path, Query
+from config.models import CHECKOUT_POOL
+from dependencies import get_session, get_current_user, use_pool, use_primary
+from instrumentation import max_queries
 from services.order_service import OrderService
 from controllers.order_controller import OrderController
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,6 +12,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 router = APIRouter(
     prefix="/order",
     tags=["order"],
+    # Orders are read right after checkout creates them
+    dependencies=[Depends(use_primary), Depends(use_pool(CHECKOUT_POOL))],
     responses={500: {"Order": "Error with the order"}},
 )
 
@@ -21,3 +28,35 @@ def get_order_controller(
     order_service: OrderService = Depends(get_order_service),
 ) -> OrderController:
     return OrderController(order_service)
+
+
+@router.get("/mine")
+@max_queries(2)
+async def get_my_orders(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    current_user: dict = Depends(get_current_user),
+    controller: OrderController = Depends(get_order_controller),
+) -> dict:
+    user_id = UUID(str(current_user.get("user_id")))
+    return await controller.get_orders_by_user(user_id, limit, cursor)
+
+
+@router.get("/tracking/{tracking_number}")
+@max_queries(2)
+async def get_order_by_tracking_number(
+    tracking_number: str = Path(..., pattern=r"^\d{12}$"),
+    controller: OrderController = Depends(get_order_controller),
+) -> dict:
+    return await controller.get_order_by_tracking_number(tracking_number)
+
+
+@router.get("/{order_id}")
+@max_queries(2)
+async def get_order(
+    order_id: int,
+    current_user: dict = Depends(get_current_user),
+    controller: OrderController = Depends(get_order_controller),
+) -> dict:
+    user_id = UUID(str(current_user.get("user_id")))
+    return await controller.get_order_for_user(order_id, user_id)
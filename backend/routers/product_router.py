@@ -2,7 +2,8 @@ from typing import List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from dependencies import get_session
+from dependencies import get_session, read_only
+from instrumentation import max_queries
 from controllers.product_controller import ProductController
 from services.product_service import ProductService
 from services.category_service import CategoryService
@@ -41,6 +42,7 @@ def get_product_controller(
 
 
 @router.get("")
+@max_queries(1)
 async def get_all_products(
         product_controller: ProductController = Depends(get_product_controller),
 ) -> list:
@@ -48,6 +50,7 @@ async def get_all_products(
 
 
 @router.get("/products-by-seller")
+@max_queries(2)
 async def get_products_by_seller(
         seller_id: UUID,
         product_controller: ProductController = Depends(get_product_controller),
@@ -56,6 +59,7 @@ async def get_products_by_seller(
 
 
 @router.get("/seller-dashboard")
+@max_queries(2)
 async def get_seller_products_dashboard(
         seller_id: UUID,
         current_user: dict = Depends(get_current_user),
@@ -69,6 +73,7 @@ async def get_seller_products_dashboard(
 
 
 @router.get("/{product_id}")
+@max_queries(1)
 async def get_product_by_id(
         product_id: int,
         product_controller: ProductController = Depends(get_product_controller),
@@ -77,6 +82,7 @@ async def get_product_by_id(
 
 
 @router.get("/search/", response_model=List[ProductData])
+@max_queries(1)
 async def search_products(
         query: str = Query(...),
         seller_id: UUID = Query(...),
@@ -85,7 +91,8 @@ async def search_products(
     return await product_controller.search_products(query, seller_id)
 
 
-@router.post("/filter-by-price")
+@router.post("/filter-by-price", dependencies=[Depends(read_only)])
+@max_queries(1)
 async def filter_by_price_range(
         category_id: int,
         price_range: PriceFilter,
@@ -96,7 +103,8 @@ async def filter_by_price_range(
     )
 
 
-@router.post("/filter-by-material")
+@router.post("/filter-by-material", dependencies=[Depends(read_only)])
+@max_queries(1)
 async def filter_by_material(
         category_id: int,
         materials: MaterialsFilter,
@@ -105,7 +113,8 @@ async def filter_by_material(
     return await product_controller.filter_by_material(category_id, materials)
 
 
-@router.post("/filter-by-seller")
+@router.post("/filter-by-seller", dependencies=[Depends(read_only)])
+@max_queries(1)
 async def filter_by_seller(
         category_id: int,
         seller_id: UUID,
@@ -114,7 +123,8 @@ async def filter_by_seller(
     return await product_controller.filter_by_seller(category_id, seller_id)
 
 
-@router.post("/filter-by-material-price-and-seller")
+@router.post("/filter-by-material-price-and-seller", dependencies=[Depends(read_only)])
+@max_queries(1)
 async def filter_products_by_material_and_price(
         filters: ProductFilterRequest,
         product_controller: ProductController = Depends(get_product_controller),
@@ -125,6 +135,7 @@ async def filter_products_by_material_and_price(
 
 
 @router.post("/new")
+@max_queries(3)
 async def add_new_product(
         product: ProductData,
         current_user: dict = Depends(get_current_user),
@@ -137,6 +148,7 @@ async def add_new_product(
 
 
 @router.post("/upload-image")
+@max_queries(2)
 async def upload_image(
         product_id: int,
         image_number: int,
@@ -150,6 +162,7 @@ async def upload_image(
 
 
 @router.put("/edit")
+@max_queries(2)
 async def edit_product(
         product_id: int,
         product: ProductUpdate,
@@ -163,6 +176,7 @@ async def edit_product(
 
 
 @router.delete("/delete/{product_id}")
+@max_queries(5)
 async def delete_product(
         product_id: int,
         current_user: dict = Depends(get_current_user),
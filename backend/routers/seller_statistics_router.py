@@ -1,8 +1,10 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from dependencies import get_session, get_current_user
-from schemas.schemas import SelectedMonthForSellerStatistics
+from config.models import ANALYTICS_POOL
+from dependencies import get_session, get_current_user, read_only, use_pool
+from instrumentation import max_queries
+from schemas.schemas import SelectedMonthForSellerStatistics, SellerStatisticsRange
 from services.seller_statistics_service import SellerStatisticsService
 from controllers.seller_statistics_controller import SellerStatisticsController
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,11 +12,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 router = APIRouter(
     prefix="/seller-statistics",
     tags=["seller-statistics"],
+    dependencies=[Depends(read_only), Depends(use_pool(ANALYTICS_POOL))],
     responses={500: {"Seller Statistics": "Error when fetching Seller statistics"}},
 )
 
 
 @router.post("/get-monthly-transactions")
+@max_queries(2)
 async def get_monthly_transactions(
     selected_date: SelectedMonthForSellerStatistics,
     current_user: dict = Depends(get_current_user),
@@ -29,3 +33,18 @@ async def get_monthly_transactions(
         return await controller.get_monthly_transactions(seller_id, selected_date)
     except HTTPException as e:
         raise e
+
+
+@router.post("/get-transactions-by-month")
+@max_queries(2)
+async def get_transactions_by_month(
+    statistics_range: SellerStatisticsRange,
+    current_user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    service = SellerStatisticsService(session)
+    controller = SellerStatisticsController(service)
+    seller_id: UUID = current_user.get("user_id")
+    if not seller_id:
+        raise HTTPException(status_code=400, detail="Missing seller ID")
+    return await controller.get_transactions_by_month(seller_id, statistics_range)
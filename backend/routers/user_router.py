@@ -3,6 +3,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Query
 from pydantic import EmailStr
 from dependencies import get_session, get_current_user
+from instrumentation import max_queries
 from controllers.user_controller import UserController
 from services.user_service import UserService
 from schemas.schemas import UserCreate, UserUpdate, UserVerification
@@ -24,6 +25,7 @@ def get_user_controller(
 
 
 @router.get("")
+@max_queries(1)
 async def get_all_users(
     user_controller: UserController = Depends(get_user_controller),
 ) -> list:
@@ -31,6 +33,7 @@ async def get_all_users(
 
 
 @router.get("/by-type")
+@max_queries(1)
 async def get_users_by_type(
     is_seller: bool = Query(...),
     user_controller: UserController = Depends(get_user_controller),
@@ -39,6 +42,7 @@ async def get_users_by_type(
 
 
 @router.get("/sellers/search")
+@max_queries(1)
 async def search_sellers(
     user_controller: UserController = Depends(get_user_controller),
     query: str = Query(...),
@@ -47,6 +51,7 @@ async def search_sellers(
 
 
 @router.get("/{user_id}")
+@max_queries(1)
 async def get_user_by_id(
     user_id: str, user_controller: UserController = Depends(get_user_controller)
 ) -> dict:
@@ -54,6 +59,7 @@ async def get_user_by_id(
 
 
 @router.get("/sellers/{seller_id}")
+@max_queries(1)
 async def get_seller(
     seller_id, user_controller: UserController = Depends(get_user_controller)
 ) -> dict:
@@ -61,6 +67,7 @@ async def get_seller(
 
 
 @router.post("")
+@max_queries(1)
 async def create_new_user(
     user: UserCreate, user_controller: UserController = Depends(get_user_controller)
 ) -> dict:
@@ -68,6 +75,7 @@ async def create_new_user(
 
 
 @router.post("/verification")
+@max_queries(2)
 async def verify_user(
     verification: UserVerification,
     user_controller: UserController = Depends(get_user_controller),
@@ -76,6 +84,7 @@ async def verify_user(
 
 
 @router.post("/verification/resend")
+@max_queries(1)
 async def resend_verification(
     email: EmailStr, user_controller: UserController = Depends(get_user_controller)
 ) -> dict:
@@ -83,6 +92,7 @@ async def resend_verification(
 
 
 @router.put("/me")
+@max_queries(3)
 async def edit_user(
     user_update: UserUpdate,
     current_user: dict = Depends(get_current_user),
@@ -93,7 +103,9 @@ async def edit_user(
     return await user_controller.edit_user(user_id, user_update)
 
 
+# The ORM cascade loads the products, reservations and orders of a seller one by one
 @router.delete("/me")
+@max_queries(17)
 async def delete_user(
     current_user: dict = Depends(get_current_user),
     user_controller: UserController = Depends(get_user_controller),
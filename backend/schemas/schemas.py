@@ -126,6 +126,12 @@ class CategoryToProductRequest(BaseModel):
     category_id: int
 
 
+class CategoriesToProductsRequest(BaseModel):
+    # Every product is linked to or unlinked from every category
+    product_ids: Annotated[List[int], Field(min_length=1, max_length=10000)]
+    category_ids: Annotated[List[int], Field(min_length=1, max_length=100)]
+
+
 class CartItemForCheckout(BaseModel):
     id: int
     name: str
@@ -164,6 +170,14 @@ class SelectedMonthForSellerStatistics(BaseModel):
     month: str
 
 
+class SellerStatisticsRange(BaseModel):
+    from_date: Optional[SelectedMonthForSellerStatistics] = None
+    to_date: Optional[SelectedMonthForSellerStatistics] = None
+    # Overrides from_date and to_date with the months up to the current one
+    trailing_months: Optional[Annotated[int, Field(ge=1, le=36)]] = None
+    compare_previous_year: bool = False
+
+
 class OrderData(BaseModel):
     product_id: int
     price: float
@@ -171,9 +185,11 @@ class OrderData(BaseModel):
 
 
 class GuestUserInfo(BaseModel):
+    # Sent along as Stripe checkout session metadata, whose values are limited to
+    # 500 characters
     user_id: Optional[UUID] = None
-    first_name: str
-    last_name: str
+    first_name: Annotated[str, Field(max_length=500)]
+    last_name: Annotated[str, Field(max_length=500)]
     email: EmailStr
-    phone: str
-    shipping_address: str
+    phone: Annotated[str, Field(max_length=500)]
+    shipping_address: Annotated[str, Field(max_length=500)]
@@ -1,10 +1,16 @@
-from typing import List
-from sqlalchemy.exc import SQLAlchemyError
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import Integer, any_, bindparam, delete, event, true
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import status
 
 from config.logger_config import get_logger
+from loaders import get_loaders
 from models.models import Product, Category, ProductCategory
 from sqlalchemy.orm import selectinload
 from sqlalchemy import or_
@@ -18,6 +24,88 @@ from dependencies import (
 from schemas.schemas import CategoryUpdate, CategoryQuery
 
 
+SELLER_PRODUCT_COLUMNS = (
+    Product.id,
+    Product.seller_id,
+    Product.name,
+    Product.description,
+    Product.price,
+    Product.stock_quantity,
+    Product.material,
+    Product.color,
+    Product.image_path,
+    Product.image_path2,
+)
+# Constraints whose violations add_category_to_product reports to the caller
+PRODUCT_CATEGORY_PRODUCT_FK = "product_category_product_id_fkey"
+PRODUCT_CATEGORY_CATEGORY_FK = "product_category_category_id_fkey"
+UNIQUE_VIOLATION = "23505"
+CATEGORY_NAMES_TTL_SECONDS = 60
+# Lookups of unknown ids reload the map at most this often
+CATEGORY_NAMES_MISS_RELOAD_SECONDS = 1
+
+
+class CategoryNameCache:
+    """
+    The category id to name map of the whole category table, kept in process and
+    loaded with one query.
+
+    Category writes bump ``version`` once their transaction commits, and the map is
+    reloaded on the next lookup after the version moved. The TTL bounds how long
+    writes made by other processes stay unseen; a lookup of an unknown id reloads
+    the map early.
+    """
+
+    def __init__(self, ttl_seconds: float = CATEGORY_NAMES_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._names: Dict[int, str] = {}
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self.version += 1
+
+    def invalidate_on_commit(self, session: AsyncSession) -> None:
+        event.listen(
+            session.sync_session,
+            "after_commit",
+            lambda _: self.invalidate(),
+            once=True,
+        )
+
+    def _is_fresh(self, category_ids: List[int]) -> bool:
+        age = time.monotonic() - self._loaded_at
+        if self._loaded_version != self.version or age >= self.ttl_seconds:
+            return False
+        return age < CATEGORY_NAMES_MISS_RELOAD_SECONDS or all(
+            category_id in self._names for category_id in category_ids
+        )
+
+    async def get_names(
+        self, session: AsyncSession, category_ids: Iterable[int] = ()
+    ) -> Dict[int, str]:
+        category_ids = list(category_ids)
+        if self._is_fresh(category_ids):
+            return self._names
+
+        async with self._lock:
+            # Another lookup may have reloaded the map while this one waited
+            if not self._is_fresh(category_ids):
+                version = self.version
+                result = await session.execute(
+                    select(Category.id, Category.category_name)
+                )
+                self._names = dict(result.all())
+                self._loaded_version = version
+                self._loaded_at = time.monotonic()
+        return self._names
+
+
+category_names = CategoryNameCache()
+
+
 class CategoryService:
 
     def __init__(self, session: AsyncSession):
@@ -40,14 +128,7 @@ class CategoryService:
 
     async def get_category_by_id(self, category_id: int) -> dict | None:
         try:
-            stmt = select(Category).where(Category.id == category_id)
-            result = await self.db.execute(stmt)
-            category: Category = result.scalar_one_or_none()
-
-            if not category:
-                return None
-
-            return db_model_to_dict(category)
+            return await get_loaders(self.db).categories.load(category_id)
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in get_category_name_by_id: {e}")
             raise CategoryException(
@@ -55,6 +136,23 @@ class CategoryService:
                 detail="An error occurred when accessing the database",
             )
 
+    async def resolve_names(self, category_ids: Iterable[int]) -> Dict[int, str]:
+        """Map category ids to their names. Unknown ids are left out."""
+        category_ids = set(category_ids)
+        try:
+            names = await category_names.get_names(self.db, category_ids)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in resolve_names: {e}")
+            raise CategoryException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+        return {
+            category_id: names[category_id]
+            for category_id in category_ids
+            if category_id in names
+        }
+
     async def get_category_by_name(self, category_name: str) -> dict | None:
         try:
             stmt = select(Category).where(Category.category_name == category_name)
@@ -178,26 +276,100 @@ class CategoryService:
                 detail="An error occurred when accessing the database!",
             )
 
-    async def add_category_to_product(self, product_id: int, category_id: int):
+    async def get_seller_products_by_category(
+        self,
+        category_id: int,
+        seller_id: UUID,
+        limit: int = 50,
+        after_id: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Return a page of the seller's products in the category, ordered by id. The
+        next page starts after the last returned id.
+        """
         try:
-            stmt = select(ProductCategory).where(
-                ProductCategory.product_id == product_id,
-                ProductCategory.category_id == category_id,
+            in_category = (
+                select(ProductCategory.id)
+                .where(
+                    ProductCategory.category_id == category_id,
+                    ProductCategory.product_id == Product.id,
+                )
+                .exists()
+            )
+            page = (
+                select(*SELLER_PRODUCT_COLUMNS)
+                .where(Product.seller_id == seller_id, in_category)
+                .order_by(Product.id)
+                .limit(limit)
+            )
+            if after_id is not None:
+                page = page.where(Product.id > after_id)
+            page = page.subquery()
+            # Joined from the category, so an empty page still returns a row with
+            # no product, and an unknown category returns no row at all
+            stmt = (
+                select(page)
+                .select_from(Category)
+                .outerjoin(page, true())
+                .where(Category.id == category_id)
+                .order_by(page.c.id)
             )
             result = await self.db.execute(stmt)
-            link = result.scalar_one_or_none()
+            rows = result.mappings().all()
 
-            if link:
-                return {"message": "This category is already linked to the product."}
-
-            new_association = ProductCategory(
-                product_id=product_id, category_id=category_id
+            if not rows:
+                raise CategoryException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Category with id {category_id} not found!",
+                )
+            return [dict(row) for row in rows if row["id"] is not None]
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in get_seller_products_by_category: {e}")
+            raise CategoryException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
             )
-            self.db.add(new_association)
 
-            await self.db.commit()
+    async def add_category_to_product(self, product_id: int, category_id: int):
+        try:
+            result = await self.db.execute(
+                insert(ProductCategory)
+                .values(product_id=product_id, category_id=category_id)
+                .on_conflict_do_nothing(
+                    index_elements=[
+                        ProductCategory.product_id,
+                        ProductCategory.category_id,
+                    ]
+                )
+                .returning(ProductCategory.id)
+            )
+            if result.scalar_one_or_none() is None:
+                return {"message": "This category is already linked to the product."}
             return {"message": "Category added to the product successfully."}
 
+        except IntegrityError as e:
+            # The asyncpg error behind the driver's names the violated constraint
+            constraint = getattr(e.orig.__cause__, "constraint_name", None)
+            if constraint == PRODUCT_CATEGORY_PRODUCT_FK:
+                raise ProductException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Product with id {product_id} not found!",
+                )
+            if constraint == PRODUCT_CATEGORY_CATEGORY_FK:
+                raise CategoryException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Category with id {category_id} not found!",
+                )
+            if getattr(e.orig, "sqlstate", None) == UNIQUE_VIOLATION:
+                raise CategoryException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="This category is already linked to the product.",
+                )
+            self.logger.error(f"Integrity error in add_category_to_product: {e}")
+            raise CategoryException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database.",
+            )
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in add_category_to_product: {e}")
             raise CategoryException(
@@ -205,6 +377,63 @@ class CategoryService:
                 detail="An error occurred when accessing the database.",
             )
 
+    async def add_categories_to_products(
+        self, product_ids: List[int], category_ids: List[int]
+    ) -> int:
+        """
+        Link every product to every category in one statement and return how many
+        links were added. Existing links and unknown ids are skipped.
+        """
+        try:
+            pairs = select(Product.id, Category.id).where(
+                Product.id
+                == any_(bindparam("product_ids", product_ids, type_=ARRAY(Integer))),
+                Category.id
+                == any_(bindparam("category_ids", category_ids, type_=ARRAY(Integer))),
+            )
+            result = await self.db.execute(
+                insert(ProductCategory)
+                .from_select(["product_id", "category_id"], pairs)
+                .on_conflict_do_nothing(
+                    index_elements=[
+                        ProductCategory.product_id,
+                        ProductCategory.category_id,
+                    ]
+                )
+            )
+            return result.rowcount
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in add_categories_to_products: {e}")
+            raise CategoryException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def delete_categories_from_products(
+        self, product_ids: List[int], category_ids: List[int]
+    ) -> int:
+        """Unlink every product from every category and return how many links went."""
+        try:
+            result = await self.db.execute(
+                delete(ProductCategory).where(
+                    ProductCategory.product_id
+                    == any_(
+                        bindparam("product_ids", product_ids, type_=ARRAY(Integer))
+                    ),
+                    ProductCategory.category_id
+                    == any_(
+                        bindparam("category_ids", category_ids, type_=ARRAY(Integer))
+                    ),
+                )
+            )
+            return result.rowcount
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in delete_categories_from_products: {e}")
+            raise CategoryException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
     async def delete_category_from_product(self, product_id: int, category_id: int):
         try:
             stmt = select(ProductCategory).where(
@@ -233,9 +462,11 @@ class CategoryService:
             category = Category()
             category.category_name = category_name.lower()
             self.db.add(category)
+            await self.db.flush()
+            category_id = category.id
             await self.db.commit()
-            await self.db.refresh(instance=category, attribute_names=["id"])
-            return category.id
+            category_names.invalidate()
+            return category_id
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in add_new_category: {e}")
             raise CategoryException(
@@ -256,11 +487,8 @@ class CategoryService:
                 )
             if is_valid_update(category_update.category_name, category.category_name):
                 category.category_name = category_update.category_name
-            if is_valid_update(
-                category_update.category_description, category.category_description
-            ):
-                category.category_description = category_update.category_description
             self.db.add(category)
+            category_names.invalidate_on_commit(self.db)
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in edit_category: {e}")
             raise CategoryException(
@@ -1,67 +1,182 @@
 import json
-from typing import List
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.future import select
-from sqlalchemy import update
+from sqlalchemy import Integer, any_, bindparam, func, update
 
 from config.logger_config import get_logger
-from schemas.schemas import CartItemForCheckout, OrderData
-from config.parser import load_config
+from schemas.schemas import CartItemForCheckout, GuestUserInfo, OrderData
+from dependencies import get_config
 from models.models import Product
 from exceptions.product_exceptions import ProductException
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import status
 from services.product_service import ProductService
-import stripe
+from services.reservation_service import StockReservationService
+from services.stripe_gateway import StripeGateway, get_stripe_gateway
+
+STRIPE_METADATA_VALUE_LIMIT = 500
+# Stripe rejects checkout sessions that expire in under 30 minutes, counted when it
+# receives the request, so the expiry is sent with some room for the round trip
+STRIPE_EXPIRY_MARGIN = timedelta(minutes=1)
+GUEST_USER_INFO_FIELDS = (
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "shipping_address",
+)
+
+
+def encode_order_metadata(
+    orders: List[OrderData], guest_user_info: GuestUserInfo
+) -> dict:
+    """
+    Encode an order as Stripe checkout session metadata, so the webhook consumer
+    can create it without relying on the browser. Order lines are written as
+    ``product_id:quantity:price`` joined by ``;`` and split over ``order_lines_<n>``
+    keys to stay under Stripe's per-value limit.
+    """
+    metadata = {
+        field: getattr(guest_user_info, field) for field in GUEST_USER_INFO_FIELDS
+    }
+    if guest_user_info.user_id:
+        metadata["user_id"] = str(guest_user_info.user_id)
+
+    chunks = [""]
+    for order in orders:
+        line = f"{order.product_id}:{order.quantity}:{order.price}"
+        if len(chunks[-1]) + len(line) + 1 > STRIPE_METADATA_VALUE_LIMIT:
+            chunks.append("")
+        chunks[-1] = f"{chunks[-1]};{line}" if chunks[-1] else line
+
+    for index, chunk in enumerate(chunks):
+        metadata[f"order_lines_{index}"] = chunk
+    return metadata
+
+
+def decode_order_metadata(metadata: dict) -> Tuple[List[OrderData], GuestUserInfo]:
+    orders = []
+    index = 0
+    while metadata.get(f"order_lines_{index}"):
+        for line in metadata[f"order_lines_{index}"].split(";"):
+            product_id, quantity, price = line.split(":")
+            orders.append(
+                OrderData(product_id=product_id, quantity=quantity, price=price)
+            )
+        index += 1
+
+    guest_user_info = GuestUserInfo(
+        user_id=metadata.get("user_id") or None,
+        **{field: metadata[field] for field in GUEST_USER_INFO_FIELDS},
+    )
+    return orders, guest_user_info
 
 
 class CheckoutService:
 
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        stripe_gateway: StripeGateway | None = None,
+        reservation_service: StockReservationService | None = None,
+    ):
         self.db = session
+        self.stripe_gateway = stripe_gateway or get_stripe_gateway()
         self.product_service = ProductService(session)
+        self.reservation_service = reservation_service or StockReservationService(
+            session
+        )
         self.logger = get_logger(__name__)
 
-    async def update_stock_quantity(self, orders: List[OrderData]) -> None:
+    async def update_stock_quantity(
+        self, orders: List[OrderData], checkout_session_id: Optional[str] = None
+    ) -> None:
+        quantities = dict()
+        for order in orders:
+            quantities[order.product_id] = (
+                quantities.get(order.product_id, 0) + order.quantity
+            )
+
         try:
-            for order in orders:
-                stmt = select(Product).where(Product.id == order.product_id)
-                result = await self.db.execute(stmt)
-                product = result.scalars().first()
-
-                if product is None:
-                    raise ProductException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"No product found with id {order.product_id}",
-                    )
-
-                if product.stock_quantity < order.quantity:
-                    raise ProductException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Insufficient stock for product {product.id}. "
-                        f"Requested: {order.quantity}, Available: {product.stock_quantity}",
-                    )
-
-            for order in orders:
-                update_stmt = (
-                    update(Product)
-                    .where(Product.id == order.product_id)
-                    .values(stock_quantity=Product.stock_quantity - order.quantity)
+            # One conditional UPDATE for the whole cart: a row is only decremented if
+            # it still has enough stock, so there is no read-then-write race and no
+            # per-item round trip
+            product_ids = sorted(quantities)
+            lines = (
+                func.unnest(
+                    bindparam("product_ids", product_ids, type_=ARRAY(Integer)),
+                    bindparam(
+                        "quantities",
+                        [quantities[product_id] for product_id in product_ids],
+                        type_=ARRAY(Integer),
+                    ),
                 )
-                await self.db.execute(update_stmt)
+                .table_valued("product_id", "quantity")
+                .render_derived()
+            )
+            stmt = (
+                update(Product)
+                .where(
+                    Product.id == lines.c.product_id,
+                    Product.stock_quantity >= lines.c.quantity,
+                )
+                .values(stock_quantity=Product.stock_quantity - lines.c.quantity)
+                .returning(Product.id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            updated_ids = set(result.scalars().all())
 
-            await self.db.commit()
+            if len(updated_ids) < len(quantities):
+                await self._raise_for_unavailable_stock(
+                    {
+                        product_id: quantity
+                        for product_id, quantity in quantities.items()
+                        if product_id not in updated_ids
+                    }
+                )
+
+            # The sold units are now gone from stock_quantity, so the holds taken
+            # when the checkout session was created must not be counted twice
+            if checkout_session_id:
+                await self.reservation_service.consume_reservations(checkout_session_id)
 
         except SQLAlchemyError as e:
-            await self.db.rollback()
             self.logger.error(f"Database error in update_stock_quantity: {e}")
             raise ProductException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="An error occurred when accessing the database!",
             )
 
-    async def create_checkout_session(self, cart_items: List[CartItemForCheckout]):
-        stripe.api_key = load_config().auth_config.stripe_secret_key
+    async def _raise_for_unavailable_stock(self, quantities: Dict[int, int]) -> None:
+        stmt = select(Product.id, Product.stock_quantity).where(
+            Product.id
+            == any_(bindparam("product_ids", list(quantities), type_=ARRAY(Integer)))
+        )
+        result = await self.db.execute(stmt)
+        stock = {
+            product_id: stock_quantity for product_id, stock_quantity in result.all()
+        }
+
+        for product_id, quantity in sorted(quantities.items()):
+            if product_id not in stock:
+                raise ProductException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"No product found with id {product_id}",
+                )
+            if stock[product_id] < quantity:
+                raise ProductException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Insufficient stock for product {product_id}. "
+                    f"Requested: {quantity}, Available: {stock[product_id]}",
+                )
+
+    async def create_checkout_session(
+        self, cart_items: List[CartItemForCheckout], guest_user_info: GuestUserInfo
+    ):
         metadata_dict = {
             "product_quantities": {},
             "product_categories": {},
@@ -73,10 +188,14 @@ class CheckoutService:
         product_quantities = dict()
         product_categories = dict()
         seller_ids = list()
+        reserved_quantities = dict()
 
         # Validation
+        products = await self.product_service.get_products_by_ids(
+            [item.id for item in cart_items]
+        )
         for item in cart_items:
-            product = await self.product_service.get_product_by_id(item.id)
+            product = products.get(item.id)
 
             if not product:
                 raise ProductException(
@@ -91,12 +210,6 @@ class CheckoutService:
                     detail=f"Price mismatch for product {item.name}",
                 )
 
-            if product.get("stock_quantity") < item.quantity:
-                raise ProductException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient stock for {item.name}",
-                )
-
             stripe_amount = int(actual_price * 100)
 
             validated_line_items.append(
@@ -117,27 +230,65 @@ class CheckoutService:
                 product_id=product["id"], price=product["price"], quantity=item.quantity
             )
             order_data_list.append(order_data)
+            reserved_quantities[product["id"]] = (
+                reserved_quantities.get(product["id"], 0) + item.quantity
+            )
 
             if item.name not in product_quantities:
                 product_quantities[item.name] = item.quantity
 
-            if item.category not in product_categories:
-                product_categories[item.category] = item.quantity
-            else:
-                product_categories[item.category] += item.quantity
+            for category_id in item.category:
+                product_categories[category_id] = (
+                    product_categories.get(category_id, 0) + item.quantity
+                )
 
         metadata_dict["product_quantities"] = json.dumps(product_quantities)
         metadata_dict["product_categories"] = json.dumps(product_categories)
         metadata_dict["seller_id"] = ", ".join(seller_ids)
 
-        checkout_session = stripe.checkout.Session.create(
-            line_items=validated_line_items,
-            payment_intent_data={
-                "metadata": metadata_dict,
-            },
-            mode="payment",
-            success_url=load_config().server_config.frontend_domain + "?success=true",
-            cancel_url=load_config().server_config.frontend_domain + "?canceled=true",
+        # Stock is checked here, net of the other checkouts' holds. The holds are
+        # committed before calling Stripe so the counter rows are not locked for the
+        # duration of the request and other checkouts see them immediately
+        reservation = await self.reservation_service.reserve_items(reserved_quantities)
+        await self.db.commit()
+
+        try:
+            frontend_domain = get_config().server_config.customer_frontend_domain
+            checkout_session = await self.stripe_gateway.create_checkout_session(
+                {
+                    "line_items": validated_line_items,
+                    "payment_intent_data": {
+                        "metadata": metadata_dict,
+                    },
+                    "metadata": encode_order_metadata(order_data_list, guest_user_info),
+                    "customer_email": guest_user_info.email,
+                    "mode": "payment",
+                    "expires_at": int(
+                        (
+                            datetime.now()
+                            + timedelta(
+                                minutes=self.reservation_service.config.ttl_minutes
+                            )
+                            + STRIPE_EXPIRY_MARGIN
+                        ).timestamp()
+                    ),
+                    "success_url": frontend_domain + "?success=true",
+                    "cancel_url": frontend_domain + "?canceled=true",
+                }
+            )
+        except Exception:
+            await self.reservation_service.release_reservations(
+                reservation["reservation_ids"]
+            )
+            await self.db.commit()
+            raise
+
+        await self.reservation_service.attach_checkout_session(
+            reservation["reservation_ids"], checkout_session["id"]
         )
         print(f"SERVICE SESSION ID: {checkout_session['id']}")
-        return {"session_id": checkout_session["id"], "order_data": order_data_list}
+        return {
+            "session_id": checkout_session["id"],
+            "order_data": order_data_list,
+            "reserved_until": reservation["expires_at"].isoformat(),
+        }
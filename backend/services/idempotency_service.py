@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import LRUCache
+from config.logger_config import get_logger
+from exceptions.idempotency_exceptions import IdempotencyException
+from models.models import IdempotencyKey
+
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+MAX_CACHED_RESPONSES = 10_000
+
+# Process-wide front cache of completed responses and of the requests currently
+# running in this process, both keyed by Idempotency-Key
+completed_responses = LRUCache(
+    maxsize=MAX_CACHED_RESPONSES, ttl_seconds=IDEMPOTENCY_KEY_TTL.total_seconds()
+)
+in_flight_requests: Dict[str, asyncio.Future] = dict()
+
+
+def hash_request(payload: Any) -> str:
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Makes a request safe to retry: the first response for an Idempotency-Key is
+    stored in the idempotency_key table, committed together with the request's own
+    changes, and replayed for every later request with the same key.
+
+    Duplicates arriving while the first request is still running in this process
+    wait for its result instead of doing the work again. In other processes the
+    primary key insert blocks until the first transaction finishes.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.db = session
+        self.logger = get_logger(__name__)
+
+    async def run(
+        self,
+        key: str,
+        endpoint: str,
+        payload: Any,
+        handler: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        request_hash = hash_request(payload)
+
+        while True:
+            stored = completed_responses.get(key)
+            if stored is not None:
+                return self._replay(stored, endpoint, request_hash)
+
+            in_flight = in_flight_requests.get(key)
+            if in_flight is None:
+                break
+            # A failed first attempt resolves to None and the duplicate retries it
+            stored = await asyncio.shield(in_flight)
+            if stored is not None:
+                return self._replay(stored, endpoint, request_hash)
+
+        future = asyncio.get_running_loop().create_future()
+        in_flight_requests[key] = future
+        stored = None
+        try:
+            stored = await self._claim(key, endpoint, request_hash)
+            if stored is not None:
+                return self._replay(stored, endpoint, request_hash)
+
+            try:
+                response_body = jsonable_encoder(await handler())
+                await self._complete(key, response_body)
+                await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                await self._release(key)
+                raise
+
+            stored = {
+                "endpoint": endpoint,
+                "request_hash": request_hash,
+                "response_body": response_body,
+            }
+            return response_body
+        finally:
+            if stored is not None:
+                completed_responses.set(key, stored)
+            in_flight_requests.pop(key, None)
+            future.set_result(stored)
+
+    async def delete_expired_keys(self) -> int:
+        try:
+            stmt = delete(IdempotencyKey).where(
+                IdempotencyKey.created_at < datetime.now() - IDEMPOTENCY_KEY_TTL
+            )
+            result = await self.db.execute(stmt)
+            return result.rowcount
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in delete_expired_keys: {e}")
+            raise IdempotencyException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    def _replay(self, stored: dict, endpoint: str, request_hash: str) -> Any:
+        if stored["endpoint"] != endpoint or stored["request_hash"] != request_hash:
+            raise IdempotencyException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="This Idempotency-Key was already used with a different request",
+            )
+        return stored["response_body"]
+
+    async def _claim(self, key: str, endpoint: str, request_hash: str) -> dict | None:
+        """
+        Insert the key, or return the stored response if an earlier request with
+        the same key has completed.
+        """
+        try:
+            stmt = (
+                insert(IdempotencyKey)
+                .values(
+                    key=key,
+                    endpoint=endpoint,
+                    request_hash=request_hash,
+                    created_at=datetime.now(),
+                )
+                .on_conflict_do_nothing(index_elements=[IdempotencyKey.key])
+                .returning(IdempotencyKey.key)
+            )
+            result = await self.db.execute(stmt)
+            if result.scalar_one_or_none() is not None:
+                return None
+
+            result = await self.db.execute(
+                select(
+                    IdempotencyKey.endpoint,
+                    IdempotencyKey.request_hash,
+                    IdempotencyKey.response_body,
+                    IdempotencyKey.completed_at,
+                ).where(IdempotencyKey.key == key)
+            )
+            existing = result.one_or_none()
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in _claim: {e}")
+            raise IdempotencyException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+        if existing is None or existing.completed_at is None:
+            raise IdempotencyException()
+        return {
+            "endpoint": existing.endpoint,
+            "request_hash": existing.request_hash,
+            "response_body": existing.response_body,
+        }
+
+    async def _complete(self, key: str, response_body: Any) -> None:
+        stmt = (
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(response_body=response_body, completed_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(stmt)
+
+    async def _release(self, key: str) -> None:
+        """
+        Forget a key whose request failed, so a retry runs it again. The claim can
+        already be committed if the handler committed part of its work.
+        """
+        try:
+            await self.db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.key == key, IdempotencyKey.completed_at.is_(None)
+                )
+            )
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in _release: {e}")
+            await self.db.rollback()
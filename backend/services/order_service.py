@@ -1,39 +1,85 @@
+import base64
+import json
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Tuple
+from uuid import UUID
 
+from sqlalchemy import Float, Integer, any_, bindparam, func, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import status
 
+from cache import LRUCache
 from config.logger_config import get_logger
-from dependencies import db_model_to_dict, generate_random_12_digit_number
+from dependencies import db_model_to_dict
 from exceptions.order_exceptions import OrderException
 from models.models import Order, OrderItem
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
 
 from schemas.schemas import OrderData, GuestUserInfo
+from services.seller_rollup_service import SellerRollupService
+from services.tracking_number_service import (
+    TrackingNumberGenerator,
+    get_tracking_number_generator,
+)
+
+MAX_ORDER_HISTORY_PAGE_SIZE = 100
+
+# Orders past checkout only change through update_order_status, which evicts them,
+# so they are served from memory. The TTL bounds how long another worker's status
+# change can go unnoticed
+CACHEABLE_ORDER_STATUSES = frozenset({"confirmed", "shipped", "delivered", "cancelled"})
+order_cache = LRUCache(maxsize=10_000, ttl_seconds=300)
+
+
+def encode_order_cursor(created_at: datetime, order_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), order_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_order_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, order_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, TypeError):
+        raise OrderException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor!"
+        )
 
 
 class OrderService:
 
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        tracking_numbers: TrackingNumberGenerator | None = None,
+    ):
         self.db = session
+        self.tracking_numbers = tracking_numbers or get_tracking_number_generator()
+        self.rollups = SellerRollupService(session)
         self.logger = get_logger(__name__)
 
     async def get_order_by_id(self, order_id: int) -> dict:
+        cached = order_cache.get(order_id)
+        if cached is not None:
+            return cached
+
         try:
             stmt = (
                 select(Order)
-                .options(joinedload(Order.items))
+                .options(selectinload(Order.items))
                 .where(Order.id == order_id)
             )
             result = await self.db.execute(stmt)
-            order: Order = result.unique().scalars().first()
+            order: Order = result.scalars().first()
 
             if order:
                 order_dict = db_model_to_dict(order)
                 order_dict["items"] = [db_model_to_dict(item) for item in order.items]
+                if order.status in CACHEABLE_ORDER_STATUSES:
+                    order_cache.set(order_id, order_dict)
                 return order_dict
             else:
                 raise OrderException(
@@ -47,40 +93,248 @@ class OrderService:
                 detail="An error occurred when accessing the database!",
             )
 
+    async def get_order_by_tracking_number(self, tracking_number: str) -> dict:
+        """
+        Public tracking view of an order: its status and items, without the
+        customer's personal details.
+        """
+        try:
+            stmt = (
+                select(Order)
+                .options(selectinload(Order.items))
+                .where(Order.tracking_number == tracking_number)
+            )
+            result = await self.db.execute(stmt)
+            order: Order = result.scalars().first()
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in get_order_by_tracking_number: {e}")
+            raise OrderException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+        if order is None:
+            raise OrderException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Order with tracking number {tracking_number} not found!",
+            )
+        return {
+            "tracking_number": order.tracking_number,
+            "status": order.status,
+            "created_at": str(order.created_at),
+            "items": [
+                {"product_id": item.product_id, "quantity": item.quantity}
+                for item in order.items
+            ],
+        }
+
+    async def update_order_status(self, order_id: int, new_status: str) -> None:
+        try:
+            stmt = (
+                update(Order)
+                .where(Order.id == order_id)
+                .values(status=new_status)
+                .returning(Order.id)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            if result.scalar_one_or_none() is None:
+                raise OrderException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Order with id {order_id} not found!",
+                )
+            order_cache.pop(order_id)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in update_order_status: {e}")
+            raise OrderException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def get_orders_by_user(
+        self, user_id: UUID, limit: int = 20, cursor: Optional[str] = None
+    ) -> dict:
+        """
+        Return one page of a user's orders, newest first, with their items and
+        totals. Pages are keyed by the (created_at, id) of the last order of the
+        previous page, so every page costs the same however deep it is.
+        """
+        limit = min(limit, MAX_ORDER_HISTORY_PAGE_SIZE)
+        try:
+            total = (
+                select(
+                    func.coalesce(
+                        func.sum(OrderItem.price_at_purchase * OrderItem.quantity), 0
+                    )
+                )
+                .where(OrderItem.order_id == Order.id)
+                .scalar_subquery()
+                .label("total")
+            )
+            stmt = (
+                select(
+                    Order.id,
+                    Order.created_at,
+                    Order.status,
+                    Order.tracking_number,
+                    total,
+                )
+                .where(Order.user_id == user_id)
+                .order_by(Order.created_at.desc(), Order.id.desc())
+                .limit(limit + 1)
+            )
+            if cursor:
+                created_at, order_id = decode_order_cursor(cursor)
+                stmt = stmt.where(
+                    tuple_(Order.created_at, Order.id) < tuple_(created_at, order_id)
+                )
+            result = await self.db.execute(stmt)
+            rows = result.all()
+
+            page, has_more = rows[:limit], len(rows) > limit
+            orders = [
+                {
+                    "id": row.id,
+                    "created_at": str(row.created_at),
+                    "status": row.status,
+                    "tracking_number": row.tracking_number,
+                    "total": row.total,
+                    "items": [],
+                }
+                for row in page
+            ]
+
+            if orders:
+                orders_by_id = {order["id"]: order for order in orders}
+                items_stmt = (
+                    select(
+                        OrderItem.order_id,
+                        OrderItem.product_id,
+                        OrderItem.quantity,
+                        OrderItem.price_at_purchase,
+                    )
+                    .where(
+                        OrderItem.order_id
+                        == any_(
+                            bindparam(
+                                "order_ids", list(orders_by_id), type_=ARRAY(Integer)
+                            )
+                        )
+                    )
+                    .order_by(OrderItem.order_id, OrderItem.id)
+                )
+                items = await self.db.execute(items_stmt)
+                for item in items.all():
+                    orders_by_id[item.order_id]["items"].append(
+                        {
+                            "product_id": item.product_id,
+                            "quantity": item.quantity,
+                            "price_at_purchase": item.price_at_purchase,
+                        }
+                    )
+
+            next_cursor = (
+                encode_order_cursor(page[-1].created_at, page[-1].id)
+                if has_more
+                else None
+            )
+            return {"orders": orders, "next_cursor": next_cursor}
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in get_orders_by_user: {e}")
+            raise OrderException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def get_order_id_by_checkout_session(
+        self, checkout_session_id: str
+    ) -> Optional[int]:
+        try:
+            stmt = select(Order.id).where(
+                Order.checkout_session_id == checkout_session_id
+            )
+            result = await self.db.execute(stmt)
+            return result.scalar_one_or_none()
+        except SQLAlchemyError as e:
+            self.logger.error(
+                f"Database error in get_order_id_by_checkout_session: {e}"
+            )
+            raise OrderException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
     async def add_new_order(
-        self, orders: List[OrderData], guest_user_info: GuestUserInfo
+        self,
+        orders: List[OrderData],
+        guest_user_info: GuestUserInfo,
+        checkout_session_id: Optional[str] = None,
     ) -> int:
         try:
-            current_time = datetime.now()
-            tracking_number = generate_random_12_digit_number()
-
-            new_order = Order(
-                user_id=guest_user_info.user_id if guest_user_info.user_id else None,
-                first_name=guest_user_info.first_name,
-                last_name=guest_user_info.last_name,
-                email=guest_user_info.email,
-                shipping_address=guest_user_info.shipping_address,
-                phone=guest_user_info.phone,
-                status="confirmed",
-                created_at=current_time,
-                tracking_number=tracking_number,
-            )
-            self.db.add(new_order)
-            await self.db.flush()
-
-            order_items = [
-                OrderItem(
-                    order_id=new_order.id,
-                    product_id=order.product_id,
-                    quantity=order.quantity,
-                    price_at_purchase=order.price,
+            # The order and its items are inserted by one statement: the order insert
+            # is a CTE whose RETURNING id feeds the order_item insert, and the items
+            # are unnested from array parameters, so the round trips do not grow
+            # with the size of the cart
+            new_order = (
+                insert(Order)
+                .values(
+                    user_id=(
+                        guest_user_info.user_id if guest_user_info.user_id else None
+                    ),
+                    first_name=guest_user_info.first_name,
+                    last_name=guest_user_info.last_name,
+                    email=guest_user_info.email,
+                    shipping_address=guest_user_info.shipping_address,
+                    phone=guest_user_info.phone,
+                    status="confirmed",
+                    created_at=datetime.now(),
+                    tracking_number=await self.tracking_numbers.next_tracking_number(
+                        self.db
+                    ),
+                    checkout_session_id=checkout_session_id,
                 )
-                for order in orders
-            ]
-            self.db.add_all(order_items)
-            await self.db.flush()
+                .returning(Order.id)
+                .cte("new_order")
+            )
+            lines = (
+                func.unnest(
+                    bindparam(
+                        "product_ids",
+                        [order.product_id for order in orders],
+                        type_=ARRAY(Integer),
+                    ),
+                    bindparam(
+                        "quantities",
+                        [order.quantity for order in orders],
+                        type_=ARRAY(Integer),
+                    ),
+                    bindparam(
+                        "prices", [order.price for order in orders], type_=ARRAY(Float)
+                    ),
+                )
+                .table_valued("product_id", "quantity", "price")
+                .render_derived()
+            )
+            new_items = (
+                insert(OrderItem)
+                .from_select(
+                    ["order_id", "product_id", "quantity", "price_at_purchase"],
+                    select(
+                        new_order.c.id,
+                        lines.c.product_id,
+                        lines.c.quantity,
+                        lines.c.price,
+                    ).select_from(new_order, lines),
+                )
+                .cte("new_order_items")
+            )
+
+            stmt = select(new_order.c.id).add_cte(new_items)
+            result = await self.db.execute(stmt)
+            order_id = result.scalar_one()
 
-            return new_order.id
+            await self.rollups.add_orders([order_id])
+            return order_id
 
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in add_new_order: {e}")
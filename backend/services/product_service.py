@@ -1,15 +1,16 @@
 import os
 from uuid import UUID
-from typing import List
+from typing import Dict, List
 from PIL import Image, UnidentifiedImageError
 from io import BytesIO
 from sqlalchemy.exc import SQLAlchemyError, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import status, UploadFile, File, HTTPException
-from sqlalchemy import func, and_, exists, or_
+from sqlalchemy import or_
 
 from config.logger_config import get_logger
+from loaders import get_loaders
 from models.models import Product, Category, ProductCategory
 from schemas.schemas import (
     ProductUpdate,
@@ -33,11 +34,9 @@ class ProductService:
 
     async def get_product_by_id(self, product_id: int) -> dict:
         try:
-            stmt = select(Product).where(Product.id == product_id)
-            result = await self.db.execute(stmt)
-            product: Product = result.scalars().first()
+            product = await get_loaders(self.db).products.load(product_id)
             if product:
-                return db_model_to_dict(product)
+                return product
             else:
                 raise ProductException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -50,11 +49,23 @@ class ProductService:
                 detail="An error occurred when accessing the database!",
             )
 
+    async def get_products_by_ids(self, product_ids: List[int]) -> Dict[int, dict]:
+        """
+        Load many products with a single ``WHERE id = ANY(:product_ids)`` query.
+        Products that do not exist are simply missing from the returned dict.
+        """
+        try:
+            return await get_loaders(self.db).products.load_many(product_ids)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in get_products_by_ids: {e}")
+            raise ProductException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
     async def product_exists(self, product_id: int) -> bool:
         try:
-            stmt = select(exists().where(Product.id == product_id))
-            result = await self.db.execute(stmt)
-            return result.scalar()
+            return await get_loaders(self.db).products.load(product_id) is not None
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in product_exists: {e}")
             raise ProductException(
@@ -80,8 +91,7 @@ class ProductService:
 
     async def get_all_categories_for_product(self, product_id: int) -> List[dict]:
         try:
-            product_service = ProductService(self.db)
-            if not await product_service.check_product_exists(product_id):
+            if not await self.check_product_exists(product_id):
                 raise ProductException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"No product found with id {product_id}",
@@ -260,13 +270,7 @@ class ProductService:
 
     async def check_product_exists(self, product_id: int) -> bool:
         try:
-            stmt = select(func.count()).where(
-                and_(
-                    Product.id == product_id,
-                )
-            )
-            result = await self.db.execute(stmt)
-            return result.scalar_one() > 0
+            return await get_loaders(self.db).products.load(product_id) is not None
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in check_product_exists: {e}")
             raise
@@ -300,9 +304,10 @@ class ProductService:
                     detail=f"No seller found with id {seller_id}",
                 )
             self.db.add(product)
+            await self.db.flush()
+            product_id = product.id
             await self.db.commit()
-            await self.db.refresh(instance=product, attribute_names=["id"])
-            return product.id
+            return product_id
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in add_new_product: {e}")
             raise ProductException(
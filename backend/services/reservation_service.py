@@ -0,0 +1,195 @@
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import Integer, any_, bindparam, delete, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import status
+
+from config.logger_config import get_logger
+from config.models import ReservationConfig
+from dependencies import get_config
+from exceptions.product_exceptions import ProductException
+from models.models import Product, StockReservation
+
+
+# The checkout session is opened with Stripe after the hold is committed and is
+# given a slightly longer expiry than the TTL, so the hold is kept longer still
+HOLD_MARGIN = timedelta(minutes=5)
+
+
+class StockReservationService:
+    """
+    Holds stock for in-flight checkout sessions.
+
+    Every reservation is a row in the stock_reservation ledger, and available stock
+    is the product's stock_quantity minus the quantities held there.
+
+    Reserving locks the product rows before reading the available stock, so two
+    checkouts cannot both take the last units of a product. Holds on the same
+    product are therefore taken one at a time, but the lock is held only until the
+    holds are committed, before Stripe is called. Releasing a hold needs no lock,
+    since it only makes more stock available.
+    """
+
+    def __init__(
+        self, session: AsyncSession, reservation_config: ReservationConfig | None = None
+    ):
+        self.db = session
+        self.config = reservation_config or get_config().reservation_config
+        self.logger = get_logger(__name__)
+
+    async def get_available_stock(self, product_ids: List[int]) -> Dict[int, int]:
+        try:
+            ids = bindparam("product_ids", list(product_ids), type_=ARRAY(Integer))
+            reserved = (
+                select(
+                    StockReservation.product_id,
+                    func.sum(StockReservation.quantity).label("reserved_quantity"),
+                )
+                .where(StockReservation.product_id == any_(ids))
+                .group_by(StockReservation.product_id)
+                .subquery()
+            )
+            stmt = (
+                select(
+                    Product.id,
+                    Product.stock_quantity
+                    - func.coalesce(reserved.c.reserved_quantity, 0),
+                )
+                .outerjoin(reserved, reserved.c.product_id == Product.id)
+                .where(Product.id == any_(ids))
+            )
+            result = await self.db.execute(stmt)
+            return {product_id: available for product_id, available in result.all()}
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in get_available_stock: {e}")
+            raise ProductException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def _lock_products(self, product_ids: List[int]) -> None:
+        # Locked in id order so checkouts of overlapping carts cannot deadlock. The
+        # availability is read by a separate statement afterwards, which sees the
+        # reservations committed while this one waited for the lock.
+        try:
+            stmt = (
+                select(Product.id)
+                .where(
+                    Product.id
+                    == any_(bindparam("product_ids", product_ids, type_=ARRAY(Integer)))
+                )
+                .order_by(Product.id)
+                .with_for_update()
+            )
+            await self.db.execute(stmt)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in _lock_products: {e}")
+            raise ProductException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def reserve_items(self, quantities: Dict[int, int]) -> dict:
+        """
+        Reserve the requested quantity of every product, keyed by product id.
+        Raises a ProductException if any product is missing or does not have enough
+        unreserved stock, in which case nothing is reserved.
+        """
+        await self._lock_products(list(quantities))
+        available = await self.get_available_stock(list(quantities))
+
+        for product_id, quantity in quantities.items():
+            if product_id not in available:
+                raise ProductException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Product {product_id} not found",
+                )
+            if available[product_id] < quantity:
+                raise ProductException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Insufficient stock for product {product_id}. "
+                    f"Requested: {quantity}, Available: {max(available[product_id], 0)}",
+                )
+
+        try:
+            created_at = datetime.now()
+            expires_at = (
+                created_at + timedelta(minutes=self.config.ttl_minutes) + HOLD_MARGIN
+            )
+            reservations = [
+                {
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "created_at": created_at,
+                    "expires_at": expires_at,
+                }
+                for product_id, quantity in quantities.items()
+            ]
+
+            result = await self.db.execute(
+                insert(StockReservation).returning(StockReservation.id), reservations
+            )
+            reservation_ids = list(result.scalars().all())
+
+            return {"reservation_ids": reservation_ids, "expires_at": expires_at}
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in reserve_items: {e}")
+            raise ProductException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def attach_checkout_session(
+        self, reservation_ids: List[int], checkout_session_id: str
+    ) -> None:
+        try:
+            stmt = (
+                update(StockReservation)
+                .where(StockReservation.id.in_(reservation_ids))
+                .values(checkout_session_id=checkout_session_id)
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.execute(stmt)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in attach_checkout_session: {e}")
+            raise ProductException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def release_reservations(self, reservation_ids: List[int]) -> int:
+        return await self._release(StockReservation.id.in_(reservation_ids))
+
+    async def consume_reservations(self, checkout_session_id: str) -> int:
+        return await self._release(
+            StockReservation.checkout_session_id == checkout_session_id
+        )
+
+    async def release_expired_reservations(self, batch_size: int) -> int:
+        expired_ids = (
+            select(StockReservation.id)
+            .where(StockReservation.expires_at < datetime.now())
+            .order_by(StockReservation.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return await self._release(StockReservation.id.in_(expired_ids))
+
+    async def _release(self, condition) -> int:
+        try:
+            stmt = (
+                delete(StockReservation)
+                .where(condition)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.db.execute(stmt)
+            return result.rowcount
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in _release: {e}")
+            raise ProductException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
@@ -0,0 +1,153 @@
+from datetime import date
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Date, Integer, any_, bindparam, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.logger_config import get_logger
+from exceptions.seller_statistics_exceptions import SellerStatisticsException
+from models.models import (
+    Order,
+    OrderItem,
+    Product,
+    ProductCategory,
+    SellerMonthlyCategorySales,
+    SellerMonthlyProductSales,
+    SellerMonthlySales,
+)
+from services.seller_statistics_service import evict_statistics_on_commit
+
+
+class SellerRollupService:
+    """
+    Maintains the monthly seller rollup tables, which the seller statistics are
+    read from.
+
+    New orders are added to the rollups in the transaction that creates them, by
+    three upserts that add the order's figures to the existing rows. Rows are
+    written in key order so concurrent orders of the same seller do not deadlock.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.db = session
+        self.logger = get_logger(__name__)
+
+    async def add_orders(self, order_ids: List[int]) -> None:
+        seller_months = await self._add(order_ids)
+        evict_statistics_on_commit(self.db, seller_months)
+
+    async def rebuild(self) -> None:
+        """Recompute every rollup row from the full order history."""
+        try:
+            for table in (
+                SellerMonthlySales,
+                SellerMonthlyProductSales,
+                SellerMonthlyCategorySales,
+            ):
+                await self.db.execute(delete(table))
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in rebuild: {e}")
+            raise SellerStatisticsException(
+                detail="An error occurred when accessing the database!"
+            )
+        await self._add(None)
+        evict_statistics_on_commit(self.db)
+
+    async def _add(self, order_ids: Optional[List[int]]) -> List[Tuple[UUID, date]]:
+        """Add the orders to the rollups and return the (seller_id, month) touched."""
+        sold_items = (
+            select(
+                Product.seller_id.label("seller_id"),
+                cast(func.date_trunc("month", Order.created_at), Date).label("month"),
+                OrderItem.order_id,
+                OrderItem.product_id,
+                OrderItem.quantity,
+                (OrderItem.quantity * OrderItem.price_at_purchase).label("revenue"),
+            )
+            .join(Order, Order.id == OrderItem.order_id)
+            .join(Product, Product.id == OrderItem.product_id)
+            .where(Product.seller_id.is_not(None))
+        )
+        if order_ids is not None:
+            sold_items = sold_items.where(
+                OrderItem.order_id
+                == any_(bindparam("order_ids", order_ids, type_=ARRAY(Integer)))
+            )
+        sold_items = sold_items.cte("sold_items")
+        seller_month = (sold_items.c.seller_id, sold_items.c.month)
+
+        sales = insert(SellerMonthlySales).from_select(
+            ["seller_id", "month", "order_count", "revenue"],
+            select(
+                *seller_month,
+                func.count(sold_items.c.order_id.distinct()),
+                func.sum(sold_items.c.revenue),
+            )
+            .group_by(*seller_month)
+            .order_by(*seller_month),
+        )
+        sales = sales.on_conflict_do_update(
+            index_elements=["seller_id", "month"],
+            set_={
+                "order_count": SellerMonthlySales.order_count
+                + sales.excluded.order_count,
+                "revenue": SellerMonthlySales.revenue + sales.excluded.revenue,
+            },
+        ).returning(SellerMonthlySales.seller_id, SellerMonthlySales.month)
+
+        product_sales = insert(SellerMonthlyProductSales).from_select(
+            ["seller_id", "month", "product_id", "units", "revenue"],
+            select(
+                *seller_month,
+                sold_items.c.product_id,
+                func.sum(sold_items.c.quantity),
+                func.sum(sold_items.c.revenue),
+            )
+            .group_by(*seller_month, sold_items.c.product_id)
+            .order_by(*seller_month, sold_items.c.product_id),
+        )
+        product_sales = product_sales.on_conflict_do_update(
+            index_elements=["seller_id", "month", "product_id"],
+            set_={
+                "units": SellerMonthlyProductSales.units + product_sales.excluded.units,
+                "revenue": SellerMonthlyProductSales.revenue
+                + product_sales.excluded.revenue,
+            },
+        )
+
+        category_sales = insert(SellerMonthlyCategorySales).from_select(
+            ["seller_id", "month", "category_id", "units"],
+            select(
+                *seller_month,
+                ProductCategory.category_id,
+                func.sum(sold_items.c.quantity),
+            )
+            .join(
+                ProductCategory, ProductCategory.product_id == sold_items.c.product_id
+            )
+            .where(ProductCategory.category_id.is_not(None))
+            .group_by(*seller_month, ProductCategory.category_id)
+            .order_by(*seller_month, ProductCategory.category_id),
+        )
+        category_sales = category_sales.on_conflict_do_update(
+            index_elements=["seller_id", "month", "category_id"],
+            set_={
+                "units": SellerMonthlyCategorySales.units
+                + category_sales.excluded.units,
+            },
+        )
+
+        try:
+            result = await self.db.execute(sales)
+            seller_months = [tuple(row) for row in result.all()]
+            for stmt in (product_sales, category_sales):
+                await self.db.execute(stmt)
+            return seller_months
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in _add: {e}")
+            raise SellerStatisticsException(
+                detail="An error occurred when accessing the database!"
+            )
@@ -1,120 +1,371 @@
-from typing import Dict
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
 from uuid import UUID
-from fastapi import HTTPException
-from dependencies import get_first_and_last_day_of_month
+
+from fastapi import status
+from sqlalchemy import (
+    Date,
+    Float,
+    Integer,
+    String,
+    cast,
+    column,
+    event,
+    func,
+    literal,
+    null,
+    select,
+    true,
+    union_all,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import LRUCache
+from config.logger_config import get_logger
+from dependencies import add_months, get_first_and_last_day_of_month
+from exceptions.seller_statistics_exceptions import SellerStatisticsException
+from models.models import (
+    Product,
+    SellerMonthlyCategorySales,
+    SellerMonthlyProductSales,
+    SellerMonthlySales,
+    StripeCharge,
+)
 from schemas.schemas import SelectedMonthForSellerStatistics
 from services.category_service import CategoryService
-from config.parser import load_config
-from sqlalchemy.ext.asyncio import AsyncSession
-import stripe
-import ast
 
+# Evictions only reach the cache of the process that stored the data, so months
+# that have ended are kept for a bounded time too, the current one only briefly
+CURRENT_MONTH_TTL_SECONDS = 60
+CLOSED_MONTH_TTL_SECONDS = 3600
+statistics_cache = LRUCache(maxsize=50_000)
 
-class SellerStatisticsService:
 
-    def __init__(self, session: AsyncSession):
-        self.db = session
-        self.key = load_config().auth_config.stripe_secret_key
-        self.stripe_api_key = self.key
-        self._category_service = CategoryService(session)
+def statistics_cache_key(seller_id: UUID | str, month: date) -> tuple:
+    # Routes pass the seller id from the token as a string, background jobs as a UUID
+    return UUID(str(seller_id)), month.year, month.month
 
-    def convert_metadata_to_dict(self, metadata):
-        converted_dict = dict()
 
-        for key, value in metadata.items():
-            converted_dict[key] = value.split(", ")
+def evict_statistics(keys: Iterable[Tuple[UUID, date]] | None = None) -> None:
+    """Evict the given (seller_id, month) statistics, or all of them."""
+    if keys is None:
+        statistics_cache.clear()
+        return
+    for seller_id, month in keys:
+        statistics_cache.pop(statistics_cache_key(seller_id, month))
 
-        return converted_dict
 
-    def get_dict_from_json_object(self, item: str) -> dict:
-        fixed_item = item.translate(str.maketrans("", "", "{}"))
-        item_dict = ast.literal_eval("{" + fixed_item + "}")
-        return item_dict
+def evict_statistics_on_commit(
+    session: AsyncSession, keys: Iterable[Tuple[UUID, date]] | None = None
+) -> None:
+    """Run ``evict_statistics(keys)`` once the session's transaction commits."""
+    keys = None if keys is None else list(keys)
+    event.listen(
+        session.sync_session,
+        "after_commit",
+        lambda _: evict_statistics(keys),
+        once=True,
+    )
 
-    async def get_category_name(self, category_id: str):
-        try:
-            int_category_id = int(category_id)
-            return await self._category_service.get_category_by_id(int_category_id)
-        except ValueError:
-            raise HTTPException(
-                status_code=400, detail=f"Invalid category ID format: {category_id}"
-            )
 
-    def is_seller_had_transactions(self, seller_id: UUID, charges) -> bool:
-        if charges["data"]:
-            for charge in charges["data"]:
-                metadata = self.convert_metadata_to_dict(charge.get("metadata", {}))
-                seller_id_metadata = metadata.get("seller_id", [])
-                if str(seller_id) in seller_id_metadata:
-                    return True
-            return False
+class SellerStatisticsService:
+
+    def __init__(
+        self, session: AsyncSession, category_service: CategoryService | None = None
+    ):
+        self.db = session
+        self.category_service = category_service or CategoryService(session)
+        self.logger = get_logger(__name__)
 
     async def get_monthly_transactions(
         self, seller_id: UUID, selected_date: SelectedMonthForSellerStatistics
     ) -> Dict[str, any]:
-        stripe.api_key = self.stripe_api_key
-        first_day, last_day = get_first_and_last_day_of_month(selected_date)
-
-        charges = stripe.Charge.list(
-            created={
-                "gte": int(first_day.timestamp()),
-                "lte": int(last_day.timestamp()),
-            },
-            status="succeeded",
-            limit=100,
-        )
+        """
+        Return the seller's statistics for a month, from the statistics cache when
+        possible. Months that have ended are cached until new data for them is
+        stored in this process, or for ``CLOSED_MONTH_TTL_SECONDS`` at most; the
+        current month, and any month read from a replica, is cached for
+        ``CURRENT_MONTH_TTL_SECONDS``.
+        """
+        first_day, _ = get_first_and_last_day_of_month(selected_date)
+        month = first_day.date()
+        cache_key = statistics_cache_key(seller_id, month)
+
+        statistics = statistics_cache.get(cache_key)
+        if statistics is None:
+            statistics = await self._compute_monthly_transactions(seller_id, month)
+            # A lagging replica may miss data whose eviction has already happened
+            is_final = add_months(month, 1) <= date.today()
+            is_final = is_final and not self.db.info.get("replica")
+            statistics_cache.set(
+                cache_key,
+                statistics,
+                ttl_seconds=(
+                    CLOSED_MONTH_TTL_SECONDS if is_final else CURRENT_MONTH_TTL_SECONDS
+                ),
+            )
+
+        # Months without transactions are cached as an empty dict
+        if not statistics:
+            raise SellerStatisticsException(
+                status_code=status.HTTP_204_NO_CONTENT,
+                detail=f"There were no transactions in {selected_date.month}",
+            )
+        return statistics
+
+    async def _compute_monthly_transactions(
+        self, seller_id: UUID, month: date
+    ) -> Dict[str, any]:
+        rows = await self._get_monthly_rows(seller_id, month, month)
 
-        total_revenue = 0
         total_transactions = 0
+        total_revenue = 0
         product_quantities = dict()
-        product_categories = dict()
         item_unit_prices = dict()
-        is_seller_had_transactions = self.is_seller_had_transactions(seller_id, charges)
-
-        if charges["data"] and is_seller_had_transactions:
-            for charge in charges["data"]:
-                metadata = self.convert_metadata_to_dict(charge.get("metadata", {}))
-                seller_id_metadata = metadata.get("seller_id", [])[0]
-
-                if str(seller_id_metadata) == seller_id:
-                    total_revenue += charge["amount"]
-                    total_transactions += 1
-                    product_quantities_list = metadata.get("product_quantities", [])
-                    product_categories_list = metadata.get("product_categories", [])
-
-                    for item in product_quantities_list:
-                        for item_name, quantity in self.get_dict_from_json_object(
-                            item
-                        ).items():
-                            if item_name in product_quantities:
-                                product_quantities[item_name] += quantity
-                            else:
-                                product_quantities[item_name] = quantity
-                                item_unit_prices[item_name] = (
-                                    charge["amount"] / quantity / 100
-                                )
-                    for item in product_categories_list:
-                        for category_id, quantity in self.get_dict_from_json_object(
-                            item
-                        ).items():
-
-                            category_data = await self.get_category_name(category_id)
-                            category_name = category_data["category_name"]
-                            if category_name not in product_categories.keys():
-                                product_categories[category_name] = quantity
-                            else:
-                                product_categories[category_name] += quantity
-
-            return {
-                "total_transactions": total_transactions,
-                "total_revenue": total_revenue / 100,
-                "product_quantities": product_quantities,
-                "product_categories": product_categories,
-                "item_unit_prices": item_unit_prices,
-            }
-
-        else:
-            raise HTTPException(
-                status_code=204,
-                detail=f"There were no transactions in {selected_date.month}",
+        category_quantities = dict()
+        for kind, _, name, quantity, revenue in rows:
+            if kind == "total":
+                total_transactions = quantity
+                total_revenue = revenue or 0
+            elif kind == "product":
+                product_quantities[name] = quantity
+                item_unit_prices[name] = revenue / quantity
+            else:
+                category_quantities[int(name)] = quantity
+
+        if not total_transactions:
+            return {}
+
+        category_names = await self.category_service.resolve_names(category_quantities)
+        product_categories = dict()
+        for category_id, quantity in category_quantities.items():
+            if category_id in category_names:
+                name = category_names[category_id]
+                product_categories[name] = product_categories.get(name, 0) + quantity
+
+        return {
+            "total_transactions": total_transactions,
+            "total_revenue": total_revenue,
+            "product_quantities": product_quantities,
+            "product_categories": product_categories,
+            "item_unit_prices": item_unit_prices,
+        }
+
+    async def get_transactions_by_month(
+        self,
+        seller_id: UUID,
+        first_month: date,
+        last_month: date,
+        compare_previous_year: bool = False,
+    ) -> Dict[str, any]:
+        """
+        Return the seller's statistics from ``first_month`` to ``last_month`` as
+        series with one value per month. With ``compare_previous_year`` the same
+        months of the year before are returned under "previous_year". Every month,
+        including the previous year's, comes from the same single query.
+        """
+        months = self._months_between(first_month, last_month)
+        query_from = (
+            add_months(first_month, -12) if compare_previous_year else first_month
+        )
+        rows = await self._get_monthly_rows(seller_id, query_from, last_month)
+
+        category_ids = {int(row.name) for row in rows if row.kind == "category"}
+        category_names = await self.category_service.resolve_names(category_ids)
+
+        statistics = self._build_series(rows, months, category_names)
+        if compare_previous_year:
+            previous_months = [add_months(month, -12) for month in months]
+            statistics["previous_year"] = self._build_series(
+                rows, previous_months, category_names
+            )
+        return statistics
+
+    def _build_series(
+        self, rows: list, months: List[date], category_names: Dict[int, str]
+    ) -> Dict[str, any]:
+        month_index = {month: index for index, month in enumerate(months)}
+        empty_series = [0] * len(months)
+
+        total_transactions = list(empty_series)
+        total_revenue = [0.0] * len(months)
+        product_quantities = defaultdict(lambda: list(empty_series))
+        product_revenue = defaultdict(lambda: [0.0] * len(months))
+        product_categories = defaultdict(lambda: list(empty_series))
+        for kind, month, name, quantity, revenue in rows:
+            index = month_index.get(month)
+            if index is None:
+                continue
+            if kind == "total":
+                total_transactions[index] += quantity
+                total_revenue[index] += revenue or 0
+            elif kind == "product":
+                product_quantities[name][index] += quantity
+                product_revenue[name][index] += revenue
+            elif int(name) in category_names:
+                product_categories[category_names[int(name)]][index] += quantity
+
+        item_unit_prices = {
+            name: [
+                revenue / quantity if quantity else None
+                for quantity, revenue in zip(quantities, product_revenue[name])
+            ]
+            for name, quantities in product_quantities.items()
+        }
+        return {
+            "months": [month.strftime("%Y-%m") for month in months],
+            "total_transactions": total_transactions,
+            "total_revenue": total_revenue,
+            "product_quantities": dict(product_quantities),
+            "product_categories": dict(product_categories),
+            "item_unit_prices": item_unit_prices,
+        }
+
+    @staticmethod
+    def _months_between(first_month: date, last_month: date) -> List[date]:
+        months = []
+        month = first_month
+        while month <= last_month:
+            months.append(month)
+            month = add_months(month, 1)
+        return months
+
+    async def _get_monthly_rows(
+        self, seller_id: UUID, first_month: date, last_month: date
+    ) -> list:
+        """
+        Read the seller's months from the rollup tables and from the legacy charges
+        in the local Stripe charge ledger. Every source contributes summary, per
+        product and per category rows to a single UNION ALL, which is summed by kind,
+        month and name. Category rows carry the category id as their name.
+
+        The rollups are built from every order, and every order has a charge too, so
+        charges are only read from before the seller's first rollup month.
+        """
+        try:
+            totals = select(
+                literal("total").label("kind"),
+                SellerMonthlySales.month.label("month"),
+                cast(null(), Product.name.type).label("name"),
+                SellerMonthlySales.order_count.label("quantity"),
+                SellerMonthlySales.revenue.label("revenue"),
+            ).where(
+                SellerMonthlySales.seller_id == seller_id,
+                SellerMonthlySales.month.between(first_month, last_month),
+            )
+            per_product = (
+                select(
+                    literal("product"),
+                    SellerMonthlyProductSales.month,
+                    Product.name,
+                    SellerMonthlyProductSales.units,
+                    SellerMonthlyProductSales.revenue,
+                )
+                .join(Product, Product.id == SellerMonthlyProductSales.product_id)
+                .where(
+                    SellerMonthlyProductSales.seller_id == seller_id,
+                    SellerMonthlyProductSales.month.between(first_month, last_month),
+                )
+            )
+            per_category = select(
+                literal("category"),
+                SellerMonthlyCategorySales.month,
+                cast(SellerMonthlyCategorySales.category_id, String),
+                SellerMonthlyCategorySales.units,
+                cast(null(), Float),
+            ).where(
+                SellerMonthlyCategorySales.seller_id == seller_id,
+                SellerMonthlyCategorySales.month.between(first_month, last_month),
+            )
+
+            rollup_cutover = (
+                select(func.min(SellerMonthlySales.month))
+                .where(SellerMonthlySales.seller_id == seller_id)
+                .scalar_subquery()
+            )
+            charges = (
+                select(
+                    cast(func.date_trunc("month", StripeCharge.created), Date).label(
+                        "month"
+                    ),
+                    StripeCharge.amount,
+                    StripeCharge.items,
+                    StripeCharge.product_categories,
+                )
+                .where(
+                    StripeCharge.seller_id == seller_id,
+                    StripeCharge.status == "succeeded",
+                    StripeCharge.created >= first_month,
+                    StripeCharge.created < add_months(last_month, 1),
+                    StripeCharge.created < func.coalesce(rollup_cutover, date.max),
+                )
+                .cte("legacy_charges")
+            )
+            charge_items = (
+                func.jsonb_to_recordset(charges.c["items"])
+                .table_valued(
+                    column("name", String),
+                    column("quantity", Integer),
+                    column("revenue", Float),
+                )
+                .render_derived(name="charge_item", with_types=True)
+            )
+            charge_categories = func.jsonb_each_text(
+                charges.c.product_categories
+            ).table_valued("key", "value")
+            charge_totals = select(
+                literal("total"),
+                charges.c.month,
+                null(),
+                literal(1),
+                cast(charges.c.amount, Float) / 100,
+            )
+            charge_per_product = (
+                select(
+                    literal("product"),
+                    charges.c.month,
+                    charge_items.c.name,
+                    charge_items.c.quantity,
+                    charge_items.c.revenue,
+                )
+                .select_from(charges)
+                .join(charge_items, true())
+            )
+            charge_per_category = (
+                select(
+                    literal("category"),
+                    charges.c.month,
+                    charge_categories.c.key,
+                    cast(charge_categories.c.value, Integer),
+                    cast(null(), Float),
+                )
+                .select_from(charges)
+                .join(charge_categories, true())
+            )
+
+            sources = union_all(
+                totals,
+                per_product,
+                per_category,
+                charge_totals,
+                charge_per_product,
+                charge_per_category,
+            ).subquery()
+            result = await self.db.execute(
+                select(
+                    sources.c.kind,
+                    sources.c.month,
+                    sources.c.name,
+                    cast(func.sum(sources.c.quantity), Integer).label("quantity"),
+                    func.sum(sources.c.revenue).label("revenue"),
+                ).group_by(sources.c.kind, sources.c.month, sources.c.name)
+            )
+            return result.all()
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in _get_monthly_rows: {e}")
+            raise SellerStatisticsException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
             )
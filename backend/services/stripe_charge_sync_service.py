@@ -0,0 +1,194 @@
+import json
+from datetime import datetime, timezone
+from typing import Tuple
+from uuid import UUID
+
+from fastapi import status
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.logger_config import get_logger
+from exceptions.stripe_exceptions import StripeGatewayException
+from models.models import StripeCharge, StripeSyncState
+from services.seller_statistics_service import evict_statistics_on_commit
+from services.stripe_gateway import StripeGateway, get_stripe_gateway
+
+CHARGE_SYNC_STATE = "charges"
+
+logger = get_logger(__name__)
+
+
+def _load_metadata_dict(metadata: dict, key: str) -> dict:
+    try:
+        value = json.loads(metadata.get(key) or "{}")
+    except ValueError:
+        value = None
+    if not isinstance(value, dict):
+        logger.warning(f"Ignoring malformed charge metadata {key}: {metadata.get(key)}")
+        return {}
+    return value
+
+
+def parse_charge_metadata(metadata: dict, amount: int) -> dict:
+    """
+    Parse the seller and the sold items out of a legacy charge's metadata. The
+    charge amount is split between the items by quantity, as the metadata carries
+    no item prices. Checkout lists the seller of every cart item, joined by ", ";
+    as in the statistics read from Stripe, the charge is attributed to the first.
+    Malformed entries are skipped.
+    """
+    try:
+        seller_id = UUID((metadata.get("seller_id") or "").split(", ")[0])
+    except ValueError:
+        seller_id = None
+
+    quantities = {
+        name: quantity
+        for name, quantity in _load_metadata_dict(
+            metadata, "product_quantities"
+        ).items()
+        if isinstance(quantity, int) and quantity > 0
+    }
+    total_quantity = sum(quantities.values())
+    items = [
+        {
+            "name": name,
+            "quantity": quantity,
+            "revenue": amount / 100 * quantity / total_quantity,
+        }
+        for name, quantity in quantities.items()
+    ]
+
+    product_categories = {
+        category_id: quantity
+        for category_id, quantity in _load_metadata_dict(
+            metadata, "product_categories"
+        ).items()
+        if category_id.isdigit() and isinstance(quantity, int) and quantity > 0
+    }
+    return {
+        "seller_id": seller_id,
+        "items": items,
+        "product_categories": product_categories,
+    }
+
+
+class StripeChargeSyncService:
+    """
+    Copies Stripe charges into the local stripe_charge ledger, one page per call.
+
+    Stripe lists charges newest first, so a run pages with ``starting_after`` through
+    every charge created since the watermark and only moves the watermark to the
+    newest charge it has seen once the last page is stored. The cursor is saved
+    after every page, so an interrupted run resumes where it stopped. Charges at the
+    watermark second are listed again by the next run and upserted unchanged.
+
+    The state row is locked with ``SKIP LOCKED``, so only one worker syncs at a
+    time.
+    """
+
+    def __init__(
+        self, session: AsyncSession, stripe_gateway: StripeGateway | None = None
+    ):
+        self.db = session
+        self.stripe_gateway = stripe_gateway or get_stripe_gateway()
+        self.logger = get_logger(__name__)
+
+    async def sync_next_page(self, page_size: int) -> Tuple[int, bool]:
+        """
+        Store the next page of charges and return how many were stored and whether
+        the run has more pages. The caller commits.
+        """
+        try:
+            state = await self._lock_state()
+            if state is None:
+                return 0, False
+
+            params = {"limit": page_size, "created": {"gte": state.watermark}}
+            if state.cursor:
+                params["starting_after"] = state.cursor
+            page = await self.stripe_gateway.list_charges(params)
+            charges = page["data"]
+
+            if charges:
+                await self._store(charges)
+                state.pending_watermark = max(
+                    state.pending_watermark or state.watermark,
+                    max(charge["created"] for charge in charges),
+                )
+            if page["has_more"] and charges:
+                state.cursor = charges[-1]["id"]
+            else:
+                state.watermark = state.pending_watermark or state.watermark
+                state.pending_watermark = None
+                state.cursor = None
+            state.updated_at = datetime.now()
+            await self.db.flush()
+            return len(charges), state.cursor is not None
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in sync_next_page: {e}")
+            raise StripeGatewayException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def _lock_state(self) -> StripeSyncState | None:
+        await self.db.execute(
+            insert(StripeSyncState)
+            .values(name=CHARGE_SYNC_STATE, watermark=0, updated_at=datetime.now())
+            .on_conflict_do_nothing(index_elements=[StripeSyncState.name])
+        )
+        result = await self.db.execute(
+            select(StripeSyncState)
+            .where(StripeSyncState.name == CHARGE_SYNC_STATE)
+            .with_for_update(skip_locked=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def _store(self, charges: list) -> None:
+        synced_at = datetime.now()
+        rows = []
+        for charge in charges:
+            metadata = dict(charge.get("metadata") or {})
+            rows.append(
+                {
+                    "id": charge["id"],
+                    "created": datetime.fromtimestamp(
+                        charge["created"], timezone.utc
+                    ).replace(tzinfo=None),
+                    "amount": charge["amount"],
+                    "currency": charge["currency"],
+                    "status": charge["status"],
+                    "raw_metadata": metadata,
+                    **parse_charge_metadata(metadata, charge["amount"]),
+                    "synced_at": synced_at,
+                }
+            )
+
+        stmt = insert(StripeCharge).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StripeCharge.id],
+            set_={
+                column: stmt.excluded[column]
+                for column in (
+                    "amount",
+                    "status",
+                    "raw_metadata",
+                    "seller_id",
+                    "items",
+                    "product_categories",
+                    "synced_at",
+                )
+            },
+        )
+        await self.db.execute(stmt)
+        evict_statistics_on_commit(
+            self.db,
+            {
+                (row["seller_id"], row["created"].date().replace(day=1))
+                for row in rows
+                if row["seller_id"]
+            },
+        )
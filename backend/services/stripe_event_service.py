@@ -0,0 +1,179 @@
+import json
+from datetime import datetime, timedelta
+
+import stripe
+from fastapi import HTTPException, status
+from sqlalchemy import String, any_, bindparam, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.logger_config import get_logger
+from config.models import StripeConfig
+from dependencies import get_config
+from exceptions.stripe_exceptions import StripeWebhookException
+from models.models import StripeEvent
+from services.checkout_service import CheckoutService, decode_order_metadata
+from services.order_service import OrderService
+
+HANDLED_EVENT_TYPES = (
+    "checkout.session.completed",
+    "checkout.session.async_payment_succeeded",
+)
+RETRY_BACKOFF_SECONDS = 30
+
+
+class StripeEventService:
+    """
+    Turns paid Stripe checkout sessions into orders.
+
+    The webhook endpoint only verifies and stores the event, so Stripe gets its
+    acknowledgement right away. A background consumer then claims pending events
+    with ``FOR UPDATE SKIP LOCKED``, so several workers can share the queue, and
+    applies each one in its own savepoint: a failing event is retried later with a
+    backoff without rolling back the rest of the batch.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        stripe_config: StripeConfig | None = None,
+        checkout_service: CheckoutService | None = None,
+        order_service: OrderService | None = None,
+    ):
+        self.db = session
+        self.config = stripe_config or get_config().stripe_config
+        self.checkout_service = checkout_service or CheckoutService(session)
+        self.order_service = order_service or OrderService(session)
+        self.logger = get_logger(__name__)
+
+    async def record_event(self, payload: bytes, signature: str | None) -> bool:
+        """
+        Verify and store a webhook event. Returns False for event types that are
+        not handled. Redelivered events are stored only once. The event is
+        committed here, before the webhook is acknowledged.
+        """
+        if not self.config.webhook_secret:
+            raise StripeWebhookException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Stripe webhooks are not configured!",
+            )
+        try:
+            event = stripe.Webhook.construct_event(
+                payload, signature or "", self.config.webhook_secret
+            )
+        except (ValueError, stripe.SignatureVerificationError) as e:
+            self.logger.warning(f"Rejected Stripe webhook: {e}")
+            raise StripeWebhookException()
+
+        if event["type"] not in HANDLED_EVENT_TYPES:
+            return False
+
+        try:
+            received_at = datetime.now()
+            stmt = (
+                insert(StripeEvent)
+                .values(
+                    id=event["id"],
+                    type=event["type"],
+                    payload=json.loads(payload),
+                    received_at=received_at,
+                    available_at=received_at,
+                    attempts=0,
+                )
+                .on_conflict_do_nothing(index_elements=[StripeEvent.id])
+            )
+            await self.db.execute(stmt)
+            # Stripe stops redelivering once acknowledged, so store the event first
+            await self.db.commit()
+            return True
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in record_event: {e}")
+            await self.db.rollback()
+            raise StripeWebhookException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def process_pending_events(self, batch_size: int) -> int:
+        """
+        Apply up to ``batch_size`` pending events and return how many were claimed.
+        The caller commits.
+        """
+        try:
+            stmt = (
+                select(StripeEvent.id, StripeEvent.payload, StripeEvent.attempts)
+                .where(
+                    StripeEvent.processed_at.is_(None),
+                    StripeEvent.available_at <= datetime.now(),
+                    StripeEvent.attempts < self.config.event_max_attempts,
+                )
+                .order_by(StripeEvent.available_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await self.db.execute(stmt)
+            events = result.all()
+
+            processed_ids = []
+            for event_id, payload, attempts in events:
+                try:
+                    async with self.db.begin_nested():
+                        await self._apply(payload["data"]["object"])
+                    processed_ids.append(event_id)
+                except (HTTPException, KeyError, ValueError) as e:
+                    error = getattr(e, "detail", None) or repr(e)
+                    self.logger.error(
+                        f"Failed to apply Stripe event {event_id}: {error}"
+                    )
+                    await self.db.execute(
+                        update(StripeEvent)
+                        .where(StripeEvent.id == event_id)
+                        .values(
+                            attempts=attempts + 1,
+                            last_error=str(error),
+                            available_at=datetime.now()
+                            + timedelta(seconds=RETRY_BACKOFF_SECONDS * 2**attempts),
+                        )
+                    )
+
+            if processed_ids:
+                await self.db.execute(
+                    update(StripeEvent)
+                    .where(
+                        StripeEvent.id
+                        == any_(
+                            bindparam("event_ids", processed_ids, type_=ARRAY(String))
+                        )
+                    )
+                    .values(processed_at=datetime.now())
+                )
+            return len(events)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error in process_pending_events: {e}")
+            raise StripeWebhookException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred when accessing the database!",
+            )
+
+    async def _apply(self, checkout_session: dict) -> None:
+        # Sessions paid with a delayed method complete unpaid and are applied on
+        # checkout.session.async_payment_succeeded instead
+        if checkout_session.get("payment_status") not in (
+            "paid",
+            "no_payment_required",
+        ):
+            return
+
+        session_id = checkout_session["id"]
+        if await self.order_service.get_order_id_by_checkout_session(session_id):
+            return
+
+        orders, guest_user_info = decode_order_metadata(
+            checkout_session.get("metadata") or {}
+        )
+        if not orders:
+            raise ValueError(f"Checkout session {session_id} has no order lines")
+
+        await self.checkout_service.update_stock_quantity(orders, session_id)
+        await self.order_service.add_new_order(orders, guest_user_info, session_id)
@@ -0,0 +1,83 @@
+import asyncio
+from functools import lru_cache
+from typing import Any, Awaitable, Optional
+
+import stripe
+from fastapi import status
+
+from config.logger_config import get_logger
+from config.models import StripeConfig
+from dependencies import get_config
+from exceptions.stripe_exceptions import StripeGatewayException
+
+
+class StripeGateway:
+    """
+    The single entry point for Stripe API calls.
+
+    Calls go through one StripeClient backed by an httpx.AsyncClient, so they are
+    awaited on the event loop instead of blocking it, reuse pooled keep-alive
+    connections, and carry the API key per client instead of via the module-global
+    ``stripe.api_key``. Every call is bounded by a timeout.
+    """
+
+    def __init__(self, stripe_config: StripeConfig):
+        self.config = stripe_config
+        self.logger = get_logger(__name__)
+        self._http_client = stripe.HTTPXClient(
+            timeout=stripe_config.request_timeout_seconds
+        )
+        base_addresses = (
+            {"api": stripe_config.api_base, "files": stripe_config.api_base}
+            if stripe_config.api_base
+            else {}
+        )
+        self._client = stripe.StripeClient(
+            stripe_config.secret_key,
+            http_client=self._http_client,
+            base_addresses=base_addresses,
+            max_network_retries=stripe_config.max_network_retries,
+        )
+
+    async def create_checkout_session(
+        self, params: dict, timeout: Optional[float] = None
+    ) -> stripe.checkout.Session:
+        return await self._call(
+            "create_checkout_session",
+            self._client.checkout.sessions.create_async(params=params),
+            timeout,
+        )
+
+    async def list_charges(
+        self, params: dict, timeout: Optional[float] = None
+    ) -> stripe.ListObject:
+        return await self._call(
+            "list_charges", self._client.charges.list_async(params=params), timeout
+        )
+
+    async def close(self) -> None:
+        await self._http_client.close_async()
+
+    async def _call(
+        self, name: str, request: Awaitable[Any], timeout: Optional[float]
+    ) -> Any:
+        timeout = timeout or self.config.request_timeout_seconds
+        try:
+            return await asyncio.wait_for(request, timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Stripe call {name} timed out after {timeout}s")
+            raise StripeGatewayException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="The payment provider did not respond in time",
+            )
+        except stripe.StripeError as e:
+            self.logger.error(f"Stripe error in {name}: {e}")
+            raise StripeGatewayException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=e.user_message or "Payment provider request failed!",
+            )
+
+
+@lru_cache
+def get_stripe_gateway() -> StripeGateway:
+    return StripeGateway(get_config().stripe_config)
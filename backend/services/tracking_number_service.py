@@ -0,0 +1,86 @@
+import hashlib
+import hmac
+from functools import lru_cache
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dependencies import get_config
+from models.models import ORDER_TRACKING_SEQUENCE
+
+TRACKING_NUMBER_DIGITS = 12
+FEISTEL_ROUNDS = 8
+# Anyone with the key can enumerate tracking numbers, so a guessable one is refused
+MIN_SECRET_LENGTH = 32
+_HALF_MODULUS = 10 ** (TRACKING_NUMBER_DIGITS // 2)
+
+
+class TrackingNumberGenerator:
+    """
+    Derives tracking numbers from the order tracking sequence.
+
+    Each sequence value is passed through a keyed Feistel network over the 12 digit
+    decimal domain (two 6 digit halves, HMAC-SHA256 as the round function). The
+    network is a permutation, so distinct sequence values always give distinct
+    tracking numbers without a lookup or a retry, while consecutive orders get
+    numbers that cannot be guessed from each other without the key.
+
+    Sequence values are taken in blocks of the sequence's increment, so only one
+    order in every block costs a round trip.
+    """
+
+    def __init__(self, secret: str):
+        self.check_secret(secret)
+        self._key = secret.encode()
+        self._block_increment = ORDER_TRACKING_SEQUENCE.increment
+        self._next_value = 0
+        self._block_end = 0
+
+    @staticmethod
+    def check_secret(secret: str | None) -> None:
+        if not secret or len(secret) < MIN_SECRET_LENGTH:
+            raise ValueError(
+                "TRACKING_NUMBER_SECRET must be set to at least "
+                f"{MIN_SECRET_LENGTH} characters"
+            )
+
+    async def next_tracking_number(self, session: AsyncSession) -> str:
+        if self._next_value >= self._block_end:
+            block_start = await session.scalar(
+                select(ORDER_TRACKING_SEQUENCE.next_value())
+            )
+            # Another order may have refilled the block while this one waited
+            if self._next_value >= self._block_end:
+                self._next_value = block_start
+                self._block_end = block_start + self._block_increment
+
+        value = self._next_value
+        self._next_value += 1
+        return self.format(value)
+
+    def format(self, value: int) -> str:
+        if not 0 <= value < _HALF_MODULUS**2:
+            raise ValueError(
+                f"Sequence value {value} is out of the tracking number range"
+            )
+        return f"{self._permute(value):0{TRACKING_NUMBER_DIGITS}d}"
+
+    def _permute(self, value: int) -> int:
+        left, right = divmod(value, _HALF_MODULUS)
+        for round_number in range(FEISTEL_ROUNDS):
+            left, right = (
+                right,
+                (left + self._round(round_number, right)) % _HALF_MODULUS,
+            )
+        return left * _HALF_MODULUS + right
+
+    def _round(self, round_number: int, half: int) -> int:
+        digest = hmac.new(
+            self._key, f"{round_number}:{half}".encode(), hashlib.sha256
+        ).digest()
+        return int.from_bytes(digest[:8], "big") % _HALF_MODULUS
+
+
+@lru_cache
+def get_tracking_number_generator() -> TrackingNumberGenerator:
+    return TrackingNumberGenerator(get_config().auth_config.tracking_number_secret)
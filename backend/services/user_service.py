@@ -8,6 +8,7 @@ from sqlalchemy.future import select
 from fastapi import status
 
 from config.logger_config import get_logger
+from loaders import get_loaders
 from models.models import User
 from exceptions.user_exceptions import UserException
 from dependencies import db_model_to_dict
@@ -23,17 +24,14 @@ class UserService:
 
     async def get_user_by_id(self, user_id: UUID) -> dict:
         try:
-            stmt = select(User).where(User.id == user_id)
-            result = await self.db.execute(stmt)
-            user = result.scalar_one_or_none()
+            user = await get_loaders(self.db).users.load(user_id)
 
             if not user:
                 raise UserException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"User with id {user_id} not found",
                 )
-            await self.db.refresh(user)
-            return db_model_to_dict(user)
+            return user
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in get_user_by_id: {e}")
             raise UserException(
@@ -45,8 +43,6 @@ class UserService:
         try:
             result = await self.db.execute(select(User))
             users = result.scalars().all()
-            for user in users:
-                await self.db.refresh(user)
             return [db_model_to_dict(user) for user in users] if users else []
         except SQLAlchemyError as e:
             self.logger.error(f"Database error in get_all_users: {e}")
@@ -92,11 +88,9 @@ class UserService:
 
     async def check_seller_exists(self, seller_id: UUID) -> bool:
         try:
-            stmt = select(User).filter(User.id == seller_id, User.is_seller)
-            result = await self.db.execute(stmt)
-            seller = result.scalar_one_or_none()
+            user = await get_loaders(self.db).users.load(seller_id)
 
-            if seller is None:
+            if user is None or not user["is_seller"]:
                 raise UserException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Seller with ID {seller_id} not found",
@@ -124,7 +118,6 @@ class UserService:
 
             self.db.add(user)
             await self.db.flush()
-            await self.db.refresh(user)
 
             return str(user.id)
 
@@ -195,7 +188,6 @@ class UserService:
 
             user.is_verified = True
             await self.db.flush()
-            await self.db.refresh(user)
 
             return {
                 "id": str(user.id),
@@ -237,7 +229,6 @@ class UserService:
                 setattr(user, key, value)
 
             await self.db.flush()
-            await self.db.refresh(user)
             return db_model_to_dict(user)
 
         except SQLAlchemyError as e:
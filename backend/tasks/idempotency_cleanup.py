@@ -0,0 +1,20 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.logger_config import get_logger
+from services.idempotency_service import IdempotencyService
+
+logger = get_logger(__name__)
+
+IDEMPOTENCY_CLEANUP_INTERVAL_SECONDS = 3600
+
+
+async def delete_expired_idempotency_keys(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> int:
+    async with session_factory() as session:
+        async with session.begin():
+            deleted = await IdempotencyService(session).delete_expired_keys()
+
+    if deleted:
+        logger.info(f"Deleted {deleted} expired idempotency keys")
+    return deleted
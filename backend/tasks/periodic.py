@@ -0,0 +1,20 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from config.logger_config import get_logger
+
+logger = get_logger(__name__)
+
+
+async def run_periodically(
+    interval_seconds: float, job: Callable[..., Awaitable], *args
+) -> None:
+    """Run ``job(*args)`` forever, sleeping ``interval_seconds`` between runs."""
+    while True:
+        try:
+            await job(*args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Background job {job.__name__} failed: {e}")
+        await asyncio.sleep(interval_seconds)
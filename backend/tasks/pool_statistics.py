@@ -0,0 +1,19 @@
+from typing import Dict
+
+from config.logger_config import get_logger
+from models.database import DatabasePool
+
+POOL_STATISTICS_INTERVAL_SECONDS = 60
+
+logger = get_logger(__name__)
+
+
+async def log_pool_statistics(pools: Dict[str, DatabasePool]) -> None:
+    """Log every pool's usage and the connection waits since the last run."""
+    for pool in pools.values():
+        statistics = pool.take_statistics()
+        message = ", ".join(f"{key}={value}" for key, value in statistics.items())
+        if statistics["timeouts"]:
+            logger.warning(f"Connection pool statistics: {message}")
+        else:
+            logger.info(f"Connection pool statistics: {message}")
@@ -0,0 +1,38 @@
+import asyncio
+from dataclasses import replace
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.logger_config import get_logger
+from config.parser import load_config
+from models.database import build_engine, build_session_maker
+from services.seller_rollup_service import SellerRollupService
+
+logger = get_logger(__name__)
+
+
+async def rebuild_seller_rollups(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    """
+    Recompute the monthly seller rollups from the order history in one transaction.
+    Needed once after the rollup tables are created, and after orders are changed
+    outside the application.
+    """
+    async with session_factory() as session:
+        async with session.begin():
+            await SellerRollupService(session).rebuild()
+    logger.info("Rebuilt the monthly seller rollups")
+
+
+async def main() -> None:
+    # The rebuild reads the whole order history, so it must not hit the timeout
+    engine = build_engine(replace(load_config().db_config, statement_timeout_ms=0))
+    try:
+        await rebuild_seller_rollups(build_session_maker(engine))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
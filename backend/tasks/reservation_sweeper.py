@@ -0,0 +1,31 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.logger_config import get_logger
+from config.models import ReservationConfig
+from services.reservation_service import StockReservationService
+
+logger = get_logger(__name__)
+
+
+async def release_expired_reservations(
+    session_factory: async_sessionmaker[AsyncSession], config: ReservationConfig
+) -> int:
+    """
+    Release expired stock reservations in batches of ``config.sweep_batch_size``,
+    committing after every batch so no transaction holds row locks for long.
+    """
+    total_released = 0
+    while True:
+        async with session_factory() as session:
+            async with session.begin():
+                service = StockReservationService(session, config)
+                released = await service.release_expired_reservations(
+                    config.sweep_batch_size
+                )
+        total_released += released
+        if released < config.sweep_batch_size:
+            break
+
+    if total_released:
+        logger.info(f"Released {total_released} expired stock reservations")
+    return total_released
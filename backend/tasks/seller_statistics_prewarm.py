@@ -0,0 +1,58 @@
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.logger_config import get_logger
+from dependencies import add_months
+from exceptions.seller_statistics_exceptions import SellerStatisticsException
+from models.models import SellerMonthlySales
+from schemas.schemas import SelectedMonthForSellerStatistics
+from services.seller_statistics_service import SellerStatisticsService
+
+logger = get_logger(__name__)
+
+SELLER_STATISTICS_PREWARM_INTERVAL_SECONDS = 3600
+
+# The last closed month whose statistics were loaded into this process's cache
+_prewarmed_month: date | None = None
+
+
+async def prewarm_seller_statistics(
+    session_factory: async_sessionmaker[AsyncSession], today: date | None = None
+) -> int:
+    """
+    Load the statistics of the month that has just ended into the statistics cache
+    for every seller who sold something in it. Runs once per month and process,
+    on the first run after the month rolled over.
+    """
+    global _prewarmed_month
+    closed_month = add_months((today or date.today()).replace(day=1), -1)
+    if _prewarmed_month == closed_month:
+        return 0
+
+    async with session_factory() as session:
+        result = await session.execute(
+            select(SellerMonthlySales.seller_id).where(
+                SellerMonthlySales.month == closed_month
+            )
+        )
+        seller_ids = result.scalars().all()
+
+        service = SellerStatisticsService(session)
+        selected_date = SelectedMonthForSellerStatistics(
+            year=str(closed_month.year), month=str(closed_month.month)
+        )
+        for seller_id in seller_ids:
+            try:
+                await service.get_monthly_transactions(seller_id, selected_date)
+            except SellerStatisticsException as e:
+                logger.warning(
+                    f"Could not prewarm the statistics of seller {seller_id}: {e.detail}"
+                )
+
+    _prewarmed_month = closed_month
+    logger.info(
+        f"Prewarmed the {closed_month:%Y-%m} statistics of {len(seller_ids)} sellers"
+    )
+    return len(seller_ids)
@@ -0,0 +1,33 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.logger_config import get_logger
+from config.models import StripeConfig
+from services.stripe_charge_sync_service import StripeChargeSyncService
+from services.stripe_gateway import StripeGateway
+
+logger = get_logger(__name__)
+
+
+async def sync_stripe_charges(
+    session_factory: async_sessionmaker[AsyncSession],
+    config: StripeConfig,
+    stripe_gateway: StripeGateway | None = None,
+) -> int:
+    """
+    Copy the charges created since the last run into the local ledger, committing
+    after every page of ``config.charge_sync_page_size`` charges.
+    """
+    total_synced = 0
+    has_more = True
+    while has_more:
+        async with session_factory() as session:
+            async with session.begin():
+                service = StripeChargeSyncService(session, stripe_gateway)
+                synced, has_more = await service.sync_next_page(
+                    config.charge_sync_page_size
+                )
+        total_synced += synced
+
+    if total_synced:
+        logger.info(f"Synced {total_synced} Stripe charges")
+    return total_synced
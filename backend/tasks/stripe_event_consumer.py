@@ -0,0 +1,29 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.logger_config import get_logger
+from config.models import StripeConfig
+from services.stripe_event_service import StripeEventService
+
+logger = get_logger(__name__)
+
+
+async def process_stripe_events(
+    session_factory: async_sessionmaker[AsyncSession], config: StripeConfig
+) -> int:
+    """
+    Apply pending Stripe webhook events in batches of ``config.event_batch_size``,
+    committing after every batch.
+    """
+    total_claimed = 0
+    while True:
+        async with session_factory() as session:
+            async with session.begin():
+                service = StripeEventService(session, config)
+                claimed = await service.process_pending_events(config.event_batch_size)
+        total_claimed += claimed
+        if claimed < config.event_batch_size:
+            break
+
+    if total_claimed:
+        logger.info(f"Processed {total_claimed} Stripe webhook events")
+    return total_claimed
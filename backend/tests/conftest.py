@@ -10,6 +10,7 @@ from httpx import AsyncClient
 from typing import AsyncGenerator, Any
 from config.auth_config import http_only_auth_cookie
 from jose import jwt
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     create_async_engine,
@@ -18,6 +19,13 @@ from sqlalchemy.ext.asyncio import (
 from models.database import Base
 from dependencies import get_session, get_current_user
 from routers.user_router import get_user_controller, get_user_service
+from config.models import StripeConfig
+from services.category_service import category_names
+from services.seller_statistics_service import statistics_cache
+from services.stripe_gateway import StripeGateway
+from services.tracking_number_service import TrackingNumberGenerator
+from tests.fake_stripe.server import FakeStripeServer
+from tests.query_counter import QueryCounter
 import logging
 from dotenv import load_dotenv
 import os
@@ -50,6 +58,13 @@ def setup_env(monkeypatch, test_db_url):
     monkeypatch.setenv("TEST_DATABASE_URL", test_db_url)
 
 
+@pytest.fixture(autouse=True)
+def reset_in_process_caches():
+    # Every test recreates the schema, so ids are reused between tests
+    category_names.invalidate()
+    statistics_cache.clear()
+
+
 @pytest.fixture(scope="session")
 def test_user_id() -> str:
     return "123e4567-e89b-12d3-a456-426614174000"
@@ -110,6 +125,15 @@ async def test_engine():
         await engine.dispose()
 
 
+@pytest.fixture
+def query_counter(test_engine) -> QueryCounter:
+    """Count the statements run on the test engine, e.g. with ``max_queries``."""
+    counter = QueryCounter()
+    event.listen(test_engine.sync_engine, "after_cursor_execute", counter.record)
+    yield counter
+    event.remove(test_engine.sync_engine, "after_cursor_execute", counter.record)
+
+
 @pytest_asyncio.fixture
 async def test_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
     async_session = async_sessionmaker(
@@ -119,6 +143,31 @@ async def test_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+@pytest.fixture(scope="session")
+def fake_stripe_server() -> FakeStripeServer:
+    with FakeStripeServer() as server:
+        yield server
+
+
+@pytest.fixture
+def tracking_number_generator() -> TrackingNumberGenerator:
+    return TrackingNumberGenerator("test-tracking-number-secret-0123456789")
+
+
+@pytest_asyncio.fixture
+async def stripe_gateway(fake_stripe_server) -> AsyncGenerator[StripeGateway, None]:
+    gateway = StripeGateway(
+        StripeConfig(
+            secret_key="sk_test_fake",
+            api_base=fake_stripe_server.url,
+            request_timeout_seconds=2.0,
+            max_network_retries=0,
+        )
+    )
+    yield gateway
+    await gateway.close()
+
+
 @pytest_asyncio.fixture
 async def mock_user_service():
     service = AsyncMock()
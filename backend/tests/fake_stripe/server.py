@@ -0,0 +1,188 @@
+"""
+A local stand-in for the Stripe API that replays the JSON fixtures in
+``tests/fake_stripe/fixtures``.
+
+It implements just the endpoints the backend calls (checkout session creation and
+charge listing with Stripe's cursor pagination), records every request it receives
+and can add a fixed latency to each response, which makes it usable both from the
+test suite and as a target for load tests:
+
+    python -m tests.fake_stripe.server --port 12111 --latency-ms 300
+
+then start the backend with ``STRIPE_API_BASE=http://127.0.0.1:12111``.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixture(name: str):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return json.load(f)
+
+
+class FakeStripeRequestHandler(BaseHTTPRequestHandler):
+    server: "FakeStripeHTTPServer"
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self, method: str) -> None:
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            params.update(parse_qsl(self.rfile.read(length).decode()))
+
+        self.server.record_request(method, url.path, params)
+        if self.server.latency_seconds:
+            time.sleep(self.server.latency_seconds)
+
+        if method == "POST" and url.path == "/v1/checkout/sessions":
+            self._respond(200, self.server.create_checkout_session(params))
+        elif method == "GET" and url.path == "/v1/charges":
+            self._respond(200, self.server.list_charges(params))
+        else:
+            self._respond(
+                404,
+                {
+                    "error": {
+                        "type": "invalid_request_error",
+                        "message": f"Unrecognized request URL ({method}: {url.path})",
+                    }
+                },
+            )
+
+    def _respond(self, status_code: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Request-Id", f"req_fake_{next(self.server.ids)}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakeStripeHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_seconds: float = 0.0):
+        super().__init__(address, FakeStripeRequestHandler)
+        self.latency_seconds = latency_seconds
+        self.charges = sorted(
+            load_fixture("charges.json"), key=lambda c: c["created"], reverse=True
+        )
+        self.requests: list[dict] = []
+        self.ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients that time out close the socket before the delayed response is sent
+        pass
+
+    def record_request(self, method: str, path: str, params: dict) -> None:
+        with self._lock:
+            self.requests.append({"method": method, "path": path, "params": params})
+
+    def create_checkout_session(self, params: dict) -> dict:
+        session = load_fixture("checkout_session.json")
+        session["id"] = f"cs_test_{next(self.ids):06d}"
+        session["url"] = f"https://checkout.stripe.com/c/pay/{session['id']}"
+        session["expires_at"] = int(params.get("expires_at") or time.time() + 86400)
+        session["metadata"] = {
+            key.removeprefix("metadata[").removesuffix("]"): value
+            for key, value in params.items()
+            if key.startswith("metadata[")
+        }
+        for field in ("success_url", "cancel_url", "mode"):
+            if field in params:
+                session[field] = params[field]
+        return session
+
+    def list_charges(self, params: dict) -> dict:
+        charges = [
+            charge
+            for charge in self.charges
+            if charge["created"] >= int(params.get("created[gte]", 0))
+            and charge["created"] <= int(params.get("created[lte]", 2**63))
+        ]
+        if "starting_after" in params:
+            ids = [charge["id"] for charge in charges]
+            if params["starting_after"] in ids:
+                del charges[: ids.index(params["starting_after"]) + 1]
+
+        limit = int(params.get("limit", 10))
+        return {
+            "object": "list",
+            "url": "/v1/charges",
+            "has_more": len(charges) > limit,
+            "data": charges[:limit],
+        }
+
+
+class FakeStripeServer:
+    """Run a FakeStripeHTTPServer on a background thread, e.g. inside a test."""
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, latency_seconds: float = 0.0
+    ):
+        self.httpd = FakeStripeHTTPServer((host, port), latency_seconds)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> list[dict]:
+        return self.httpd.requests
+
+    def start(self) -> "FakeStripeServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeStripeServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Fake Stripe API server")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=12111)
+    arg_parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = arg_parser.parse_args()
+
+    httpd = FakeStripeHTTPServer((args.host, args.port), args.latency_ms / 1000)
+    print(f"Fake Stripe listening on http://{args.host}:{args.port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
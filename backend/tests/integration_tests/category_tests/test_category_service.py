@@ -0,0 +1,267 @@
+import pytest
+from fastapi import status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from exceptions.category_exceptions import CategoryException
+from exceptions.product_exceptions import ProductException
+from models.models import Category, ProductCategory
+from schemas.schemas import CategoryUpdate
+from services.category_service import CategoryService
+from tests.integration_tests.checkout_tests.helper import TEST_SELLER_ID
+from tests.integration_tests.seller_statistics_tests.helper import (
+    OTHER_SELLER_ID,
+    add_test_catalog,
+    add_test_seller,
+)
+
+
+class TestCategoryService:
+    @pytest.fixture
+    async def test_categories(self, test_session) -> None:
+        test_session.add_all(
+            [
+                Category(id=101, category_name="rings"),
+                Category(id=102, category_name="necklaces"),
+            ]
+        )
+        await test_session.commit()
+
+    class TestResolveNames:
+        @pytest.mark.asyncio
+        async def test_resolve_names(self, test_categories, test_session):
+            """Test that ids are mapped to names and unknown ids are left out"""
+            category_service = CategoryService(test_session)
+
+            names = await category_service.resolve_names([102, 101, 99])
+
+            assert names == {101: "rings", 102: "necklaces"}
+            assert await category_service.resolve_names([]) == {}
+
+        @pytest.mark.asyncio
+        async def test_resolve_names_served_from_cache(
+            self, test_categories, test_session, mocker
+        ):
+            """Test that repeated lookups do not query the database again"""
+            category_service = CategoryService(test_session)
+            await category_service.resolve_names([101])
+            execute = mocker.spy(test_session, "execute")
+
+            names = await category_service.resolve_names([101, 102])
+
+            assert names == {101: "rings", 102: "necklaces"}
+            execute.assert_not_called()
+
+        @pytest.mark.asyncio
+        async def test_resolve_names_after_category_writes(
+            self, test_categories, test_session
+        ):
+            """Test that added and edited categories are seen once committed"""
+            category_service = CategoryService(test_session)
+            await category_service.resolve_names([101, 102])
+
+            new_category_id = await category_service.add_new_category("Earrings")
+            after_add = await category_service.resolve_names([101, new_category_id])
+            await category_service.edit_category(
+                101, CategoryUpdate(category_name="gold rings")
+            )
+            before_commit = await category_service.resolve_names([101])
+            await test_session.commit()
+
+            assert after_add == {101: "rings", new_category_id: "earrings"}
+            assert before_commit == {101: "rings"}
+            assert await category_service.resolve_names([101]) == {101: "gold rings"}
+
+        @pytest.mark.asyncio
+        async def test_resolve_names_database_error(self, test_session, mocker):
+            """Test database error handling when loading the category names"""
+            category_service = CategoryService(test_session)
+            mocker.patch.object(
+                test_session, "execute", side_effect=SQLAlchemyError("Database error")
+            )
+
+            with pytest.raises(CategoryException) as exc:
+                await category_service.resolve_names([1])
+
+            assert exc.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    class TestGetSellerProductsByCategory:
+        @pytest.fixture
+        async def test_catalog(self, test_session) -> None:
+            await add_test_seller(test_session, TEST_SELLER_ID)
+            await add_test_seller(test_session, OTHER_SELLER_ID)
+            await add_test_catalog(
+                test_session,
+                [
+                    {
+                        "id": product_id,
+                        "name": f"Ring {product_id}",
+                        "price": 100,
+                        "stock_quantity": 1,
+                        "seller_id": seller_id,
+                        "category_ids": category_ids,
+                    }
+                    for product_id, seller_id, category_ids in (
+                        (1, TEST_SELLER_ID, [101]),
+                        (2, OTHER_SELLER_ID, [101]),
+                        (3, TEST_SELLER_ID, [102]),
+                        (4, TEST_SELLER_ID, [101, 102]),
+                        (5, TEST_SELLER_ID, [101]),
+                    )
+                ],
+                {101: "rings", 102: "necklaces"},
+            )
+
+        @pytest.mark.asyncio
+        async def test_get_seller_products_by_category_pages(
+            self, test_catalog, test_session
+        ):
+            """Test that only the seller's products in the category are paged by id"""
+            category_service = CategoryService(test_session)
+
+            first_page = await category_service.get_seller_products_by_category(
+                101, TEST_SELLER_ID, limit=2
+            )
+            second_page = await category_service.get_seller_products_by_category(
+                101, TEST_SELLER_ID, limit=2, after_id=first_page[-1]["id"]
+            )
+
+            assert [product["id"] for product in first_page] == [1, 4]
+            assert [product["id"] for product in second_page] == [5]
+            assert first_page[0]["name"] == "Ring 1"
+            assert first_page[0]["seller_id"] == TEST_SELLER_ID
+
+        @pytest.mark.asyncio
+        async def test_get_seller_products_by_category_not_found(
+            self, test_catalog, test_session
+        ):
+            """Test that an unknown category is reported as not found"""
+            category_service = CategoryService(test_session)
+
+            with pytest.raises(CategoryException) as exc:
+                await category_service.get_seller_products_by_category(
+                    999, TEST_SELLER_ID
+                )
+
+            assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+            assert (
+                await category_service.get_seller_products_by_category(
+                    102, OTHER_SELLER_ID
+                )
+                == []
+            )
+
+    class TestCategoriesToProducts:
+        @pytest.fixture
+        async def test_catalog(self, test_session) -> None:
+            await add_test_seller(test_session, TEST_SELLER_ID)
+            await add_test_catalog(
+                test_session,
+                [
+                    {
+                        "id": product_id,
+                        "name": f"Ring {product_id}",
+                        "price": 100,
+                        "stock_quantity": 1,
+                        "seller_id": TEST_SELLER_ID,
+                        "category_ids": category_ids,
+                    }
+                    for product_id, category_ids in ((1, [101]), (2, []), (3, []))
+                ],
+                {101: "rings", 102: "necklaces"},
+            )
+
+        @staticmethod
+        async def links(test_session) -> set:
+            result = await test_session.execute(
+                select(ProductCategory.product_id, ProductCategory.category_id)
+            )
+            return set(result.all())
+
+        @pytest.mark.asyncio
+        async def test_add_category_to_product_twice(self, test_catalog, test_session):
+            """Test that linking a product to a category it is already in is a no-op"""
+            category_service = CategoryService(test_session)
+
+            added = await category_service.add_category_to_product(2, 102)
+            repeated = await category_service.add_category_to_product(2, 102)
+
+            assert added == {"message": "Category added to the product successfully."}
+            assert repeated == {
+                "message": "This category is already linked to the product."
+            }
+            assert await self.links(test_session) == {(1, 101), (2, 102)}
+
+        @pytest.mark.asyncio
+        async def test_add_category_to_unknown_product(
+            self, test_catalog, test_session
+        ):
+            """Test that linking a product that does not exist is reported as not found"""
+            with pytest.raises(ProductException) as exc:
+                await CategoryService(test_session).add_category_to_product(999, 102)
+
+            assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+        @pytest.mark.asyncio
+        async def test_add_unknown_category_to_product(
+            self, test_catalog, test_session
+        ):
+            """Test that linking a category that does not exist is reported as not found"""
+            with pytest.raises(CategoryException) as exc:
+                await CategoryService(test_session).add_category_to_product(2, 999)
+
+            assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+            assert exc.value.detail == "Category with id 999 not found!"
+
+        @pytest.mark.asyncio
+        async def test_add_category_to_product_unique_violation(
+            self, test_session, mocker
+        ):
+            """Test that a link rejected by the unique constraint is reported as a conflict"""
+            unique_violation = Exception("duplicate key value")
+            unique_violation.sqlstate = "23505"
+            mocker.patch.object(
+                test_session,
+                "execute",
+                side_effect=IntegrityError("INSERT", {}, unique_violation),
+            )
+
+            with pytest.raises(CategoryException) as exc:
+                await CategoryService(test_session).add_category_to_product(2, 102)
+
+            assert exc.value.status_code == status.HTTP_409_CONFLICT
+
+        @pytest.mark.asyncio
+        async def test_add_categories_to_products(
+            self, test_catalog, test_session, query_counter
+        ):
+            """Test that every product is linked to every category in one statement"""
+            category_service = CategoryService(test_session)
+
+            with query_counter.max_queries(1):
+                added = await category_service.add_categories_to_products(
+                    [1, 2, 3, 999], [101, 102, 999]
+                )
+
+            assert added == 5
+            assert await self.links(test_session) == {
+                (product_id, category_id)
+                for product_id in (1, 2, 3)
+                for category_id in (101, 102)
+            }
+
+        @pytest.mark.asyncio
+        async def test_delete_categories_from_products(
+            self, test_catalog, test_session, query_counter
+        ):
+            """Test that every product is unlinked from every category in one statement"""
+            category_service = CategoryService(test_session)
+            await category_service.add_categories_to_products([1, 2, 3], [101, 102])
+
+            with query_counter.max_queries(1):
+                removed = await category_service.delete_categories_from_products(
+                    [1, 2], [101, 102]
+                )
+
+            assert removed == 4
+            assert await self.links(test_session) == {(3, 101), (3, 102)}
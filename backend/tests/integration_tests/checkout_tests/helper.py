@@ -0,0 +1,61 @@
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dependencies import hash_password
+from models.models import Product, StockReservation, User
+
+TEST_SELLER_ID = uuid.UUID("7a4ae081-2f63-4653-bf67-f69a00dcb791")
+
+
+async def add_test_products(session: AsyncSession, products: list[dict]) -> None:
+    """
+    Add a seller and the given products to the database for testing purposes.
+
+    Args:
+        session: SQLAlchemy async session
+        products: List of product dictionaries, every product is owned by the
+            seller with id TEST_SELLER_ID
+    """
+    session.add(
+        User(
+            id=TEST_SELLER_ID,
+            first_name="John",
+            last_name="Doe",
+            email="seller@example.com",
+            hashed_password=hash_password("strongpassword"),
+            is_seller=True,
+            registration_date=date.today(),
+        )
+    )
+    await session.flush()
+    session.add_all(
+        [Product(seller_id=TEST_SELLER_ID, **product) for product in products]
+    )
+    await session.commit()
+
+
+async def get_reserved_quantity(session: AsyncSession, product_id: int) -> int:
+    """Sum the quantities held for a product in the reservation ledger."""
+    result = await session.execute(
+        select(func.coalesce(func.sum(StockReservation.quantity), 0)).where(
+            StockReservation.product_id == product_id
+        )
+    )
+    return result.scalar_one()
+
+
+def build_signed_webhook(event: dict, secret: str) -> tuple[bytes, str]:
+    """Serialize a Stripe event and sign it the way Stripe signs webhook requests."""
+    payload = json.dumps(event).encode()
+    timestamp = int(time.time())
+    signature = hmac.new(
+        secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256
+    ).hexdigest()
+    return payload, f"t={timestamp},v1={signature}"
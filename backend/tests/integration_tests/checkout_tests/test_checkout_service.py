@@ -0,0 +1,181 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import status
+
+from config.models import ReservationConfig
+from exceptions.product_exceptions import ProductException
+from models.models import Product
+from schemas.schemas import CartItemForCheckout, GuestUserInfo, OrderData
+from services.checkout_service import CheckoutService
+from services.reservation_service import StockReservationService
+from tests.integration_tests.checkout_tests.helper import (
+    add_test_products,
+    get_reserved_quantity,
+)
+
+
+class TestCheckoutService:
+    @pytest.fixture
+    def test_products(self) -> list[dict]:
+        return [
+            {"id": 1, "name": "Gold ring", "price": 120, "stock_quantity": 5},
+            {"id": 2, "name": "Silver necklace", "price": 80, "stock_quantity": 1},
+        ]
+
+    @pytest.fixture
+    def checkout_service(self, test_session, stripe_gateway) -> CheckoutService:
+        reservation_service = StockReservationService(test_session, ReservationConfig())
+        return CheckoutService(test_session, stripe_gateway, reservation_service)
+
+    class TestCreateCheckoutSession:
+        @pytest.fixture(autouse=True)
+        def frontend_domain(self, monkeypatch) -> None:
+            monkeypatch.setattr(
+                "services.checkout_service.get_config",
+                lambda: SimpleNamespace(
+                    server_config=SimpleNamespace(
+                        customer_frontend_domain="http://localhost:3000"
+                    )
+                ),
+            )
+
+        @pytest.fixture
+        def guest_user_info(self) -> GuestUserInfo:
+            return GuestUserInfo(
+                first_name="Jane",
+                last_name="Doe",
+                email="jane@example.com",
+                phone="+36301234567",
+                shipping_address="1 Main St, Budapest",
+            )
+
+        @staticmethod
+        def cart_item(product: dict, quantity: int) -> CartItemForCheckout:
+            return CartItemForCheckout(
+                id=product["id"],
+                name=product["name"],
+                price=product["price"],
+                category=[11, 12],
+                quantity=quantity,
+                image_path="ring.png",
+            )
+
+        @pytest.mark.asyncio
+        async def test_create_checkout_session_expiry(
+            self,
+            checkout_service,
+            test_products,
+            guest_user_info,
+            test_session,
+            monkeypatch,
+        ):
+            """Test that Stripe is asked for a session at least 30 minutes long"""
+            await add_test_products(test_session, test_products)
+            calls = []
+            create_checkout_session = (
+                checkout_service.stripe_gateway.create_checkout_session
+            )
+
+            async def record_call(params):
+                calls.append((time.time(), params))
+                return await create_checkout_session(params)
+
+            monkeypatch.setattr(
+                checkout_service.stripe_gateway, "create_checkout_session", record_call
+            )
+
+            result = await checkout_service.create_checkout_session(
+                [self.cart_item(test_products[0], 2)], guest_user_info
+            )
+
+            called_at, params = calls[0]
+            assert params["expires_at"] - called_at >= 30 * 60
+            assert (
+                params["payment_intent_data"]["metadata"]["product_categories"]
+                == '{"11": 2, "12": 2}'
+            )
+            assert (
+                result["reserved_until"]
+                > datetime.fromtimestamp(params["expires_at"]).isoformat()
+            )
+
+        @pytest.mark.asyncio
+        async def test_create_checkout_session_stock_held_by_another_checkout(
+            self, checkout_service, test_products, guest_user_info, test_session
+        ):
+            """Test that units held by another checkout cannot be bought"""
+            await add_test_products(test_session, test_products)
+            await checkout_service.reservation_service.reserve_items({2: 1})
+
+            with pytest.raises(ProductException) as exc:
+                await checkout_service.create_checkout_session(
+                    [self.cart_item(test_products[1], 1)], guest_user_info
+                )
+
+            assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+            assert "Insufficient stock for product 2" in exc.value.detail
+
+    class TestUpdateStockQuantity:
+        @pytest.mark.asyncio
+        async def test_update_stock_quantity_decrements_stock(
+            self, checkout_service, test_products, test_session
+        ):
+            """Test that every product is decremented, duplicate lines summed up"""
+            await add_test_products(test_session, test_products)
+            reservation = await checkout_service.reservation_service.reserve_items(
+                {1: 3}
+            )
+            await checkout_service.reservation_service.attach_checkout_session(
+                reservation["reservation_ids"], "cs_1"
+            )
+
+            await checkout_service.update_stock_quantity(
+                [
+                    OrderData(product_id=1, quantity=2, price=120),
+                    OrderData(product_id=2, quantity=1, price=80),
+                    OrderData(product_id=1, quantity=1, price=120),
+                ],
+                "cs_1",
+            )
+            await test_session.commit()
+
+            assert (await test_session.get(Product, 1)).stock_quantity == 2
+            assert (await test_session.get(Product, 2)).stock_quantity == 0
+            assert await get_reserved_quantity(test_session, 1) == 0
+
+        @pytest.mark.asyncio
+        async def test_update_stock_quantity_insufficient_stock(
+            self, checkout_service, test_products, test_session
+        ):
+            """Test that an order exceeding the stock is rejected with the available amount"""
+            await add_test_products(test_session, test_products)
+
+            with pytest.raises(ProductException) as exc:
+                await checkout_service.update_stock_quantity(
+                    [
+                        OrderData(product_id=1, quantity=1, price=120),
+                        OrderData(product_id=2, quantity=2, price=80),
+                    ]
+                )
+
+            assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+            assert exc.value.detail == (
+                "Insufficient stock for product 2. Requested: 2, Available: 1"
+            )
+
+        @pytest.mark.asyncio
+        async def test_update_stock_quantity_missing_product(
+            self, checkout_service, test_products, test_session
+        ):
+            """Test that an unknown product is reported as not found"""
+            await add_test_products(test_session, test_products)
+
+            with pytest.raises(ProductException) as exc:
+                await checkout_service.update_stock_quantity(
+                    [OrderData(product_id=99, quantity=1, price=10)]
+                )
+
+            assert exc.value.status_code == status.HTTP_404_NOT_FOUND
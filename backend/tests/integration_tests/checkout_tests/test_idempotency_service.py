@@ -0,0 +1,189 @@
+import asyncio
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi import status
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from exceptions.idempotency_exceptions import IdempotencyException
+from models.models import IdempotencyKey
+from services.idempotency_service import IdempotencyService, completed_responses
+
+
+class TestIdempotencyService:
+    @pytest.fixture
+    def idempotency_key(self) -> str:
+        return str(uuid4())
+
+    @pytest.fixture
+    def payload(self) -> dict:
+        return {"items": [{"product_id": 1, "quantity": 2}]}
+
+    class TestRun:
+        @pytest.mark.asyncio
+        async def test_run_replays_stored_response(
+            self, idempotency_key, payload, test_session
+        ):
+            """Test that a repeated key returns the first response without rerunning the handler"""
+            service = IdempotencyService(test_session)
+            calls = []
+
+            async def handler():
+                calls.append(1)
+                return {"order_id": len(calls)}
+
+            first = await service.run(
+                idempotency_key, "post-checkout", payload, handler
+            )
+            second = await service.run(
+                idempotency_key, "post-checkout", payload, handler
+            )
+
+            assert first == second == {"order_id": 1}
+            assert len(calls) == 1
+
+        @pytest.mark.asyncio
+        async def test_run_replays_from_database(
+            self, idempotency_key, payload, test_session
+        ):
+            """Test that a stored response is replayed after the in-memory cache is cleared"""
+            service = IdempotencyService(test_session)
+
+            async def handler():
+                return {"session_id": "cs_test_1"}
+
+            await service.run(
+                idempotency_key, "create-checkout-session", payload, handler
+            )
+            completed_responses.pop(idempotency_key)
+
+            async def failing_handler():
+                raise AssertionError("handler must not run again")
+
+            result = await service.run(
+                idempotency_key, "create-checkout-session", payload, failing_handler
+            )
+            stored = await test_session.get(IdempotencyKey, idempotency_key)
+
+            assert result == {"session_id": "cs_test_1"}
+            assert stored.completed_at is not None
+
+        @pytest.mark.asyncio
+        async def test_run_rejects_different_payload(
+            self, idempotency_key, payload, test_session
+        ):
+            """Test that reusing a key for a different request body is rejected"""
+            service = IdempotencyService(test_session)
+
+            async def handler():
+                return {"order_id": 1}
+
+            await service.run(idempotency_key, "post-checkout", payload, handler)
+
+            with pytest.raises(IdempotencyException) as exc:
+                await service.run(
+                    idempotency_key, "post-checkout", {"items": []}, handler
+                )
+
+            assert exc.value.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        @pytest.mark.asyncio
+        async def test_run_waits_for_concurrent_duplicate(
+            self, idempotency_key, payload, test_engine
+        ):
+            """Test that a concurrent duplicate waits for the in-flight result"""
+            session_maker = async_sessionmaker(test_engine, class_=AsyncSession)
+            calls = []
+
+            async def handler():
+                calls.append(1)
+                await asyncio.sleep(0.2)
+                return {"order_id": 42}
+
+            async def run_request():
+                async with session_maker() as session:
+                    return await IdempotencyService(session).run(
+                        idempotency_key, "post-checkout", payload, handler
+                    )
+
+            results = await asyncio.gather(run_request(), run_request(), run_request())
+
+            assert results == [{"order_id": 42}] * 3
+            assert len(calls) == 1
+
+        @pytest.mark.asyncio
+        async def test_run_releases_key_on_failure(
+            self, idempotency_key, payload, test_session
+        ):
+            """Test that a failed request can be retried with the same key"""
+            service = IdempotencyService(test_session)
+
+            async def failing_handler():
+                raise IdempotencyException(status_code=status.HTTP_400_BAD_REQUEST)
+
+            async def handler():
+                return {"order_id": 7}
+
+            with pytest.raises(IdempotencyException):
+                await service.run(
+                    idempotency_key, "post-checkout", payload, failing_handler
+                )
+            result = await service.run(
+                idempotency_key, "post-checkout", payload, handler
+            )
+
+            assert result == {"order_id": 7}
+
+        @pytest.mark.asyncio
+        async def test_run_rejects_key_in_progress(
+            self, idempotency_key, payload, test_session
+        ):
+            """Test that a key claimed by another process and not yet completed is rejected"""
+            test_session.add(
+                IdempotencyKey(
+                    key=idempotency_key,
+                    endpoint="post-checkout",
+                    request_hash="0" * 64,
+                    created_at=datetime.now(),
+                )
+            )
+            await test_session.commit()
+
+            async def handler():
+                return {"order_id": 1}
+
+            with pytest.raises(IdempotencyException) as exc:
+                await IdempotencyService(test_session).run(
+                    idempotency_key, "post-checkout", payload, handler
+                )
+
+            assert exc.value.status_code == status.HTTP_409_CONFLICT
+            assert await test_session.get(IdempotencyKey, idempotency_key) is not None
+
+    class TestDeleteExpiredKeys:
+        @pytest.mark.asyncio
+        async def test_delete_expired_keys(
+            self, idempotency_key, payload, test_session
+        ):
+            """Test that only keys older than the retention window are deleted"""
+            service = IdempotencyService(test_session)
+            fresh_key = str(uuid4())
+
+            async def handler():
+                return {"order_id": 1}
+
+            await service.run(idempotency_key, "post-checkout", payload, handler)
+            await service.run(fresh_key, "post-checkout", payload, handler)
+            await test_session.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == idempotency_key)
+                .values(created_at=datetime.now() - timedelta(days=2))
+            )
+
+            deleted = await service.delete_expired_keys()
+            remaining = await test_session.execute(select(IdempotencyKey.key))
+
+            assert deleted == 1
+            assert remaining.scalars().all() == [fresh_key]
@@ -0,0 +1,139 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.models import ReservationConfig
+from exceptions.product_exceptions import ProductException
+from models.models import StockReservation
+from services.reservation_service import StockReservationService
+from tests.integration_tests.checkout_tests.helper import (
+    add_test_products,
+    get_reserved_quantity,
+)
+
+
+class TestStockReservationService:
+    @pytest.fixture
+    def test_products(self) -> list[dict]:
+        return [
+            {"id": 1, "name": "Gold ring", "price": 120, "stock_quantity": 5},
+            {"id": 2, "name": "Silver necklace", "price": 80, "stock_quantity": 1},
+        ]
+
+    @pytest.fixture
+    def reservation_config(self) -> ReservationConfig:
+        return ReservationConfig(ttl_minutes=30, sweep_batch_size=2)
+
+    class TestReserveItems:
+        @pytest.mark.asyncio
+        async def test_reserve_items_reduces_available_stock(
+            self, test_products, reservation_config, test_session
+        ):
+            """Test that reserved units are no longer available to other checkouts"""
+            service = StockReservationService(test_session, reservation_config)
+            await add_test_products(test_session, test_products)
+
+            reservation = await service.reserve_items({1: 2, 2: 1})
+            available = await service.get_available_stock([1, 2])
+
+            assert len(reservation["reservation_ids"]) == 2
+            assert reservation["expires_at"] > datetime.now()
+            assert available == {1: 3, 2: 0}
+
+        @pytest.mark.asyncio
+        async def test_reserve_items_insufficient_stock(
+            self, test_products, reservation_config, test_session
+        ):
+            """Test that a product cannot be reserved past its unreserved stock"""
+            service = StockReservationService(test_session, reservation_config)
+            await add_test_products(test_session, test_products)
+            await service.reserve_items({2: 1})
+
+            with pytest.raises(ProductException) as exc:
+                await service.reserve_items({2: 1})
+
+            assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+            assert "Insufficient stock for product 2" in exc.value.detail
+
+        @pytest.mark.asyncio
+        async def test_reserve_items_concurrently(
+            self, test_products, reservation_config, test_engine, test_session
+        ):
+            """Test that two checkouts racing for the last unit cannot both reserve it"""
+            await add_test_products(test_session, test_products)
+
+            async with AsyncSession(test_engine) as other_session:
+                service = StockReservationService(test_session, reservation_config)
+                other_service = StockReservationService(
+                    other_session, reservation_config
+                )
+                await service.reserve_items({2: 1})
+                other_reservation = asyncio.create_task(
+                    other_service.reserve_items({2: 1})
+                )
+                await asyncio.sleep(0.5)
+                assert not other_reservation.done()
+
+                await test_session.commit()
+                with pytest.raises(ProductException) as exc:
+                    await other_reservation
+
+            assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+            assert await get_reserved_quantity(test_session, 2) == 1
+
+        @pytest.mark.asyncio
+        async def test_reserve_items_product_not_found(
+            self, reservation_config, test_session
+        ):
+            """Test reserving a product that does not exist"""
+            service = StockReservationService(test_session, reservation_config)
+
+            with pytest.raises(ProductException) as exc:
+                await service.reserve_items({99: 1})
+
+            assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+    class TestReleaseReservations:
+        @pytest.mark.asyncio
+        async def test_consume_reservations_by_checkout_session(
+            self, test_products, reservation_config, test_session
+        ):
+            """Test that completing a checkout releases its holds"""
+            service = StockReservationService(test_session, reservation_config)
+            await add_test_products(test_session, test_products)
+            reservation = await service.reserve_items({1: 2})
+            await service.attach_checkout_session(
+                reservation["reservation_ids"], "cs_test_123"
+            )
+
+            released = await service.consume_reservations("cs_test_123")
+
+            assert released == 1
+            assert await get_reserved_quantity(test_session, 1) == 0
+
+        @pytest.mark.asyncio
+        async def test_release_expired_reservations_in_batches(
+            self, test_products, reservation_config, test_session
+        ):
+            """Test that only expired holds are swept, at most one batch at a time"""
+            service = StockReservationService(test_session, reservation_config)
+            await add_test_products(test_session, test_products)
+            for _ in range(3):
+                await service.reserve_items({1: 1})
+            active = await service.reserve_items({1: 1})
+            await test_session.execute(
+                update(StockReservation)
+                .where(StockReservation.id.notin_(active["reservation_ids"]))
+                .values(expires_at=datetime.now() - timedelta(minutes=1))
+            )
+
+            first_batch = await service.release_expired_reservations(2)
+            second_batch = await service.release_expired_reservations(2)
+
+            assert (first_batch, second_batch) == (2, 1)
+            assert await get_reserved_quantity(test_session, 1) == 1
+            assert await service.get_available_stock([1]) == {1: 4}
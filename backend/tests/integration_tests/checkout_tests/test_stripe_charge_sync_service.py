@@ -0,0 +1,170 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.models import StripeConfig
+from models.models import StripeCharge, StripeSyncState
+from services.stripe_charge_sync_service import (
+    CHARGE_SYNC_STATE,
+    StripeChargeSyncService,
+    parse_charge_metadata,
+)
+from tasks.stripe_charge_sync import sync_stripe_charges
+from tests.integration_tests.checkout_tests.helper import TEST_SELLER_ID
+
+NEWEST_CHARGE_CREATED = 1738411200
+
+
+class TestStripeChargeSyncService:
+    @pytest.fixture
+    def stripe_config(self) -> StripeConfig:
+        return StripeConfig(secret_key="sk_test_fake", charge_sync_page_size=2)
+
+    @pytest.fixture
+    def session_factory(self, test_engine) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(test_engine, class_=AsyncSession)
+
+    class TestParseChargeMetadata:
+        def test_parse_charge_metadata_splits_amount_by_quantity(self):
+            """Test that the charge amount is split between the items by quantity"""
+            parsed = parse_charge_metadata(
+                {
+                    "seller_id": str(TEST_SELLER_ID),
+                    "product_quantities": '{"Gold ring": 3, "Silver necklace": 1}',
+                    "product_categories": '{"1": 3, "2": 4}',
+                },
+                40000,
+            )
+
+            assert parsed == {
+                "seller_id": TEST_SELLER_ID,
+                "items": [
+                    {"name": "Gold ring", "quantity": 3, "revenue": 300.0},
+                    {"name": "Silver necklace", "quantity": 1, "revenue": 100.0},
+                ],
+                "product_categories": {"1": 3, "2": 4},
+            }
+
+        def test_parse_charge_metadata_of_a_multi_item_cart(self):
+            """Test that a charge listing the seller of every item keeps its seller"""
+            parsed = parse_charge_metadata(
+                {
+                    "seller_id": f"{TEST_SELLER_ID}, {TEST_SELLER_ID}",
+                    "product_quantities": '{"Gold ring": 1, "Silver necklace": 1}',
+                    "product_categories": '{"1": 1, "2": 1}',
+                },
+                20000,
+            )
+
+            assert parsed["seller_id"] == TEST_SELLER_ID
+            assert [item["name"] for item in parsed["items"]] == [
+                "Gold ring",
+                "Silver necklace",
+            ]
+
+        def test_parse_charge_metadata_skips_malformed_entries(self):
+            """Test that charges without legacy metadata are stored without a seller"""
+            parsed = parse_charge_metadata(
+                {
+                    "seller_id": "not-a-uuid",
+                    "product_quantities": "{'Gold ring': 2",
+                    "product_categories": '{"rings": 1}',
+                },
+                1000,
+            )
+
+            assert parsed == {"seller_id": None, "items": [], "product_categories": {}}
+
+    class TestSyncStripeCharges:
+        @pytest.mark.asyncio
+        async def test_sync_stripe_charges_pages_through_all_charges(
+            self,
+            session_factory,
+            stripe_config,
+            stripe_gateway,
+            fake_stripe_server,
+            test_session,
+        ):
+            """Test that the first run pages through every charge and moves the watermark"""
+            first_request = len(fake_stripe_server.requests)
+
+            synced = await sync_stripe_charges(
+                session_factory, stripe_config, stripe_gateway
+            )
+
+            charges = (
+                (await test_session.execute(select(StripeCharge).order_by("id")))
+                .scalars()
+                .all()
+            )
+            state = await test_session.get(StripeSyncState, CHARGE_SYNC_STATE)
+            requests = fake_stripe_server.requests[first_request:]
+
+            assert synced == 4
+            assert [charge.id for charge in charges] == [
+                "ch_test_0001",
+                "ch_test_0002",
+                "ch_test_0003",
+                "ch_test_0004",
+            ]
+            assert charges[0].created == datetime(2025, 1, 1, 12)
+            assert charges[0].seller_id == TEST_SELLER_ID
+            assert charges[0].items == [
+                {"name": "Gold ring", "quantity": 2, "revenue": 240.0}
+            ]
+            assert [
+                request["params"].get("starting_after") for request in requests
+            ] == [
+                None,
+                "ch_test_0003",
+            ]
+            assert state.watermark == NEWEST_CHARGE_CREATED
+            assert state.cursor is None
+
+        @pytest.mark.asyncio
+        async def test_sync_stripe_charges_is_incremental(
+            self,
+            session_factory,
+            stripe_config,
+            stripe_gateway,
+            fake_stripe_server,
+            test_session,
+        ):
+            """Test that a later run only lists charges created since the watermark"""
+            await sync_stripe_charges(session_factory, stripe_config, stripe_gateway)
+            first_request = len(fake_stripe_server.requests)
+
+            synced = await sync_stripe_charges(
+                session_factory, stripe_config, stripe_gateway
+            )
+            requests = fake_stripe_server.requests[first_request:]
+
+            assert synced == 1
+            assert [request["params"]["created[gte]"] for request in requests] == [
+                str(NEWEST_CHARGE_CREATED)
+            ]
+
+        @pytest.mark.asyncio
+        async def test_sync_stripe_charges_resumes_interrupted_run(
+            self, session_factory, stripe_config, stripe_gateway, test_session
+        ):
+            """Test that a run stopped after a page continues from its saved cursor"""
+            service = StripeChargeSyncService(test_session, stripe_gateway)
+            synced, has_more = await service.sync_next_page(page_size=2)
+            await test_session.commit()
+            state = await test_session.get(StripeSyncState, CHARGE_SYNC_STATE)
+
+            assert (synced, has_more) == (2, True)
+            assert (state.watermark, state.cursor) == (0, "ch_test_0003")
+            assert state.pending_watermark == NEWEST_CHARGE_CREATED
+
+            synced = await sync_stripe_charges(
+                session_factory, stripe_config, stripe_gateway
+            )
+            await test_session.refresh(state)
+
+            assert synced == 2
+            assert state.watermark == NEWEST_CHARGE_CREATED
+            assert state.pending_watermark is None
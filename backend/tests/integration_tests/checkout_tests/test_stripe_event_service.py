@@ -0,0 +1,250 @@
+import pytest
+from fastapi import status
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.models import ReservationConfig, StripeConfig
+from exceptions.stripe_exceptions import StripeWebhookException
+from models.models import Order, OrderItem, Product, StripeEvent
+from schemas.schemas import GuestUserInfo, OrderData
+from services.checkout_service import (
+    CheckoutService,
+    decode_order_metadata,
+    encode_order_metadata,
+)
+from services.order_service import OrderService
+from services.reservation_service import StockReservationService
+from services.stripe_event_service import StripeEventService
+from tests.integration_tests.checkout_tests.helper import (
+    add_test_products,
+    build_signed_webhook,
+    get_reserved_quantity,
+)
+
+WEBHOOK_SECRET = "whsec_test_secret"
+
+
+def build_event(event_id: str, session_id: str, metadata: dict) -> dict:
+    return {
+        "id": event_id,
+        "object": "event",
+        "type": "checkout.session.completed",
+        "data": {
+            "object": {
+                "id": session_id,
+                "object": "checkout.session",
+                "payment_status": "paid",
+                "metadata": metadata,
+            }
+        },
+    }
+
+
+class TestStripeEventService:
+    @pytest.fixture
+    def test_products(self) -> list[dict]:
+        return [
+            {"id": 1, "name": "Gold ring", "price": 120, "stock_quantity": 5},
+            {"id": 2, "name": "Silver necklace", "price": 80, "stock_quantity": 1},
+        ]
+
+    @pytest.fixture
+    def guest_user_info(self) -> GuestUserInfo:
+        return GuestUserInfo(
+            first_name="Jane",
+            last_name="Doe",
+            email="jane@example.com",
+            phone="+36301234567",
+            shipping_address="1 Main St, Budapest",
+        )
+
+    @pytest.fixture
+    def stripe_config(self) -> StripeConfig:
+        return StripeConfig(
+            secret_key="sk_test_fake",
+            webhook_secret=WEBHOOK_SECRET,
+            event_max_attempts=2,
+        )
+
+    @pytest.fixture
+    def event_service(
+        self, test_session, stripe_config, stripe_gateway, tracking_number_generator
+    ):
+        reservation_service = StockReservationService(test_session, ReservationConfig())
+        checkout_service = CheckoutService(
+            test_session, stripe_gateway, reservation_service
+        )
+        order_service = OrderService(test_session, tracking_number_generator)
+        return StripeEventService(
+            test_session, stripe_config, checkout_service, order_service
+        )
+
+    class TestOrderMetadata:
+        def test_order_metadata_round_trip(self, guest_user_info):
+            """Test that order lines split over several metadata keys decode unchanged"""
+            orders = [
+                OrderData(product_id=product_id, quantity=2, price=19.99)
+                for product_id in range(1, 60)
+            ]
+
+            metadata = encode_order_metadata(orders, guest_user_info)
+            decoded_orders, decoded_guest = decode_order_metadata(metadata)
+
+            assert "order_lines_1" in metadata
+            assert all(len(value) <= 500 for value in metadata.values())
+            assert decoded_orders == orders
+            assert decoded_guest == guest_user_info
+
+    class TestRecordEvent:
+        @pytest.mark.asyncio
+        async def test_record_event_rejects_invalid_signature(
+            self, event_service, test_session
+        ):
+            """Test that an event signed with another secret is rejected"""
+            payload, signature = build_signed_webhook(
+                build_event("evt_1", "cs_1", {}), "whsec_other"
+            )
+
+            with pytest.raises(StripeWebhookException) as exc:
+                await event_service.record_event(payload, signature)
+
+            assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+
+        @pytest.mark.asyncio
+        async def test_record_event_stores_redelivery_once(
+            self, event_service, test_session
+        ):
+            """Test that a redelivered event is stored only once"""
+            payload, signature = build_signed_webhook(
+                build_event("evt_1", "cs_1", {}), WEBHOOK_SECRET
+            )
+
+            assert await event_service.record_event(payload, signature)
+            assert await event_service.record_event(payload, signature)
+            result = await test_session.execute(select(StripeEvent.id))
+
+            assert result.scalars().all() == ["evt_1"]
+
+        @pytest.mark.asyncio
+        async def test_record_event_commits_before_acknowledging(
+            self, event_service, test_engine
+        ):
+            """Test that a recorded event is visible to other sessions right away"""
+            payload, signature = build_signed_webhook(
+                build_event("evt_1", "cs_1", {}), WEBHOOK_SECRET
+            )
+
+            assert await event_service.record_event(payload, signature)
+            async with AsyncSession(test_engine) as other_session:
+                result = await other_session.execute(select(StripeEvent.id))
+
+            assert result.scalars().all() == ["evt_1"]
+
+        @pytest.mark.asyncio
+        async def test_record_event_fails_when_commit_fails(
+            self, event_service, test_session, mocker
+        ):
+            """Test that the webhook is not acknowledged if the event is not committed"""
+            payload, signature = build_signed_webhook(
+                build_event("evt_1", "cs_1", {}), WEBHOOK_SECRET
+            )
+            mocker.patch.object(
+                test_session, "commit", side_effect=SQLAlchemyError("commit failed")
+            )
+
+            with pytest.raises(StripeWebhookException) as exc:
+                await event_service.record_event(payload, signature)
+            result = await test_session.execute(select(StripeEvent.id))
+
+            assert exc.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+            assert result.scalars().all() == []
+
+        @pytest.mark.asyncio
+        async def test_record_event_ignores_unhandled_types(
+            self, event_service, test_session
+        ):
+            """Test that event types without a handler are acknowledged but not stored"""
+            event = build_event("evt_1", "cs_1", {})
+            event["type"] = "charge.refunded"
+            payload, signature = build_signed_webhook(event, WEBHOOK_SECRET)
+
+            assert not await event_service.record_event(payload, signature)
+            result = await test_session.execute(select(StripeEvent.id))
+
+            assert result.scalars().all() == []
+
+    class TestProcessPendingEvents:
+        @pytest.mark.asyncio
+        async def test_process_pending_events_creates_order(
+            self, event_service, test_products, guest_user_info, test_session
+        ):
+            """Test that a paid session becomes an order and consumes its reservation"""
+            await add_test_products(test_session, test_products)
+            reservation = (
+                await event_service.checkout_service.reservation_service.reserve_items(
+                    {1: 2}
+                )
+            )
+            await event_service.checkout_service.reservation_service.attach_checkout_session(
+                reservation["reservation_ids"], "cs_1"
+            )
+            metadata = encode_order_metadata(
+                [OrderData(product_id=1, quantity=2, price=120)], guest_user_info
+            )
+            for event_id in ("evt_1", "evt_2"):
+                payload, signature = build_signed_webhook(
+                    build_event(event_id, "cs_1", metadata), WEBHOOK_SECRET
+                )
+                await event_service.record_event(payload, signature)
+
+            claimed = await event_service.process_pending_events(batch_size=10)
+            await test_session.commit()
+
+            order = (await test_session.execute(select(Order))).scalars().one()
+            items = (await test_session.execute(select(OrderItem))).scalars().all()
+            product = await test_session.get(Product, 1)
+            pending = await test_session.execute(
+                select(StripeEvent.id).where(StripeEvent.processed_at.is_(None))
+            )
+
+            assert claimed == 2
+            assert order.checkout_session_id == "cs_1"
+            assert order.email == "jane@example.com"
+            assert [(item.product_id, item.quantity) for item in items] == [(1, 2)]
+            assert product.stock_quantity == 3
+            assert await get_reserved_quantity(test_session, 1) == 0
+            assert pending.scalars().all() == []
+
+        @pytest.mark.asyncio
+        async def test_process_pending_events_isolates_failures(
+            self, event_service, test_products, guest_user_info, test_session
+        ):
+            """Test that a failing event is retried later without blocking the others"""
+            await add_test_products(test_session, test_products)
+            oversold = encode_order_metadata(
+                [OrderData(product_id=2, quantity=3, price=80)], guest_user_info
+            )
+            valid = encode_order_metadata(
+                [OrderData(product_id=1, quantity=1, price=120)], guest_user_info
+            )
+            for event_id, session_id, metadata in (
+                ("evt_1", "cs_1", oversold),
+                ("evt_2", "cs_2", valid),
+            ):
+                payload, signature = build_signed_webhook(
+                    build_event(event_id, session_id, metadata), WEBHOOK_SECRET
+                )
+                await event_service.record_event(payload, signature)
+
+            await event_service.process_pending_events(batch_size=10)
+            await test_session.commit()
+
+            failed = await test_session.get(StripeEvent, "evt_1")
+            orders = (await test_session.execute(select(Order))).scalars().all()
+
+            assert failed.processed_at is None
+            assert failed.attempts == 1
+            assert "Insufficient stock for product 2" in failed.last_error
+            assert [order.checkout_session_id for order in orders] == ["cs_2"]
+            assert await event_service.process_pending_events(batch_size=10) == 0
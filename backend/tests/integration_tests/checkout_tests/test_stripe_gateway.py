@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import status
+
+from config.models import StripeConfig
+from exceptions.stripe_exceptions import StripeGatewayException
+from services.stripe_gateway import StripeGateway
+from tests.fake_stripe.server import FakeStripeServer
+
+
+class TestStripeGateway:
+    class TestCreateCheckoutSession:
+        @pytest.mark.asyncio
+        async def test_create_checkout_session_success(
+            self, stripe_gateway, fake_stripe_server
+        ):
+            """Test that checkout sessions are created through the configured API base"""
+            session = await stripe_gateway.create_checkout_session(
+                {
+                    "mode": "payment",
+                    "metadata": {"order_reference": "abc"},
+                    "success_url": "http://localhost:3000?success=true",
+                }
+            )
+
+            assert session["id"].startswith("cs_test_")
+            assert session["metadata"]["order_reference"] == "abc"
+            assert fake_stripe_server.requests[-1]["path"] == "/v1/checkout/sessions"
+
+        @pytest.mark.asyncio
+        async def test_concurrent_calls_do_not_block_each_other(self):
+            """Test that slow Stripe responses are awaited concurrently"""
+            with FakeStripeServer(latency_seconds=0.3) as server:
+                gateway = StripeGateway(
+                    StripeConfig(secret_key="sk_test_fake", api_base=server.url)
+                )
+                started = time.perf_counter()
+                sessions = await asyncio.gather(
+                    *[
+                        gateway.create_checkout_session({"mode": "payment"})
+                        for _ in range(10)
+                    ]
+                )
+                elapsed = time.perf_counter() - started
+                await gateway.close()
+
+            # Ten sequential calls would take at least 3 seconds
+            assert len({session["id"] for session in sessions}) == 10
+            assert elapsed < 1.5
+
+        @pytest.mark.asyncio
+        async def test_create_checkout_session_timeout(self):
+            """Test that a call exceeding its timeout fails with 504"""
+            with FakeStripeServer(latency_seconds=0.5) as server:
+                gateway = StripeGateway(
+                    StripeConfig(
+                        secret_key="sk_test_fake",
+                        api_base=server.url,
+                        max_network_retries=0,
+                    )
+                )
+                with pytest.raises(StripeGatewayException) as exc:
+                    await gateway.create_checkout_session(
+                        {"mode": "payment"}, timeout=0.1
+                    )
+                await gateway.close()
+
+            assert exc.value.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+
+    class TestListCharges:
+        @pytest.mark.asyncio
+        async def test_list_charges_with_cursor(self, stripe_gateway):
+            """Test that charges are paged newest first with starting_after cursors"""
+            first_page = await stripe_gateway.list_charges({"limit": 2})
+            second_page = await stripe_gateway.list_charges(
+                {"limit": 2, "starting_after": first_page["data"][-1]["id"]}
+            )
+
+            assert [c["id"] for c in first_page["data"]] == [
+                "ch_test_0004",
+                "ch_test_0003",
+            ]
+            assert first_page["has_more"] is True
+            assert [c["id"] for c in second_page["data"]] == [
+                "ch_test_0002",
+                "ch_test_0001",
+            ]
+            assert second_page["has_more"] is False
+
+        @pytest.mark.asyncio
+        async def test_list_charges_unknown_endpoint_error(self, fake_stripe_server):
+            """Test that Stripe API errors are surfaced as 502"""
+            gateway = StripeGateway(
+                StripeConfig(
+                    secret_key="sk_test_fake",
+                    api_base=fake_stripe_server.url + "/unknown",
+                    max_network_retries=0,
+                )
+            )
+            with pytest.raises(StripeGatewayException) as exc:
+                await gateway.list_charges({"limit": 1})
+            await gateway.close()
+
+            assert exc.value.status_code == status.HTTP_502_BAD_GATEWAY
@@ -0,0 +1,342 @@
+import os
+from dataclasses import replace
+from functools import partial
+
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from config.models import (
+    ANALYTICS_POOL,
+    CATALOG_POOL,
+    CHECKOUT_POOL,
+    DatabaseConfig,
+    PoolConfig,
+)
+from dependencies import get_session, read_only, use_pool, use_primary
+from loaders import get_loaders
+from models.database import (
+    PRIMARY_STICKINESS_COOKIE,
+    ReadReplicas,
+    build_engine,
+    DatabasePool,
+    build_pools,
+    build_read_only_session_maker,
+    build_session,
+    warm_up_pool,
+)
+from models.models import Category
+
+
+class TestBuildSession:
+    @pytest_asyncio.fixture
+    async def client(self, test_engine) -> AsyncClient:
+        app = FastAPI()
+        app.dependency_overrides[get_session] = partial(
+            build_session,
+            {CATALOG_POOL: DatabasePool(CATALOG_POOL, test_engine)},
+            ReadReplicas([]),
+        )
+
+        @app.get("/transaction")
+        @app.post("/transaction")
+        async def transaction(session: AsyncSession = Depends(get_session)):
+            first = await session.scalar(text("SELECT txid_current()"))
+            second = await session.scalar(text("SELECT txid_current()"))
+            return {"single_transaction": first == second}
+
+        @app.get("/categories")
+        @app.post("/categories")
+        async def add_category(session: AsyncSession = Depends(get_session)):
+            session.add(Category(category_name="rings"))
+            await session.flush()
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_get_requests_run_statements_in_autocommit(self, client):
+        """Test that GET requests run every statement without a transaction"""
+        response = await client.get("/transaction")
+
+        assert response.json() == {"single_transaction": False}
+
+    @pytest.mark.asyncio
+    async def test_other_requests_run_in_one_transaction(self, client):
+        """Test that POST requests run every statement in one transaction"""
+        response = await client.post("/transaction")
+
+        assert response.json() == {"single_transaction": True}
+
+    @pytest.mark.asyncio
+    async def test_get_requests_cannot_write(self, client, test_session):
+        """Test that writes in a GET request fail and are not stored"""
+        with pytest.raises(InvalidRequestError, match="cannot write"):
+            await client.get("/categories")
+        await client.post("/categories")
+
+        result = await test_session.execute(select(Category.category_name))
+        assert result.scalars().all() == ["rings"]
+
+    @pytest.mark.asyncio
+    async def test_read_only_sessions_keep_loaded_objects(
+        self, test_engine, test_session
+    ):
+        """Test that objects loaded by a read-only session are never expired"""
+        test_session.add(Category(category_name="rings"))
+        await test_session.commit()
+
+        async with build_read_only_session_maker(test_engine)() as session:
+            category = await session.scalar(select(Category))
+            await session.commit()
+
+            assert category.category_name == "rings"
+
+
+class TestBuildEngine:
+    @pytest.fixture
+    def database_config(self) -> DatabaseConfig:
+        return DatabaseConfig(
+            user=os.getenv("TEST_POSTGRES_USER"),
+            password=os.getenv("TEST_POSTGRES_PASSWORD"),
+            host=os.getenv("TEST_POSTGRES_HOST"),
+            port=int(os.getenv("TEST_POSTGRES_PORT")),
+            database=os.getenv("TEST_POSTGRES_DB"),
+            pool_size=3,
+            application_name="glimmershop-tests",
+            statement_timeout_ms=1500,
+        )
+
+    @pytest_asyncio.fixture
+    async def engine(self, database_config, test_engine) -> AsyncEngine:
+        engine = build_engine(database_config)
+        yield engine
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_connections_use_the_server_settings(self, engine):
+        """Test that every connection gets the configured server settings"""
+        async with engine.connect() as connection:
+            settings = [
+                await connection.scalar(text(f"SHOW {name}"))
+                for name in ("application_name", "statement_timeout", "jit")
+            ]
+
+        assert settings == ["glimmershop-tests", "1500ms", "off"]
+
+    @pytest.mark.asyncio
+    async def test_warm_up_opens_and_prepares_connections(self, engine):
+        """Test that the warm-up fills the pool with prepared connections"""
+        await warm_up_pool(engine, 10, lambda session: get_loaders(session).prepare())
+
+        assert engine.pool.checkedin() == 3
+        async with engine.connect() as connection:
+            prepared = await connection.scalar(
+                text(
+                    "SELECT count(*) FROM pg_prepared_statements "
+                    "WHERE statement LIKE '%= ANY%' "
+                    "AND statement NOT LIKE '%pg_prepared_statements%'"
+                )
+            )
+        assert prepared == 3
+
+
+class TestReadReplicas:
+    @pytest.fixture
+    def engine_for(self, test_engine):
+        """Build engines to the test database, told apart by their application name."""
+        engines = []
+
+        def build(application_name: str, port: int | None = None) -> AsyncEngine:
+            config = DatabaseConfig(
+                user=os.getenv("TEST_POSTGRES_USER"),
+                password=os.getenv("TEST_POSTGRES_PASSWORD"),
+                host=os.getenv("TEST_POSTGRES_HOST"),
+                port=port or int(os.getenv("TEST_POSTGRES_PORT")),
+                database=os.getenv("TEST_POSTGRES_DB"),
+                application_name=application_name,
+            )
+            engines.append(build_engine(config))
+            return engines[-1]
+
+        yield build
+        for engine in engines:
+            engine.sync_engine.dispose()
+
+    @pytest.fixture
+    def replicas(self, engine_for) -> ReadReplicas:
+        return ReadReplicas([engine_for("replica-1"), engine_for("replica-2")], 5)
+
+    @pytest_asyncio.fixture
+    async def client(self, engine_for, replicas) -> AsyncClient:
+        primary = engine_for("primary")
+        app = FastAPI()
+        app.dependency_overrides[get_session] = partial(
+            build_session,
+            {CATALOG_POOL: DatabasePool(CATALOG_POOL, primary)},
+            replicas,
+        )
+
+        async def served_by(session: AsyncSession = Depends(get_session)):
+            return await session.scalar(text("SHOW application_name"))
+
+        app.get("/read")(served_by)
+        app.post("/write")(served_by)
+        app.post("/search", dependencies=[Depends(read_only)])(served_by)
+        app.get("/orders", dependencies=[Depends(use_primary)])(served_by)
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_reads_are_spread_over_the_replicas(self, client):
+        """Test that read-only requests take turns on the replicas"""
+        served_by = [(await client.get("/read")).json() for _ in range(4)]
+        served_by.append((await client.post("/search")).json())
+
+        assert served_by == [
+            "replica-1",
+            "replica-2",
+            "replica-1",
+            "replica-2",
+            "replica-1",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_writes_go_to_the_primary_and_stick(self, client):
+        """Test that after a write the client reads from the primary for a while"""
+        response = await client.post("/write")
+
+        assert response.json() == "primary"
+        assert PRIMARY_STICKINESS_COOKIE in response.cookies
+        assert (await client.get("/read")).json() == "primary"
+
+    @pytest.mark.asyncio
+    async def test_routes_can_require_the_primary(self, client):
+        """Test that routes marked use_primary never read from a replica"""
+        assert (await client.get("/orders")).json() == "primary"
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_replicas_are_skipped(self, engine_for):
+        """Test that replicas failing their health check get no reads"""
+        replicas = ReadReplicas([engine_for("replica-1"), engine_for("down", port=1)])
+
+        await replicas.check_health()
+
+        assert replicas.healthy_engines() == replicas.engines[:1]
+        assert replicas.session_maker() is replicas.session_maker()
+
+    @pytest.mark.asyncio
+    async def test_reads_fall_back_to_the_primary(self, engine_for):
+        """Test that without a healthy replica there is no replica to read from"""
+        replicas = ReadReplicas([engine_for("down", port=1)])
+
+        await replicas.check_health()
+
+        assert replicas.session_maker() is None
+
+
+class TestDatabasePools:
+    @pytest.fixture
+    def database_config(self) -> DatabaseConfig:
+        return DatabaseConfig(
+            user=os.getenv("TEST_POSTGRES_USER"),
+            password=os.getenv("TEST_POSTGRES_PASSWORD"),
+            host=os.getenv("TEST_POSTGRES_HOST"),
+            port=int(os.getenv("TEST_POSTGRES_PORT")),
+            database=os.getenv("TEST_POSTGRES_DB"),
+            pool_timeout_seconds=0.2,
+            pools={
+                CHECKOUT_POOL: PoolConfig(2, 0, 5000),
+                CATALOG_POOL: PoolConfig(2, 0, 10000),
+                ANALYTICS_POOL: PoolConfig(1, 0, 60000),
+            },
+        )
+
+    @pytest_asyncio.fixture
+    async def pools(self, database_config, test_engine) -> dict:
+        pools = build_pools(database_config)
+        yield pools
+        for pool in pools.values():
+            await pool.engine.dispose()
+
+    @pytest_asyncio.fixture
+    async def client(self, pools) -> AsyncClient:
+        app = FastAPI()
+        app.dependency_overrides[get_session] = partial(
+            build_session, pools, ReadReplicas([])
+        )
+
+        async def settings(session: AsyncSession = Depends(get_session)):
+            return [
+                await session.scalar(text(f"SHOW {name}"))
+                for name in ("application_name", "statement_timeout")
+            ]
+
+        app.get("/products")(settings)
+        app.post("/checkout", dependencies=[Depends(use_pool(CHECKOUT_POOL))])(settings)
+        app.get("/statistics", dependencies=[Depends(use_pool(ANALYTICS_POOL))])(
+            settings
+        )
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_routes_use_their_pool(self, client):
+        """Test that each route gets connections of its pool, the catalog by default"""
+        assert (await client.get("/products")).json() == [
+            "glimmershop-catalog",
+            "10s",
+        ]
+        assert (await client.post("/checkout")).json() == [
+            "glimmershop-checkout",
+            "5s",
+        ]
+        assert (await client.get("/statistics")).json() == [
+            "glimmershop-analytics",
+            "1min",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_pools_default_to_the_database_settings(self, database_config):
+        """Test that a pool without its own size takes the [database] pool size"""
+        pools = build_pools(
+            replace(
+                database_config,
+                pool_size=4,
+                max_overflow=2,
+                pools={
+                    CATALOG_POOL: PoolConfig(statement_timeout_ms=10000),
+                    ANALYTICS_POOL: PoolConfig(1, 0, 60000),
+                },
+            )
+        )
+        sizes = {
+            name: (pool.engine.pool.size(), pool.engine.pool._max_overflow)
+            for name, pool in pools.items()
+        }
+        for pool in pools.values():
+            await pool.engine.dispose()
+
+        assert sizes == {CATALOG_POOL: (4, 2), ANALYTICS_POOL: (1, 0)}
+
+    @pytest.mark.asyncio
+    async def test_busy_pool_does_not_block_the_others(self, client, pools):
+        """Test that an exhausted pool times out while the other pools serve requests"""
+        async with pools[ANALYTICS_POOL].engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                await client.get("/statistics")
+            response = await client.post("/checkout")
+
+        assert response.status_code == 200
+        analytics = pools[ANALYTICS_POOL].take_statistics()
+        assert analytics["timeouts"] == 1
+        assert analytics["max_wait_ms"] >= 200
+        assert pools[CHECKOUT_POOL].take_statistics()["waits"] == 1
+        assert pools[ANALYTICS_POOL].take_statistics()["waits"] == 0
@@ -0,0 +1,95 @@
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+
+import instrumentation
+from instrumentation import (
+    QueryInstrumentationMiddleware,
+    QueryStats,
+    instrument_engine,
+    request_queries,
+)
+
+
+class TestInstrumentation:
+    @pytest_asyncio.fixture
+    async def client(self, test_engine) -> AsyncClient:
+        instrument_engine(test_engine, 1000, 2)
+        app = FastAPI()
+        app.add_middleware(QueryInstrumentationMiddleware)
+
+        @app.get("/products/{runs}")
+        async def run_queries(runs: int):
+            async with test_engine.connect() as connection:
+                for product_id in range(runs):
+                    await connection.execute(
+                        text("SELECT CAST(:product_id AS integer)"),
+                        {"product_id": product_id},
+                    )
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_server_timing_reports_the_request_queries(self, client):
+        """Test that the response reports how many statements the request ran"""
+        response = await client.get("/products/2")
+
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+        assert 'desc="2 queries"' in response.headers["Server-Timing"]
+
+    @pytest.mark.asyncio
+    async def test_repeated_statements_warn_once(self, client, mocker):
+        """Test that a statement repeated past the threshold is reported once"""
+        warning = mocker.spy(instrumentation.logger, "warning")
+
+        await client.get("/products/5")
+
+        assert warning.call_count == 1
+        assert "possibly an N+1 query" in warning.call_args.args[0]
+        assert "/products/5" in warning.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_slow_queries_are_logged_without_values(self, test_engine, mocker):
+        """Test that slow statements are logged with their parameters redacted"""
+        instrument_engine(test_engine, 0, 10)
+        warning = mocker.spy(instrumentation.logger, "warning")
+
+        async with test_engine.connect() as connection:
+            await connection.execute(
+                text("SELECT CAST(:secret AS integer)"), {"secret": 4242}
+            )
+
+        message = warning.call_args.args[0]
+        assert message.startswith("Slow query")
+        assert "parameters=(int)" in message
+        assert "4242" not in message
+
+    @pytest.mark.asyncio
+    async def test_queries_outside_requests_are_not_collected(self, test_engine):
+        """Test that statements of background jobs do not need a request"""
+        instrument_engine(test_engine, 1000, 10)
+
+        async with test_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+        assert request_queries.get() is None
+
+    def test_query_stats_keep_the_slowest_statement(self):
+        """Test that the slowest statement and the runs per statement are kept"""
+        stats = QueryStats("/products")
+
+        stats.record("SELECT 1", 0.002)
+        stats.record("SELECT 2", 0.005)
+        runs = stats.record("SELECT 1", 0.001)
+
+        assert runs == 2
+        assert stats.slowest_statement == "SELECT 2"
+        assert stats.log_fields() == {
+            "path": "/products",
+            "db_queries": 3,
+            "db_ms": 8.0,
+            "db_slowest_ms": 5.0,
+        }
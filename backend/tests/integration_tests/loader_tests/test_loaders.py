@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from loaders import get_loaders
+from models.models import Product
+from services.product_service import ProductService
+from services.user_service import UserService
+from tests.integration_tests.checkout_tests.helper import (
+    TEST_SELLER_ID,
+    add_test_products,
+)
+
+
+class TestLoaders:
+    @pytest.fixture
+    def test_products(self) -> list[dict]:
+        return [
+            {"id": 1, "name": "Gold ring", "price": 120, "stock_quantity": 5},
+            {"id": 2, "name": "Silver necklace", "price": 80, "stock_quantity": 1},
+        ]
+
+    class TestDataLoader:
+        @pytest.mark.asyncio
+        async def test_concurrent_loads_share_one_query(
+            self, test_products, test_session, mocker
+        ):
+            """Test that loads made in the same tick are fetched with one query"""
+            await add_test_products(test_session, test_products)
+            product_service = ProductService(test_session)
+            execute = mocker.spy(test_session, "execute")
+
+            products = await asyncio.gather(
+                product_service.get_product_by_id(1),
+                product_service.get_product_by_id(2),
+                product_service.check_product_exists(99),
+            )
+
+            assert [products[0]["name"], products[1]["name"]] == [
+                "Gold ring",
+                "Silver necklace",
+            ]
+            assert products[2] is False
+            assert execute.call_count == 1
+
+        @pytest.mark.asyncio
+        async def test_loads_are_memoized_across_services(
+            self, test_products, test_session, mocker
+        ):
+            """Test that a row loaded once is reused by other services of the request"""
+            await add_test_products(test_session, test_products)
+            await UserService(test_session).get_user_by_id(TEST_SELLER_ID)
+            execute = mocker.spy(test_session, "execute")
+
+            assert await UserService(test_session).check_seller_exists(TEST_SELLER_ID)
+            execute.assert_not_called()
+
+        @pytest.mark.asyncio
+        async def test_user_loader_accepts_string_ids(
+            self, test_products, test_session, mocker
+        ):
+            """Test that a user id passed as a string finds the same memoized row"""
+            await add_test_products(test_session, test_products)
+            users = get_loaders(test_session).users
+            user = await users.load(str(TEST_SELLER_ID))
+            execute = mocker.spy(test_session, "execute")
+
+            assert user["id"] == str(TEST_SELLER_ID)
+            assert await users.load(TEST_SELLER_ID) is user
+            execute.assert_not_called()
+
+        @pytest.mark.asyncio
+        async def test_writes_clear_memoized_rows(self, test_products, test_session):
+            """Test that rows are loaded again after the session writes"""
+            await add_test_products(test_session, test_products)
+            product_service = ProductService(test_session)
+            await product_service.get_product_by_id(1)
+
+            await test_session.execute(
+                update(Product).where(Product.id == 1).values(stock_quantity=3)
+            )
+            product = await product_service.get_product_by_id(1)
+
+            assert product["stock_quantity"] == 3
+
+        @pytest.mark.asyncio
+        async def test_loaders_are_scoped_to_the_session(
+            self, test_session, test_engine
+        ):
+            """Test that every session gets its own loaders"""
+            async with async_sessionmaker(test_engine, class_=AsyncSession)() as other:
+                assert get_loaders(test_session) is get_loaders(test_session)
+                assert get_loaders(other) is not get_loaders(test_session)
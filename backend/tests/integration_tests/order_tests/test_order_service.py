@@ -0,0 +1,299 @@
+from datetime import datetime
+
+import pytest
+from fastapi import status
+from sqlalchemy import select, update
+
+from exceptions.order_exceptions import OrderException
+from models.models import Order, OrderItem
+from schemas.schemas import GuestUserInfo, OrderData
+from services.order_service import OrderService, order_cache
+from tests.integration_tests.checkout_tests.helper import (
+    TEST_SELLER_ID,
+    add_test_products,
+)
+
+
+class TestOrderService:
+    @pytest.fixture
+    def test_products(self) -> list[dict]:
+        return [
+            {"id": 1, "name": "Gold ring", "price": 120, "stock_quantity": 5},
+            {"id": 2, "name": "Silver necklace", "price": 80, "stock_quantity": 1},
+        ]
+
+    @pytest.fixture
+    def guest_user_info(self) -> GuestUserInfo:
+        return GuestUserInfo(
+            first_name="Jane",
+            last_name="Doe",
+            email="jane@example.com",
+            phone="+36301234567",
+            shipping_address="1 Main St, Budapest",
+        )
+
+    class TestAddNewOrder:
+        @pytest.mark.asyncio
+        async def test_add_new_order_inserts_order_and_items(
+            self,
+            test_products,
+            guest_user_info,
+            tracking_number_generator,
+            test_session,
+        ):
+            """Test that the order and all of its items are stored by one call"""
+            service = OrderService(test_session, tracking_number_generator)
+            await add_test_products(test_session, test_products)
+            orders = [
+                OrderData(product_id=1, quantity=2, price=120),
+                OrderData(product_id=2, quantity=1, price=80),
+            ]
+
+            order_id = await service.add_new_order(orders, guest_user_info, "cs_1")
+            await test_session.commit()
+
+            order = await test_session.get(Order, order_id)
+            items = await test_session.execute(
+                select(OrderItem).where(OrderItem.order_id == order_id)
+            )
+
+            assert order.status == "confirmed"
+            assert order.email == "jane@example.com"
+            assert order.checkout_session_id == "cs_1"
+            assert len(order.tracking_number) == 12
+            assert sorted(
+                (item.product_id, item.quantity, item.price_at_purchase)
+                for item in items.scalars().all()
+            ) == [(1, 2, 120.0), (2, 1, 80.0)]
+
+        @pytest.mark.asyncio
+        async def test_add_new_order_returns_new_ids(
+            self,
+            test_products,
+            guest_user_info,
+            tracking_number_generator,
+            test_session,
+        ):
+            """Test that consecutive orders get their own ids and items"""
+            service = OrderService(test_session, tracking_number_generator)
+            await add_test_products(test_session, test_products)
+
+            first = await service.add_new_order(
+                [OrderData(product_id=1, quantity=1, price=120)], guest_user_info
+            )
+            second = await service.add_new_order(
+                [OrderData(product_id=2, quantity=1, price=80)], guest_user_info
+            )
+            result = await test_session.execute(
+                select(OrderItem.order_id, OrderItem.product_id).order_by(
+                    OrderItem.order_id
+                )
+            )
+
+            assert first != second
+            assert result.all() == [(first, 1), (second, 2)]
+
+    class TestGetOrdersByUser:
+        @pytest.mark.asyncio
+        async def test_get_orders_by_user_pages_newest_first(
+            self,
+            test_products,
+            guest_user_info,
+            tracking_number_generator,
+            test_session,
+        ):
+            """Test that pages follow each other without gaps, even with equal timestamps"""
+            service = OrderService(test_session, tracking_number_generator)
+            await add_test_products(test_session, test_products)
+            customer = guest_user_info.model_copy(update={"user_id": TEST_SELLER_ID})
+            order_ids = [
+                await service.add_new_order(
+                    [OrderData(product_id=1, quantity=1, price=120)], customer
+                )
+                for _ in range(5)
+            ]
+            await service.add_new_order(
+                [OrderData(product_id=1, quantity=1, price=120)], guest_user_info
+            )
+            await test_session.execute(
+                update(Order).values(created_at=datetime(2026, 1, 1, 12, 0))
+            )
+
+            pages = [await service.get_orders_by_user(TEST_SELLER_ID, limit=2)]
+            while pages[-1]["next_cursor"]:
+                pages.append(
+                    await service.get_orders_by_user(
+                        TEST_SELLER_ID, limit=2, cursor=pages[-1]["next_cursor"]
+                    )
+                )
+
+            assert [len(page["orders"]) for page in pages] == [2, 2, 1]
+            assert [
+                order["id"] for page in pages for order in page["orders"]
+            ] == sorted(order_ids, reverse=True)
+
+        @pytest.mark.asyncio
+        async def test_get_orders_by_user_includes_items_and_totals(
+            self,
+            test_products,
+            guest_user_info,
+            tracking_number_generator,
+            test_session,
+        ):
+            """Test that every order comes with its items and its total"""
+            service = OrderService(test_session, tracking_number_generator)
+            await add_test_products(test_session, test_products)
+            customer = guest_user_info.model_copy(update={"user_id": TEST_SELLER_ID})
+            order_id = await service.add_new_order(
+                [
+                    OrderData(product_id=1, quantity=2, price=120),
+                    OrderData(product_id=2, quantity=1, price=80),
+                ],
+                customer,
+            )
+
+            page = await service.get_orders_by_user(TEST_SELLER_ID)
+
+            assert page["next_cursor"] is None
+            assert len(page["orders"]) == 1
+            order = page["orders"][0]
+            assert order["id"] == order_id
+            assert order["total"] == 320
+            assert order["items"] == [
+                {"product_id": 1, "quantity": 2, "price_at_purchase": 120.0},
+                {"product_id": 2, "quantity": 1, "price_at_purchase": 80.0},
+            ]
+
+        @pytest.mark.asyncio
+        async def test_get_orders_by_user_invalid_cursor(
+            self, tracking_number_generator, test_session
+        ):
+            """Test that a malformed cursor is rejected"""
+            service = OrderService(test_session, tracking_number_generator)
+
+            with pytest.raises(OrderException) as exc:
+                await service.get_orders_by_user(TEST_SELLER_ID, cursor="not-a-cursor")
+
+            assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+
+    class TestGetOrderById:
+        @pytest.mark.asyncio
+        async def test_get_order_by_id_returns_items(
+            self,
+            test_products,
+            guest_user_info,
+            tracking_number_generator,
+            test_session,
+        ):
+            """Test that an order is returned once with all of its items"""
+            service = OrderService(test_session, tracking_number_generator)
+            await add_test_products(test_session, test_products)
+            order_id = await service.add_new_order(
+                [
+                    OrderData(product_id=1, quantity=2, price=120),
+                    OrderData(product_id=2, quantity=1, price=80),
+                ],
+                guest_user_info,
+            )
+            order_cache.pop(order_id)
+
+            order = await service.get_order_by_id(order_id)
+
+            assert order["id"] == order_id
+            assert [item["product_id"] for item in order["items"]] == [1, 2]
+
+        @pytest.mark.asyncio
+        async def test_get_order_by_id_serves_confirmed_orders_from_cache(
+            self,
+            test_products,
+            guest_user_info,
+            tracking_number_generator,
+            test_session,
+        ):
+            """Test that a confirmed order is cached until its status changes"""
+            service = OrderService(test_session, tracking_number_generator)
+            await add_test_products(test_session, test_products)
+            order_id = await service.add_new_order(
+                [OrderData(product_id=1, quantity=1, price=120)], guest_user_info
+            )
+            order_cache.pop(order_id)
+            await service.get_order_by_id(order_id)
+
+            # Written behind the service's back, so only the cached copy hides it
+            await test_session.execute(
+                update(Order).where(Order.id == order_id).values(email="x@example.com")
+            )
+            cached = await service.get_order_by_id(order_id)
+            await service.update_order_status(order_id, "shipped")
+            refreshed = await service.get_order_by_id(order_id)
+
+            assert cached["email"] == "jane@example.com"
+            assert refreshed["email"] == "x@example.com"
+            assert refreshed["status"] == "shipped"
+
+        @pytest.mark.asyncio
+        async def test_get_order_by_id_does_not_cache_pending_orders(
+            self,
+            test_products,
+            guest_user_info,
+            tracking_number_generator,
+            test_session,
+        ):
+            """Test that orders in a non-terminal status are always read again"""
+            service = OrderService(test_session, tracking_number_generator)
+            await add_test_products(test_session, test_products)
+            order_id = await service.add_new_order(
+                [OrderData(product_id=1, quantity=1, price=120)], guest_user_info
+            )
+            await service.update_order_status(order_id, "pending")
+
+            await service.get_order_by_id(order_id)
+
+            assert order_id not in order_cache
+
+        @pytest.mark.asyncio
+        async def test_get_order_by_id_not_found(
+            self, tracking_number_generator, test_session
+        ):
+            """Test that a missing order raises a 404"""
+            service = OrderService(test_session, tracking_number_generator)
+
+            with pytest.raises(OrderException) as exc:
+                await service.get_order_by_id(999)
+
+            assert exc.value.status_code == status.HTTP_404_NOT_FOUND
+
+    class TestGetOrderByTrackingNumber:
+        @pytest.mark.asyncio
+        async def test_get_order_by_tracking_number(
+            self,
+            test_products,
+            guest_user_info,
+            tracking_number_generator,
+            test_session,
+        ):
+            """Test that an order is found by its tracking number without personal details"""
+            service = OrderService(test_session, tracking_number_generator)
+            await add_test_products(test_session, test_products)
+            order_id = await service.add_new_order(
+                [OrderData(product_id=1, quantity=2, price=120)], guest_user_info
+            )
+            order = await test_session.get(Order, order_id)
+
+            tracked = await service.get_order_by_tracking_number(order.tracking_number)
+
+            assert tracked["status"] == "confirmed"
+            assert tracked["items"] == [{"product_id": 1, "quantity": 2}]
+            assert "email" not in tracked
+
+        @pytest.mark.asyncio
+        async def test_get_order_by_tracking_number_not_found(
+            self, tracking_number_generator, test_session
+        ):
+            """Test that an unknown tracking number raises a 404"""
+            service = OrderService(test_session, tracking_number_generator)
+
+            with pytest.raises(OrderException) as exc:
+                await service.get_order_by_tracking_number("000000000000")
+
+            assert exc.value.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+
+from services.tracking_number_service import TrackingNumberGenerator
+
+
+class TestTrackingNumberGenerator:
+    class TestFormat:
+        def test_format_is_unique_and_fixed_width(self, tracking_number_generator):
+            """Test that consecutive sequence values map to distinct 12 digit numbers"""
+            numbers = [
+                tracking_number_generator.format(value) for value in range(20_000)
+            ]
+
+            assert len(set(numbers)) == len(numbers)
+            assert all(len(number) == 12 and number.isdigit() for number in numbers)
+
+        def test_format_depends_on_the_key(self, tracking_number_generator):
+            """Test that another key gives a different permutation"""
+            other = TrackingNumberGenerator("another-tracking-number-secret-0123")
+
+            assert [tracking_number_generator.format(value) for value in range(10)] != [
+                other.format(value) for value in range(10)
+            ]
+
+        def test_format_rejects_values_out_of_range(self, tracking_number_generator):
+            """Test that values past the 12 digit domain are refused instead of wrapping"""
+            with pytest.raises(ValueError):
+                tracking_number_generator.format(10**12)
+
+    class TestInit:
+        @pytest.mark.parametrize("secret", [None, "", "short-secret"])
+        def test_init_rejects_weak_secrets(self, secret):
+            """Test that a missing or short key is refused instead of used"""
+            with pytest.raises(ValueError):
+                TrackingNumberGenerator(secret)
+
+    class TestNextTrackingNumber:
+        @pytest.mark.asyncio
+        async def test_next_tracking_number_reserves_blocks(
+            self, tracking_number_generator, test_session
+        ):
+            """Test that one sequence value covers a whole block of tracking numbers"""
+            numbers = [
+                await tracking_number_generator.next_tracking_number(test_session)
+                for _ in range(150)
+            ]
+            last_value = await test_session.scalar(
+                text("SELECT last_value FROM public.order_tracking_number_seq")
+            )
+
+            assert len(set(numbers)) == 150
+            assert last_value == 101
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy.exc import SQLAlchemyError
+from fastapi import status
+
+from exceptions.product_exceptions import ProductException
+from services.product_service import ProductService
+from tests.integration_tests.checkout_tests.helper import add_test_products
+
+
+class TestProductService:
+    @pytest.fixture
+    def test_products(self) -> list[dict]:
+        return [
+            {"id": 1, "name": "Gold ring", "price": 120, "stock_quantity": 5},
+            {"id": 2, "name": "Silver necklace", "price": 80, "stock_quantity": 1},
+            {"id": 3, "name": "Pearl earrings", "price": 60, "stock_quantity": 0},
+        ]
+
+    class TestGetProductsByIds:
+        @pytest.mark.asyncio
+        async def test_get_products_by_ids_success(self, test_products, test_session):
+            """Test loading several products at once, keyed by product id"""
+            product_service = ProductService(test_session)
+            await add_test_products(test_session, test_products)
+
+            products = await product_service.get_products_by_ids([3, 1, 1])
+
+            assert set(products) == {1, 3}
+            assert products[1]["name"] == "Gold ring"
+            assert products[3]["stock_quantity"] == 0
+
+        @pytest.mark.asyncio
+        async def test_get_products_by_ids_missing_products(
+            self, test_products, test_session
+        ):
+            """Test that unknown ids are left out instead of raising"""
+            product_service = ProductService(test_session)
+            await add_test_products(test_session, test_products)
+
+            products = await product_service.get_products_by_ids([2, 99])
+
+            assert products == {2: await product_service.get_product_by_id(2)}
+            assert await product_service.get_products_by_ids([]) == {}
+
+        @pytest.mark.asyncio
+        async def test_get_products_by_ids_database_error(self, test_session, mocker):
+            """Test database error handling when loading products in bulk"""
+            product_service = ProductService(test_session)
+            mocker.patch.object(
+                test_session, "execute", side_effect=SQLAlchemyError("Database error")
+            )
+
+            with pytest.raises(ProductException) as exc:
+                await product_service.get_products_by_ids([1, 2])
+
+            assert exc.value.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
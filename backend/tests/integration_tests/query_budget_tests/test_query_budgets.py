@@ -0,0 +1,372 @@
+from datetime import datetime
+from functools import partial
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from fastapi.routing import APIRoute
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.models import ANALYTICS_POOL, CATALOG_POOL, CHECKOUT_POOL, ReservationConfig
+from dependencies import get_current_user, get_session, verification_storage
+from models.database import DatabasePool, ReadReplicas, build_session
+from models.models import Order
+from routers import (
+    auth_router,
+    category_router,
+    checkout_router,
+    order_router,
+    product_router,
+    seller_statistics_router,
+    user_router,
+)
+from services.checkout_service import CheckoutService
+from services.order_service import OrderService
+from services.reservation_service import StockReservationService
+from services.user_service import UserService
+from tests.integration_tests.checkout_tests.helper import TEST_SELLER_ID
+from tests.integration_tests.seller_statistics_tests.helper import (
+    OTHER_SELLER_ID,
+    add_test_catalog,
+    add_test_order,
+    add_test_seller,
+)
+from tests.query_counter import QueryBudgetMiddleware
+
+ROUTERS = (
+    auth_router,
+    category_router,
+    checkout_router,
+    order_router,
+    product_router,
+    seller_statistics_router,
+    user_router,
+)
+TRACKING_NUMBER = "123456789012"
+SELLER_EMAIL = f"{TEST_SELLER_ID}@example.com"
+VERIFICATION_CODE = "123456"
+GUEST_USER_INFO = {
+    "first_name": "Jane",
+    "last_name": "Doe",
+    "email": "jane@example.com",
+    "phone": "+36301234567",
+    "shipping_address": "1 Main St, Budapest",
+}
+THIS_MONTH = {"year": str(datetime.now().year), "month": str(datetime.now().month)}
+
+# Every request here must succeed and stay within the budget of its endpoint. The
+# endpoints that send emails, check credentials against the auth keys or call Stripe
+# are not called, their budgets are declared all the same.
+REQUESTS = [
+    ("GET", "/auth/is-authenticated", {}),
+    ("GET", "/categories", {}),
+    ("GET", "/categories/search/", {"params": {"query": "Ri"}}),
+    ("GET", "/categories/product-categories/101", {}),
+    ("GET", "/categories/products-by-category/11", {}),
+    ("GET", "/categories/sellers/11/products", {}),
+    # The seller has no earrings, so the page is empty
+    ("GET", "/categories/sellers/13/products", {}),
+    ("GET", "/categories/11", {}),
+    ("POST", "/categories/new", {"json": {"category_name": "Bracelets"}}),
+    (
+        "POST",
+        "/categories/category-by-identifier",
+        {"json": {"category_name": "Rings"}},
+    ),
+    (
+        "POST",
+        "/categories/add-category-to-product",
+        {"json": {"product_id": 103, "category_id": 11}},
+    ),
+    (
+        "PUT",
+        "/categories/edit",
+        {"params": {"category_id": 11}, "json": {"category_name": "Wedding rings"}},
+    ),
+    (
+        "DELETE",
+        "/categories/delete-category-from-product",
+        {"json": {"product_id": 101, "category_id": 12}},
+    ),
+    (
+        "POST",
+        "/categories/add-categories-to-products",
+        {"json": {"product_ids": [101, 102, 103], "category_ids": [11, 12]}},
+    ),
+    (
+        "DELETE",
+        "/categories/delete-categories-from-products",
+        {"json": {"product_ids": [101, 102], "category_ids": [11]}},
+    ),
+    (
+        "POST",
+        "/checkout/create-checkout-session",
+        {
+            "json": {
+                "cart_items": [
+                    {
+                        "id": 101,
+                        "name": "Gold ring",
+                        "price": 120,
+                        "category": [11],
+                        "quantity": 1,
+                        "image_path": "ring.png",
+                    }
+                ],
+                "guest_user_info": GUEST_USER_INFO,
+            }
+        },
+    ),
+    (
+        "POST",
+        "/checkout/post-checkout",
+        {
+            "json": {
+                "orders": [
+                    {"product_id": 101, "price": 120, "quantity": 1},
+                    {"product_id": 102, "price": 80, "quantity": 2},
+                ],
+                "guest_user_info": GUEST_USER_INFO,
+            }
+        },
+    ),
+    ("GET", "/order/mine", {}),
+    ("GET", f"/order/tracking/{TRACKING_NUMBER}", {}),
+    ("GET", "/order/1", {}),
+    ("GET", "/products", {}),
+    ("GET", "/products/products-by-seller", {"params": {"seller_id": TEST_SELLER_ID}}),
+    ("GET", "/products/seller-dashboard", {"params": {"seller_id": TEST_SELLER_ID}}),
+    ("GET", "/products/101", {}),
+    (
+        "GET",
+        "/products/search/",
+        {"params": {"query": "Gold", "seller_id": TEST_SELLER_ID}},
+    ),
+    (
+        "POST",
+        "/products/filter-by-price",
+        {"params": {"category_id": 11}, "json": {"min_price": 0, "max_price": 500}},
+    ),
+    (
+        "POST",
+        "/products/filter-by-material",
+        {"params": {"category_id": 11}, "json": {"materials": ["gold"]}},
+    ),
+    (
+        "POST",
+        "/products/filter-by-seller",
+        {"params": {"category_id": 11, "seller_id": TEST_SELLER_ID}},
+    ),
+    (
+        "POST",
+        "/products/filter-by-material-price-and-seller",
+        {
+            "json": {
+                "category_id": 11,
+                "materials": {"materials": ["gold"]},
+                "price_range": {"min_price": 0, "max_price": 500},
+                "seller": {"seller_id": str(TEST_SELLER_ID)},
+            }
+        },
+    ),
+    (
+        "POST",
+        "/products/new",
+        {
+            "json": {
+                "name": "Pearl earrings",
+                "description": "Freshwater pearls",
+                "price": 60,
+                "stock_quantity": 5,
+                "material": "silver",
+                "color": "white",
+                "categories": [11, 12],
+            }
+        },
+    ),
+    (
+        "PUT",
+        "/products/edit",
+        {"params": {"product_id": 101}, "json": {"price": 130}},
+    ),
+    ("DELETE", "/products/delete/103", {}),
+    (
+        "POST",
+        "/seller-statistics/get-monthly-transactions",
+        {"json": THIS_MONTH},
+    ),
+    (
+        "POST",
+        "/seller-statistics/get-transactions-by-month",
+        {"json": {"trailing_months": 12, "compare_previous_year": True}},
+    ),
+    ("GET", "/users", {}),
+    ("GET", "/users/by-type", {"params": {"is_seller": True}}),
+    ("GET", "/users/sellers/search", {"params": {"query": "Jo"}}),
+    ("GET", f"/users/{TEST_SELLER_ID}", {}),
+    ("GET", f"/users/sellers/{TEST_SELLER_ID}", {}),
+    (
+        "POST",
+        "/users",
+        {
+            "json": {
+                "first_name": "Jane",
+                "last_name": "Smith",
+                "email": "jane@example.com",
+                "password": "strongpassword",
+                "is_seller": False,
+            }
+        },
+    ),
+    (
+        "POST",
+        "/users/verification",
+        {"json": {"email": SELLER_EMAIL, "code": VERIFICATION_CODE}},
+    ),
+    ("PUT", "/users/me", {"json": {"first_name": "Johnny"}}),
+    ("DELETE", "/users/me", {}),
+]
+
+
+class TestQueryBudgets:
+    @pytest_asyncio.fixture
+    async def test_catalog(self, test_session: AsyncSession) -> None:
+        await add_test_seller(test_session, TEST_SELLER_ID)
+        await add_test_catalog(
+            test_session,
+            [
+                {
+                    "id": 101,
+                    "name": "Gold ring",
+                    "price": 120,
+                    "stock_quantity": 5,
+                    "material": "gold",
+                    "description": "Handmade",
+                    "color": "yellow",
+                    "seller_id": TEST_SELLER_ID,
+                    "category_ids": [11, 12],
+                },
+                {
+                    "id": 102,
+                    "name": "Gold necklace",
+                    "price": 80,
+                    "stock_quantity": 5,
+                    "material": "gold",
+                    "description": "Handmade",
+                    "color": "yellow",
+                    "seller_id": TEST_SELLER_ID,
+                    "category_ids": [12],
+                },
+                {
+                    "id": 103,
+                    "name": "Silver bracelet",
+                    "price": 40,
+                    "stock_quantity": 5,
+                    "material": "silver",
+                    "description": "Handmade",
+                    "color": "grey",
+                    "seller_id": TEST_SELLER_ID,
+                },
+            ],
+            {11: "Rings", 12: "Necklaces", 13: "Earrings"},
+        )
+        order_id = await add_test_order(
+            test_session, datetime.now(), [(101, 1, 120.0), (102, 2, 80.0)]
+        )
+        await test_session.execute(
+            update(Order)
+            .where(Order.id == order_id)
+            .values(user_id=TEST_SELLER_ID, tracking_number=TRACKING_NUMBER)
+        )
+        await test_session.commit()
+
+    @pytest_asyncio.fixture
+    async def client(
+        self,
+        test_engine,
+        test_catalog,
+        query_counter,
+        stripe_gateway,
+        tracking_number_generator,
+        mock_config,
+        monkeypatch,
+    ) -> AsyncClient:
+        monkeypatch.setitem(
+            verification_storage,
+            SELLER_EMAIL,
+            {"code": VERIFICATION_CODE, "timestamp": datetime.now()},
+        )
+        monkeypatch.setattr(
+            "services.checkout_service.get_config",
+            lambda: SimpleNamespace(
+                server_config=SimpleNamespace(
+                    customer_frontend_domain="http://localhost:3000"
+                )
+            ),
+        )
+        app = FastAPI()
+        for module in ROUTERS:
+            app.include_router(module.router)
+
+        pool = DatabasePool(CATALOG_POOL, test_engine)
+        pools = {name: pool for name in (CATALOG_POOL, CHECKOUT_POOL, ANALYTICS_POOL)}
+
+        def checkout_service(session=Depends(get_session)) -> CheckoutService:
+            reservation_service = StockReservationService(session, ReservationConfig())
+            return CheckoutService(session, stripe_gateway, reservation_service)
+
+        def order_service(session=Depends(get_session)) -> OrderService:
+            return OrderService(session, tracking_number_generator)
+
+        app.dependency_overrides[get_session] = partial(
+            build_session, pools, ReadReplicas([])
+        )
+        app.dependency_overrides[get_current_user] = lambda: {
+            "email": SELLER_EMAIL,
+            "user_id": str(TEST_SELLER_ID),
+        }
+        app.dependency_overrides[checkout_router.get_checkout_service] = (
+            checkout_service
+        )
+        app.dependency_overrides[checkout_router.get_order_service] = order_service
+        app.dependency_overrides[order_router.get_order_service] = order_service
+        app.add_middleware(QueryBudgetMiddleware, counter=query_counter)
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("method, url, kwargs", REQUESTS)
+    async def test_request_stays_within_its_budget(self, client, method, url, kwargs):
+        """Test that the endpoint runs no more statements than its max_queries"""
+        response = await client.request(method, url, **kwargs)
+
+        assert response.status_code < 400, response.text
+
+    def test_every_endpoint_has_a_budget(self):
+        """Test that every route of every router declares its max_queries"""
+        missing = [
+            f"{method} {route.path}"
+            for module in ROUTERS
+            for route in module.router.routes
+            if isinstance(route, APIRoute)
+            and not hasattr(route.endpoint, "max_queries")
+            for method in route.methods
+        ]
+
+        assert missing == []
+
+    @pytest.mark.asyncio
+    async def test_get_all_users_loads_the_users_at_once(
+        self, test_session, test_catalog, query_counter
+    ):
+        """Test that listing the users costs a single statement however many exist"""
+        await add_test_seller(test_session, OTHER_SELLER_ID)
+
+        with query_counter.max_queries(1):
+            users = await UserService(test_session).get_all_users()
+
+        assert len(users) == 2
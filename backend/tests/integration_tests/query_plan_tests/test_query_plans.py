@@ -0,0 +1,119 @@
+import hashlib
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+from schemas.schemas import PriceFilter
+from services.category_service import CategoryService
+from services.order_service import OrderService
+from services.product_service import ProductService
+from services.tracking_number_service import TrackingNumberGenerator
+from services.user_service import UserService
+from tests.query_plans import check_plans
+
+
+def seeded_user_id(number: int) -> uuid.UUID:
+    """The id the seed gives the ``number``-th user, the first 20 being sellers."""
+    return uuid.UUID(hashlib.md5(str(number).encode()).hexdigest())
+
+
+SELLER_ID = seeded_user_id(1)
+BUYER_ID = seeded_user_id(21)
+
+# Large enough that a sequential scan of any of these tables costs more than the
+# index scans the hot queries are meant to use
+SEED = [
+    """
+    INSERT INTO public."user" (id, first_name, last_name, email, hashed_password,
+        is_seller, is_verified, is_active, registration_date)
+    SELECT md5(i::text)::uuid, 'John', 'Doe', i || '@example.com', 'hash',
+        i <= 20, true, false, current_date
+    FROM generate_series(1, 2000) AS i
+    """,
+    """
+    INSERT INTO public.category (id, category_name, is_default)
+    SELECT i, 'Category ' || i, false FROM generate_series(1, 100) AS i
+    """,
+    """
+    INSERT INTO public.product (id, seller_id, name, description, price,
+        stock_quantity, material, color)
+    SELECT i, md5((i % 20 + 1)::text)::uuid, 'Product ' || i, 'Handmade',
+        i % 500 + 1, 10, (ARRAY['gold', 'silver', 'pearl'])[i % 3 + 1], 'yellow'
+    FROM generate_series(1, 20000) AS i
+    """,
+    """
+    INSERT INTO public.product_category (product_id, category_id)
+    SELECT i, i % 100 + 1 FROM generate_series(1, 20000) AS i
+    UNION ALL
+    SELECT i, (i + 37) % 100 + 1 FROM generate_series(1, 20000) AS i
+    """,
+    """
+    INSERT INTO public."order" (id, user_id, email, first_name, last_name,
+        shipping_address, phone, created_at, status, tracking_number)
+    SELECT i, md5((i % 2000 + 1)::text)::uuid, 'jane@example.com', 'Jane', 'Doe',
+        '1 Main St, Budapest', '+36301234567',
+        now() - i * interval '1 minute', 'confirmed', lpad(i::text, 12, '0')
+    FROM generate_series(1, 5000) AS i
+    """,
+    """
+    INSERT INTO public.order_item (order_id, product_id, quantity, price_at_purchase)
+    SELECT i % 5000 + 1, i * 7 % 20000 + 1, 1, 100
+    FROM generate_series(1, 10000) AS i
+    """,
+]
+
+HOT_QUERIES = {
+    "products by seller": lambda session: ProductService(
+        session
+    ).get_all_products_by_seller(SELLER_ID),
+    "product by id": lambda session: ProductService(session).get_product_by_id(42),
+    "products in category by price": lambda session: ProductService(
+        session
+    ).filter_by_price_range(7, PriceFilter(min_price=100, max_price=120)),
+    "products in category by seller": lambda session: ProductService(
+        session
+    ).filter_by_seller(7, SELLER_ID),
+    "categories of a product": lambda session: CategoryService(
+        session
+    ).get_product_categories(42),
+    "seller products in category": lambda session: CategoryService(
+        session
+    ).get_seller_products_by_category(7, SELLER_ID),
+    "category by name": lambda session: CategoryService(session).get_category_by_name(
+        "Category 7"
+    ),
+    "orders of a user": lambda session: OrderService(
+        session, TrackingNumberGenerator("test-tracking-number-secret-0123456789")
+    ).get_orders_by_user(BUYER_ID),
+    "order by tracking number": lambda session: OrderService(
+        session, TrackingNumberGenerator("test-tracking-number-secret-0123456789")
+    ).get_order_by_tracking_number("000000000042"),
+    "sellers": lambda session: UserService(session).get_users_by_type(True),
+}
+
+
+class TestQueryPlans:
+    @pytest_asyncio.fixture
+    async def seeded_engine(self, test_engine):
+        async with test_engine.begin() as connection:
+            for statement in SEED:
+                await connection.execute(text(statement))
+        async with test_engine.connect() as connection:
+            await connection.execute(text("ANALYZE"))
+        return test_engine
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("query", HOT_QUERIES.values(), ids=HOT_QUERIES.keys())
+    async def test_hot_query_uses_indexes(
+        self, seeded_engine, test_session, query_counter, query
+    ):
+        """Test that the query scans no large table sequentially"""
+        start = len(query_counter.statements)
+        await query(test_session)
+        executed = query_counter.executed(start)
+
+        assert executed
+        async with seeded_engine.connect() as connection:
+            await check_plans(connection, executed)
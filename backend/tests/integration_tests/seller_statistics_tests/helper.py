@@ -0,0 +1,85 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from dependencies import hash_password
+from models.models import Category, Order, OrderItem, Product, ProductCategory, User
+from services.seller_rollup_service import SellerRollupService
+
+OTHER_SELLER_ID = uuid.UUID("0b7c1f7e-52a1-4d3c-9a59-3f4c7de0e2a1")
+
+
+async def add_test_seller(session: AsyncSession, seller_id: uuid.UUID) -> None:
+    session.add(
+        User(
+            id=seller_id,
+            first_name="John",
+            last_name="Doe",
+            email=f"{seller_id}@example.com",
+            hashed_password=hash_password("strongpassword"),
+            is_seller=True,
+            registration_date=date.today(),
+        )
+    )
+    await session.flush()
+
+
+async def add_test_catalog(
+    session: AsyncSession, products: list[dict], categories: dict[int, str]
+) -> None:
+    """
+    Add categories and products, every product dict carrying its seller_id and the
+    ids of its categories under "category_ids".
+    """
+    session.add_all(
+        [
+            Category(id=category_id, category_name=name)
+            for category_id, name in categories.items()
+        ]
+    )
+    for product in products:
+        category_ids = product.pop("category_ids", [])
+        session.add(Product(**product))
+        await session.flush()
+        session.add_all(
+            [
+                ProductCategory(product_id=product["id"], category_id=category_id)
+                for category_id in category_ids
+            ]
+        )
+    await session.commit()
+
+
+async def add_test_order(
+    session: AsyncSession, created_at: datetime, items: list[tuple[int, int, float]]
+) -> int:
+    """Add an order with (product_id, quantity, price) items and roll it up."""
+    order = Order(
+        email="jane@example.com",
+        first_name="Jane",
+        last_name="Doe",
+        shipping_address="1 Main St, Budapest",
+        phone="+36301234567",
+        created_at=created_at,
+        status="confirmed",
+        tracking_number=uuid.uuid4().hex[:12],
+    )
+    session.add(order)
+    await session.flush()
+    order_id = order.id
+    session.add_all(
+        [
+            OrderItem(
+                order_id=order_id,
+                product_id=product_id,
+                quantity=quantity,
+                price_at_purchase=price,
+            )
+            for product_id, quantity, price in items
+        ]
+    )
+    await session.flush()
+    await SellerRollupService(session).add_orders([order_id])
+    await session.commit()
+    return order_id
@@ -0,0 +1,106 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from models.models import (
+    SellerMonthlyCategorySales,
+    SellerMonthlyProductSales,
+    SellerMonthlySales,
+)
+from services.seller_rollup_service import SellerRollupService
+from tests.integration_tests.checkout_tests.helper import TEST_SELLER_ID
+from tests.integration_tests.seller_statistics_tests.helper import (
+    add_test_catalog,
+    add_test_order,
+    add_test_seller,
+)
+
+
+async def get_rollup_rows(session) -> list[list[tuple]]:
+    rows = []
+    for table in (
+        SellerMonthlySales,
+        SellerMonthlyProductSales,
+        SellerMonthlyCategorySales,
+    ):
+        result = await session.execute(
+            select(table.__table__).order_by(*table.__table__.primary_key.columns)
+        )
+        rows.append([tuple(row) for row in result.all()])
+    return rows
+
+
+class TestSellerRollupService:
+    @pytest.fixture
+    async def test_catalog(self, test_session) -> None:
+        await add_test_seller(test_session, TEST_SELLER_ID)
+        await add_test_catalog(
+            test_session,
+            [
+                {
+                    "id": 1,
+                    "name": "Gold ring",
+                    "price": 120,
+                    "stock_quantity": 5,
+                    "seller_id": TEST_SELLER_ID,
+                    "category_ids": [1, 2],
+                },
+                {
+                    "id": 2,
+                    "name": "Silver necklace",
+                    "price": 80,
+                    "stock_quantity": 5,
+                    "seller_id": TEST_SELLER_ID,
+                    "category_ids": [2],
+                },
+            ],
+            {1: "Rings", 2: "Gold"},
+        )
+
+    class TestAddOrders:
+        @pytest.mark.asyncio
+        async def test_add_orders_accumulates_per_month(
+            self, test_catalog, test_session
+        ):
+            """Test that each new order is added onto the rollup rows of its month"""
+            await add_test_order(test_session, datetime(2026, 3, 1), [(1, 2, 120)])
+            await add_test_order(
+                test_session, datetime(2026, 3, 20), [(1, 1, 100), (2, 3, 80)]
+            )
+            await add_test_order(test_session, datetime(2026, 4, 2), [(2, 1, 80)])
+
+            sales, product_sales, category_sales = await get_rollup_rows(test_session)
+
+            march, april = datetime(2026, 3, 1).date(), datetime(2026, 4, 1).date()
+            assert sales == [
+                (TEST_SELLER_ID, march, 2, 580.0),
+                (TEST_SELLER_ID, april, 1, 80.0),
+            ]
+            assert product_sales == [
+                (TEST_SELLER_ID, march, 1, 3, 340.0),
+                (TEST_SELLER_ID, march, 2, 3, 240.0),
+                (TEST_SELLER_ID, april, 2, 1, 80.0),
+            ]
+            assert category_sales == [
+                (TEST_SELLER_ID, march, 1, 3),
+                (TEST_SELLER_ID, march, 2, 6),
+                (TEST_SELLER_ID, april, 2, 1),
+            ]
+
+    class TestRebuild:
+        @pytest.mark.asyncio
+        async def test_rebuild_matches_incremental_rollups(
+            self, test_catalog, test_session
+        ):
+            """Test that rebuilding from the order history gives the incrementally kept rows"""
+            await add_test_order(test_session, datetime(2026, 3, 1), [(1, 2, 120)])
+            await add_test_order(
+                test_session, datetime(2026, 3, 20), [(1, 1, 100), (2, 3, 80)]
+            )
+            incremental = await get_rollup_rows(test_session)
+
+            await SellerRollupService(test_session).rebuild()
+            await test_session.commit()
+
+            assert await get_rollup_rows(test_session) == incremental
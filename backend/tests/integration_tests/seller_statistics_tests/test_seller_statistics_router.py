@@ -0,0 +1,98 @@
+from datetime import date, datetime
+from functools import partial
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.models import ANALYTICS_POOL
+from dependencies import get_current_user, get_session
+from models.database import DatabasePool, ReadReplicas, build_session
+from routers import seller_statistics_router
+from tasks import seller_statistics_prewarm
+from tasks.seller_statistics_prewarm import prewarm_seller_statistics
+from tests.integration_tests.checkout_tests.helper import TEST_SELLER_ID
+from tests.integration_tests.seller_statistics_tests.helper import (
+    add_test_catalog,
+    add_test_order,
+    add_test_seller,
+)
+
+
+class TestSellerStatisticsRouter:
+    @pytest.fixture
+    async def test_catalog(self, test_session) -> None:
+        await add_test_seller(test_session, TEST_SELLER_ID)
+        await add_test_catalog(
+            test_session,
+            [
+                {
+                    "id": product_id,
+                    "name": name,
+                    "price": price,
+                    "stock_quantity": 5,
+                    "seller_id": TEST_SELLER_ID,
+                    "category_ids": [1],
+                }
+                for product_id, name, price in (
+                    (1, "Gold ring", 120),
+                    (2, "Silver necklace", 80),
+                )
+            ],
+            {1: "Rings"},
+        )
+
+    @pytest_asyncio.fixture
+    async def client(self, test_engine) -> AsyncClient:
+        app = FastAPI()
+        app.include_router(seller_statistics_router.router)
+        pools = {ANALYTICS_POOL: DatabasePool(ANALYTICS_POOL, test_engine)}
+        app.dependency_overrides[get_session] = partial(
+            build_session, pools, ReadReplicas([])
+        )
+        # The seller id in the token is a string
+        app.dependency_overrides[get_current_user] = lambda: {
+            "email": "seller@example.com",
+            "user_id": str(TEST_SELLER_ID),
+        }
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+
+    class TestGetMonthlyTransactions:
+        @pytest.mark.asyncio
+        async def test_get_monthly_transactions_uses_the_prewarmed_cache(
+            self,
+            test_catalog,
+            client,
+            test_engine,
+            test_session,
+            query_counter,
+            monkeypatch,
+        ):
+            """Test that the route reads prewarmed statistics and sees their eviction"""
+            monkeypatch.setattr(seller_statistics_prewarm, "_prewarmed_month", None)
+            await add_test_order(test_session, datetime(2026, 3, 12), [(1, 1, 120)])
+            await prewarm_seller_statistics(
+                async_sessionmaker(test_engine, class_=AsyncSession),
+                today=date(2026, 4, 2),
+            )
+
+            start = len(query_counter.statements)
+            prewarmed = await client.post(
+                "/seller-statistics/get-monthly-transactions",
+                json={"year": "2026", "month": "3"},
+            )
+            served_from_cache = query_counter.statements[start:] == []
+            await add_test_order(test_session, datetime(2026, 3, 20), [(2, 1, 80)])
+            evicted = await client.post(
+                "/seller-statistics/get-monthly-transactions",
+                json={"year": "2026", "month": "3"},
+            )
+
+            assert prewarmed.json()["total_transactions"] == 1
+            assert served_from_cache
+            assert evicted.json()["total_transactions"] == 2
+            assert evicted.json()["total_revenue"] == 200.0
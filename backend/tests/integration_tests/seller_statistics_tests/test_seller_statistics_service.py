@@ -0,0 +1,336 @@
+import time
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from dependencies import get_month_range
+from exceptions.seller_statistics_exceptions import SellerStatisticsException
+from models.models import StripeCharge
+from schemas.schemas import SelectedMonthForSellerStatistics, SellerStatisticsRange
+from services.seller_statistics_service import (
+    CLOSED_MONTH_TTL_SECONDS,
+    CURRENT_MONTH_TTL_SECONDS,
+    SellerStatisticsService,
+    statistics_cache,
+)
+from services.stripe_charge_sync_service import (
+    StripeChargeSyncService,
+    parse_charge_metadata,
+)
+from tasks import seller_statistics_prewarm
+from tasks.seller_statistics_prewarm import prewarm_seller_statistics
+from tests.integration_tests.checkout_tests.helper import TEST_SELLER_ID
+from tests.integration_tests.seller_statistics_tests.helper import (
+    OTHER_SELLER_ID,
+    add_test_catalog,
+    add_test_order,
+    add_test_seller,
+)
+
+
+class TestSellerStatisticsService:
+    @pytest.fixture
+    async def test_catalog(self, test_session) -> None:
+        await add_test_seller(test_session, TEST_SELLER_ID)
+        await add_test_seller(test_session, OTHER_SELLER_ID)
+        await add_test_catalog(
+            test_session,
+            [
+                {
+                    "id": 1,
+                    "name": "Gold ring",
+                    "price": 120,
+                    "stock_quantity": 5,
+                    "seller_id": TEST_SELLER_ID,
+                    "category_ids": [1, 2],
+                },
+                {
+                    "id": 2,
+                    "name": "Silver necklace",
+                    "price": 80,
+                    "stock_quantity": 5,
+                    "seller_id": TEST_SELLER_ID,
+                    "category_ids": [2],
+                },
+                {
+                    "id": 3,
+                    "name": "Pearl earrings",
+                    "price": 60,
+                    "stock_quantity": 5,
+                    "seller_id": OTHER_SELLER_ID,
+                    "category_ids": [1],
+                },
+            ],
+            {1: "Rings", 2: "Gold"},
+        )
+
+    @pytest.fixture
+    def selected_month(self) -> SelectedMonthForSellerStatistics:
+        return SelectedMonthForSellerStatistics(year="2026", month="3")
+
+    class TestGetMonthlyTransactions:
+        @pytest.mark.asyncio
+        async def test_get_monthly_transactions_aggregates_seller_items(
+            self, test_catalog, selected_month, test_session
+        ):
+            """Test that only the seller's items sold in the month are counted"""
+            service = SellerStatisticsService(test_session)
+            await add_test_order(
+                test_session, datetime(2026, 3, 1), [(1, 2, 120), (3, 1, 60)]
+            )
+            await add_test_order(
+                test_session, datetime(2026, 3, 31, 23, 30), [(1, 1, 100), (2, 3, 80)]
+            )
+            await add_test_order(test_session, datetime(2026, 3, 15), [(3, 4, 60)])
+            await add_test_order(test_session, datetime(2026, 4, 1), [(2, 1, 80)])
+
+            statistics = await service.get_monthly_transactions(
+                TEST_SELLER_ID, selected_month
+            )
+
+            assert statistics == {
+                "total_transactions": 2,
+                "total_revenue": 580.0,
+                "product_quantities": {"Gold ring": 3, "Silver necklace": 3},
+                "product_categories": {"Rings": 3, "Gold": 6},
+                "item_unit_prices": {
+                    "Gold ring": pytest.approx(340 / 3),
+                    "Silver necklace": 80.0,
+                },
+            }
+
+        @pytest.mark.asyncio
+        async def test_get_monthly_transactions_without_sales(
+            self, test_catalog, selected_month, test_session
+        ):
+            """Test that a month without the seller's sales is reported as empty"""
+            service = SellerStatisticsService(test_session)
+            await add_test_order(test_session, datetime(2026, 3, 10), [(3, 1, 60)])
+
+            with pytest.raises(SellerStatisticsException) as exc:
+                await service.get_monthly_transactions(TEST_SELLER_ID, selected_month)
+
+            assert exc.value.status_code == status.HTTP_204_NO_CONTENT
+
+        @pytest.mark.asyncio
+        async def test_get_monthly_transactions_includes_legacy_charges(
+            self, test_catalog, stripe_gateway, test_session
+        ):
+            """Test that synced Stripe charges fill the months before the local orders"""
+            service = SellerStatisticsService(test_session)
+            await StripeChargeSyncService(test_session, stripe_gateway).sync_next_page(
+                page_size=10
+            )
+            await add_test_order(test_session, datetime(2025, 2, 20), [(1, 1, 100)])
+
+            statistics = await service.get_monthly_transactions(
+                TEST_SELLER_ID, SelectedMonthForSellerStatistics(year="2025", month="1")
+            )
+
+            assert statistics == {
+                "total_transactions": 2,
+                "total_revenue": 320.0,
+                "product_quantities": {"Gold ring": 2, "Silver necklace": 1},
+                "product_categories": {"Rings": 2, "Gold": 1},
+                "item_unit_prices": {"Gold ring": 120.0, "Silver necklace": 80.0},
+            }
+
+        @pytest.mark.asyncio
+        async def test_get_monthly_transactions_counts_an_order_and_its_charge_once(
+            self, test_catalog, test_session
+        ):
+            """Test that the charge of a sale already rolled up from its order is skipped"""
+            service = SellerStatisticsService(test_session)
+            await add_test_order(test_session, datetime(2026, 3, 10), [(1, 2, 120)])
+            metadata = {
+                "seller_id": str(TEST_SELLER_ID),
+                "product_quantities": '{"Gold ring": 2}',
+                "product_categories": '{"1": 2, "2": 2}',
+            }
+            test_session.add(
+                StripeCharge(
+                    id="ch_test_order",
+                    created=datetime(2026, 3, 10),
+                    amount=24000,
+                    currency="usd",
+                    status="succeeded",
+                    raw_metadata=metadata,
+                    **parse_charge_metadata(metadata, 24000),
+                    synced_at=datetime.now(),
+                )
+            )
+            await test_session.commit()
+
+            statistics = await service.get_monthly_transactions(
+                TEST_SELLER_ID, SelectedMonthForSellerStatistics(year="2026", month="3")
+            )
+
+            assert statistics["total_transactions"] == 1
+            assert statistics["total_revenue"] == 240.0
+            assert statistics["product_quantities"] == {"Gold ring": 2}
+            assert statistics["product_categories"] == {"Rings": 2, "Gold": 2}
+
+    class TestGetTransactionsByMonth:
+        @pytest.mark.asyncio
+        async def test_get_transactions_by_month_with_previous_year(
+            self, test_catalog, test_session
+        ):
+            """Test that every month of the range and of the year before is a series point"""
+            service = SellerStatisticsService(test_session)
+            await add_test_order(test_session, datetime(2025, 3, 5), [(2, 1, 70)])
+            await add_test_order(test_session, datetime(2026, 1, 31), [(1, 1, 120)])
+            await add_test_order(
+                test_session, datetime(2026, 3, 2), [(1, 2, 120), (2, 1, 80)]
+            )
+            await add_test_order(test_session, datetime(2026, 3, 9), [(3, 1, 60)])
+
+            statistics = await service.get_transactions_by_month(
+                TEST_SELLER_ID,
+                date(2026, 2, 1),
+                date(2026, 3, 1),
+                compare_previous_year=True,
+            )
+
+            assert statistics == {
+                "months": ["2026-02", "2026-03"],
+                "total_transactions": [0, 1],
+                "total_revenue": [0.0, 320.0],
+                "product_quantities": {"Gold ring": [0, 2], "Silver necklace": [0, 1]},
+                "product_categories": {"Rings": [0, 2], "Gold": [0, 3]},
+                "item_unit_prices": {
+                    "Gold ring": [None, 120.0],
+                    "Silver necklace": [None, 80.0],
+                },
+                "previous_year": {
+                    "months": ["2025-02", "2025-03"],
+                    "total_transactions": [0, 1],
+                    "total_revenue": [0.0, 70.0],
+                    "product_quantities": {"Silver necklace": [0, 1]},
+                    "product_categories": {"Gold": [0, 1]},
+                    "item_unit_prices": {"Silver necklace": [None, 70.0]},
+                },
+            }
+
+        def test_get_month_range_trailing_months(self):
+            """Test that trailing months end with the current month"""
+            first_month, last_month = get_month_range(
+                SellerStatisticsRange(trailing_months=12), today=date(2026, 3, 18)
+            )
+
+            assert (first_month, last_month) == (date(2025, 4, 1), date(2026, 3, 1))
+
+        def test_get_month_range_rejects_reversed_range(self):
+            """Test that a range ending before it starts is rejected"""
+            statistics_range = SellerStatisticsRange(
+                from_date=SelectedMonthForSellerStatistics(year="2026", month="3"),
+                to_date=SelectedMonthForSellerStatistics(year="2025", month="12"),
+            )
+
+            with pytest.raises(HTTPException) as exc:
+                get_month_range(statistics_range)
+
+            assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+
+    class TestStatisticsCache:
+        @pytest.mark.asyncio
+        async def test_closed_month_served_from_cache(
+            self, test_catalog, selected_month, test_session, mocker
+        ):
+            """Test that a month that has ended is computed only once"""
+            service = SellerStatisticsService(test_session)
+            await add_test_order(test_session, datetime(2026, 3, 1), [(1, 2, 120)])
+            first = await service.get_monthly_transactions(
+                TEST_SELLER_ID, selected_month
+            )
+            execute = mocker.spy(test_session, "execute")
+
+            second = await service.get_monthly_transactions(
+                TEST_SELLER_ID, selected_month
+            )
+
+            assert second == first
+            execute.assert_not_called()
+
+        @pytest.mark.asyncio
+        async def test_closed_month_expires(
+            self, test_catalog, selected_month, test_session, monkeypatch
+        ):
+            """Test that a month that has ended is recomputed after a bounded time"""
+            cache_key = (TEST_SELLER_ID, 2026, 3)
+            await add_test_order(test_session, datetime(2026, 3, 1), [(1, 2, 120)])
+            await SellerStatisticsService(test_session).get_monthly_transactions(
+                TEST_SELLER_ID, selected_month
+            )
+            now = time.monotonic()
+
+            monkeypatch.setattr(
+                time, "monotonic", lambda: now + CURRENT_MONTH_TTL_SECONDS + 1
+            )
+            cached_after_current_month_ttl = cache_key in statistics_cache
+            monkeypatch.setattr(
+                time, "monotonic", lambda: now + CLOSED_MONTH_TTL_SECONDS + 1
+            )
+
+            assert cached_after_current_month_ttl
+            assert cache_key not in statistics_cache
+
+        @pytest.mark.asyncio
+        async def test_closed_month_from_replica_expires(
+            self, test_catalog, selected_month, test_session, monkeypatch
+        ):
+            """Test that a month read from a replica is only cached briefly"""
+            await add_test_order(test_session, datetime(2026, 3, 1), [(1, 2, 120)])
+            test_session.info["replica"] = True
+            await SellerStatisticsService(test_session).get_monthly_transactions(
+                TEST_SELLER_ID, selected_month
+            )
+            now = time.monotonic()
+
+            monkeypatch.setattr(
+                time, "monotonic", lambda: now + CURRENT_MONTH_TTL_SECONDS + 1
+            )
+
+            assert (TEST_SELLER_ID, 2026, 3) not in statistics_cache
+
+        @pytest.mark.asyncio
+        async def test_new_order_evicts_cached_month(
+            self, test_catalog, selected_month, test_session
+        ):
+            """Test that a committed order of the month replaces the cached statistics"""
+            service = SellerStatisticsService(test_session)
+            await add_test_order(test_session, datetime(2026, 3, 1), [(1, 2, 120)])
+            await service.get_monthly_transactions(TEST_SELLER_ID, selected_month)
+
+            await add_test_order(test_session, datetime(2026, 3, 2), [(2, 1, 80)])
+            statistics = await service.get_monthly_transactions(
+                TEST_SELLER_ID, selected_month
+            )
+
+            assert statistics["total_transactions"] == 2
+            assert statistics["total_revenue"] == 320.0
+
+        @pytest.mark.asyncio
+        async def test_prewarm_seller_statistics(
+            self, test_catalog, test_engine, test_session, monkeypatch
+        ):
+            """Test that the month that just ended is cached for its sellers once"""
+            monkeypatch.setattr(seller_statistics_prewarm, "_prewarmed_month", None)
+            session_factory = async_sessionmaker(test_engine, class_=AsyncSession)
+            await add_test_order(test_session, datetime(2026, 9, 30), [(1, 1, 120)])
+            await add_test_order(test_session, datetime(2026, 9, 12), [(3, 1, 60)])
+            await add_test_order(test_session, datetime(2026, 8, 1), [(2, 1, 80)])
+
+            warmed = await prewarm_seller_statistics(
+                session_factory, today=date(2026, 10, 1)
+            )
+            warmed_again = await prewarm_seller_statistics(
+                session_factory, today=date(2026, 10, 2)
+            )
+
+            assert warmed == 2
+            assert warmed_again == 0
+            assert (TEST_SELLER_ID, 2026, 9) in statistics_cache
+            assert (OTHER_SELLER_ID, 2026, 9) in statistics_cache
+            assert (TEST_SELLER_ID, 2026, 8) not in statistics_cache
@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class QueryCounter:
+    """Collects the statements run on an engine, see the ``query_counter`` fixture."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.parameters: list = []
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    def executed(self, start: int = 0) -> list[tuple[str, tuple]]:
+        """The statements run since the ``start``-th, with their parameters."""
+        return list(zip(self.statements[start:], self.parameters[start:]))
+
+    @contextmanager
+    def max_queries(self, limit: int):
+        """Fail if the block runs more than ``limit`` statements."""
+        start = len(self.statements)
+        yield
+        check_budget("The block", limit, self.statements[start:])
+
+
+def check_budget(what: str, limit: int, statements: list[str]) -> None:
+    assert len(statements) <= limit, (
+        f"{what} ran {len(statements)} statements, more than its budget of {limit}:\n"
+        + "\n".join(statements)
+    )
+
+
+class QueryBudgetMiddleware:
+    """
+    Fails every request that runs more statements than the ``max_queries`` budget
+    of its endpoint, and every request to an endpoint without a budget.
+    """
+
+    def __init__(self, app: ASGIApp, counter: QueryCounter):
+        self.app = app
+        self.counter = counter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = len(self.counter.statements)
+        await self.app(scope, receive, send)
+        # The router stores the matched route in the scope
+        route = scope.get("route")
+        if route is None:
+            return
+        what = f"{scope['method']} {route.path}"
+        limit = getattr(route.endpoint, "max_queries", None)
+        assert limit is not None, f"{what} has no max_queries budget"
+        check_budget(what, limit, self.counter.statements[start:])
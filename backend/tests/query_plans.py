@@ -0,0 +1,54 @@
+import json
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Sequential scans of tables with more rows than this fail a plan check
+SEQ_SCAN_ROW_THRESHOLD = 1000
+
+
+async def explain(connection: AsyncConnection, statement: str, parameters) -> dict:
+    """Return the plan Postgres chooses for a statement recorded by QueryCounter."""
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def sequential_scans(plan: dict) -> Iterator[dict]:
+    if plan["Node Type"] == "Seq Scan":
+        yield plan
+    for child in plan.get("Plans", []):
+        yield from sequential_scans(child)
+
+
+async def table_sizes(connection: AsyncConnection) -> dict[str, float]:
+    """The planner's row count of every table, as of the last ANALYZE."""
+    result = await connection.execute(
+        text(
+            "SELECT relname, reltuples FROM pg_class "
+            "WHERE relnamespace = 'public'::regnamespace AND relkind = 'r'"
+        )
+    )
+    return dict(result.all())
+
+
+async def check_plans(
+    connection: AsyncConnection,
+    statements: list[tuple[str, tuple]],
+    threshold: int = SEQ_SCAN_ROW_THRESHOLD,
+) -> None:
+    """Fail if any statement scans a table of more than ``threshold`` rows sequentially."""
+    sizes = await table_sizes(connection)
+    for statement, parameters in statements:
+        plan = await explain(connection, statement, parameters)
+        for scan in sequential_scans(plan):
+            rows = sizes.get(scan["Relation Name"], 0)
+            assert rows <= threshold, (
+                f"Sequential scan of {scan['Relation Name']} ({rows:.0f} rows):\n"
+                f"{statement}\n{json.dumps(plan, indent=2)}"
+            )
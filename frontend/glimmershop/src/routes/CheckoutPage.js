@@ -1,4 +1,4 @@
-import React, { useState, useContext } from "react";
+import React, { useState, useContext, useRef } from "react";
 import { loadStripe } from "@stripe/stripe-js";
 import { Elements } from "@stripe/react-stripe-js";
 import { Container, Form, Button } from "react-bootstrap";
@@ -26,6 +26,9 @@ const CheckoutPage = () => {
   });
   const [errors, setErrors] = useState({});
   const [isLoading, setIsLoading] = useState(false);
+  // The idempotency key is kept for as long as the same cart and details are
+  // submitted, so double clicks and retries are deduplicated by the server
+  const checkoutAttempt = useRef(null);
   const stripePromise = loadStripe(config.STRIPE_PUBLIC_KEY);
 
   const validateForm = () => {
@@ -95,9 +98,19 @@ const CheckoutPage = () => {
         shipping_address: `${formData.address}, ${formData.city}, ${formData.state} ${formData.zipCode}`,
       };
 
+      const payload = { cart_items: cart_items, guest_user_info: guest_user_info };
+      const fingerprint = JSON.stringify(payload);
+      if (checkoutAttempt.current?.fingerprint !== fingerprint) {
+        checkoutAttempt.current = {
+          fingerprint: fingerprint,
+          idempotencyKey: crypto.randomUUID(),
+        };
+      }
+
       let response = await apiClient.post(
         "/checkout/create-checkout-session",
-        cart_items
+        payload,
+        { headers: { "Idempotency-Key": checkoutAttempt.current.idempotencyKey } }
       );
 
       let session_id = response.data.session_id;
@@ -109,6 +122,9 @@ const CheckoutPage = () => {
           JSON.stringify({
             orders: orders,
             guest_user_info: guest_user_info,
+            session_id: session_id,
+            // Derived from the session, so a replayed session reuses it too
+            idempotency_key: `post-checkout-${session_id}`,
           })
         );
 
@@ -29,6 +29,9 @@ function Home() {
         await apiClient.post("/checkout/post-checkout", {
           orders: checkoutData.orders,
           guest_user_info: checkoutData.guest_user_info,
+          session_id: checkoutData.session_id,
+        }, {
+          headers: { "Idempotency-Key": checkoutData.idempotency_key },
         });
         
         localStorage.removeItem("checkoutData");